@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+CrewAI Content Curator - Cross-run analytics over the resource dataset
+
+    python analytics.py backfill            # add rows for older output files
+    python analytics.py domains --top 20
+    python analytics.py languages
+    python analytics.py topics
+    python analytics.py export resources.parquet
+    python analytics.py reliability         # domains that fail scrapes and URL checks
+    python analytics.py queries             # search query yields and calls saved per topic
+"""
+import time
+from pathlib import Path
+
+import click
+
+from config.settings import DATASET_DIR, OUTPUT_DIR
+from src.dataset import backfill, load_resources
+from src.domains import domain_snapshot
+from src.query_planner import get_query_store
+
+
+def load(dataset_dir: str):
+    started = time.perf_counter()
+    df = load_resources(Path(dataset_dir))
+    print(f"📊 {len(df)} resources from {df['run_id'].nunique()} runs "
+          f"loaded in {time.perf_counter() - started:.2f}s\n")
+    return df
+
+
+@click.group()
+@click.option('--dataset', default=str(DATASET_DIR), help='Dataset directory')
+@click.pass_context
+def cli(ctx, dataset: str):
+    """Aggregate curated resources across all runs"""
+    ctx.obj = dataset
+
+
+@cli.command('backfill')
+@click.option('--root', default=str(OUTPUT_DIR), help='Directory with curated output files')
+@click.pass_obj
+def backfill_command(dataset: str, root: str):
+    """Add dataset rows for curated files written before the dataset existed"""
+    added = backfill(Path(root), Path(dataset))
+    print(f"✅ {added} runs added to {dataset}")
+
+
+@cli.command()
+@click.option('--top', '-n', default=20, help='Number of domains to show')
+@click.pass_obj
+def domains(dataset: str, top: int):
+    """Domains that appear most often in curated lists"""
+    df = load(dataset)
+    if df.empty:
+        return
+    table = df.groupby('domain').agg(
+        resources=('url', 'size'),
+        runs=('run_id', 'nunique'),
+        topics=('topic_key', 'nunique'),
+    ).sort_values('resources', ascending=False).head(top)
+    print(table.to_string())
+
+
+@cli.command()
+@click.pass_obj
+def languages(dataset: str):
+    """Resources per topic and language"""
+    df = load(dataset)
+    if df.empty:
+        return
+    table = df.pivot_table(index='topic_key', columns='language', values='url',
+                           aggfunc='count', fill_value=0)
+    print(table.to_string())
+
+
+@cli.command()
+@click.pass_obj
+def topics(dataset: str):
+    """Runs, resources and level mix per topic"""
+    df = load(dataset)
+    if df.empty:
+        return
+    summary = df.groupby('topic_key').agg(
+        runs=('run_id', 'nunique'),
+        resources=('url', 'size'),
+        unique_urls=('url', 'nunique'),
+        last_run=('created', 'max'),
+    )
+    levels = df.pivot_table(index='topic_key', columns='level', values='url',
+                            aggfunc='count', fill_value=0)
+    print(summary.join(levels).sort_values('runs', ascending=False).to_string())
+
+
+@cli.command()
+@click.argument('path')
+@click.pass_obj
+def export(dataset: str, path: str):
+    """Write all rows to a single .parquet (needs pyarrow) or .csv file"""
+    df = load(dataset)
+    if path.endswith('.parquet'):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    print(f"✅ {len(df)} rows written to {path}")
+
+
+@cli.command()
+@click.option('--top', '-n', default=20, help='Number of domains to show')
+@click.option('--unreliable', is_flag=True, help='Only domains that are being skipped')
+def reliability(top: int, unreliable: bool):
+    """Success rate and latency of the domains contacted by the scraper and validator"""
+    import pandas as pd
+
+    stats = [row for row in domain_snapshot().values() if row['unreliable'] or not unreliable]
+    if not stats:
+        print("No domain statistics recorded")
+        return
+    df = pd.DataFrame(stats).set_index('domain')
+    df['last_failure'] = pd.to_datetime(df['last_failure'], unit='s').dt.strftime('%Y-%m-%d %H:%M')
+    df = df.sort_values(['success_rate', 'attempts'], ascending=[True, False]).head(top)
+    print(df.to_string())
+
+
+
+@cli.command()
+def queries():
+    """New unique URLs per search query template and search calls saved per topic"""
+    import pandas as pd
+
+    store = get_query_store()
+    templates = store.template_stats()
+    if not templates:
+        print("No query yields recorded")
+        return
+    print(pd.DataFrame(templates).set_index('template').round(2).to_string())
+    print()
+    print(pd.DataFrame(store.topic_stats()).set_index('topic_key').round(2).to_string())
+
+
+if __name__ == "__main__":
+    cli()
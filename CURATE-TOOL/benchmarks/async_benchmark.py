@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Blocking tool wrappers on a thread pool vs the async tools on the shared loop
+
+Serves the extraction fixtures from a local HTTP server with a fixed
+response delay (so no API keys are needed), then scrapes and URL-checks
+N pages both ways.
+
+    python -m benchmarks.async_benchmark --requests 500 --threads 32 --latency 0.2
+
+With those settings (one CPU, every page answered with 200): scraping
+took 4.75s with threads and 2.57s async, URL checks 3.71s and 1.86s.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import click
+
+from config.settings import ASYNC_MAX_CONNECTIONS
+from src import domains, limiter, tools
+from src.aio import check_url_works_async, run_sync
+from src.tools import scrape_webpage, scrape_webpage_async
+from validate_urls import check_url_works
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "extraction"
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """Threaded server with a listen backlog large enough for hundreds of concurrent calls"""
+
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+def inflate_page(page: bytes, times: int) -> bytes:
+    """Repeat the body of a page to make it heavier to parse"""
+    if times <= 1 or b'<body' not in page:
+        return page
+    start = page.index(b'>', page.index(b'<body')) + 1
+    end = page.rindex(b'</body>')
+    return page[:start] + page[start:end] * times + page[end:]
+
+
+def start_fixture_server(latency: float, inflate: int = 1) -> FixtureServer:
+    """Serve the fixture pages on a free local port, delaying every response"""
+    pages = {f"/{path.name}": inflate_page(path.read_bytes(), inflate) for path in FIXTURES_DIR.glob("*.html")}
+
+    class Handler(BaseHTTPRequestHandler):
+        def _respond(self, body: bool):
+            time.sleep(latency)
+            # The benchmark URLs carry a query string to make them distinct
+            page = pages.get(self.path.split('?')[0])
+            self.send_response(200 if page else 404)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(page or b'')))
+            self.end_headers()
+            if body and page:
+                self.wfile.write(page)
+
+        def do_GET(self):
+            self._respond(True)
+
+        def do_HEAD(self):
+            self._respond(False)
+
+        def log_message(self, *args):
+            pass
+
+    server = FixtureServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_threaded(func, urls, threads: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(func, urls))
+    return time.perf_counter() - started
+
+
+def run_async(func, urls) -> float:
+    async def call(url, slots):
+        async with slots:
+            await func(url)
+
+    async def gather():
+        # With the limiter off nothing else bounds the calls: hundreds of
+        # requests queued on the HTTP pool are several times slower than
+        # the same requests started as connections free up
+        slots = asyncio.Semaphore(ASYNC_MAX_CONNECTIONS)
+        await asyncio.gather(*(call(url, slots) for url in urls))
+
+    started = time.perf_counter()
+    run_sync(gather())
+    return time.perf_counter() - started
+
+
+@click.command()
+@click.option('--requests', '-n', 'count', default=200, help='Calls per tool and mode')
+@click.option('--threads', '-t', default=16, help='Thread pool size for the blocking wrappers')
+@click.option('--latency', default=0.2, help='Server response delay in seconds')
+def main(count: int, threads: int, latency: float):
+    """Compare the blocking wrappers with the async tools at high concurrency"""
+    # Keep the benchmark pages out of the local resource index and domain stats,
+    # and let every call reach the single local host at once
+    tools.RESOURCE_INDEX_ENABLED = False
+    domains.DOMAIN_RELIABILITY_ENABLED = False
+    limiter.LIMITER_ENABLED = False
+    server = start_fixture_server(latency)
+    host, port = server.server_address
+    names = sorted(path.name for path in FIXTURES_DIR.glob("*.html"))
+    urls = [f"http://{host}:{port}/{names[i % len(names)]}?n={i}" for i in range(count)]
+
+    print(f"🌐 {count} calls per tool, {latency:.2f}s server latency, {threads} threads for the blocking wrappers")
+    print(f"{'tool':<18} {'mode':<10} {'seconds':>8} {'calls/s':>9}")
+    for name, blocking, coroutine in (
+        ('webpage_scraper', scrape_webpage, scrape_webpage_async),
+        ('check_url_works', check_url_works, check_url_works_async),
+    ):
+        for mode, elapsed in (
+            ('threads', run_threaded(blocking, urls, threads)),
+            ('async', run_async(coroutine, urls)),
+        ):
+            print(f"{name:<18} {mode:<10} {elapsed:>8.2f} {count / elapsed:>9.1f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Crew setup latency and cache-friendly prompt prefixes: topic-first prompts
+rebuilt every run (legacy) versus pooled templates with the static
+instructions first
+
+    python -m benchmarks.crew_template_benchmark --repeat 50
+    python -m benchmarks.crew_template_benchmark --live --topics "AI Marketing" --topics "Python testing"
+"""
+import os
+import statistics
+import time
+
+import click
+
+from src.crew import CrewPool
+from src.singleflight import start_flight, end_flight
+from src.tasks import TASK_TEMPLATES, task_description, task_inputs
+from src.usage import estimate_tokens, start_run
+
+LAYOUTS = {'legacy': True, 'template': False}
+
+
+def common_prefix(a: str, b: str) -> str:
+    return os.path.commonprefix([a, b])
+
+
+def prefix_report(topics):
+    """Tokens of each task prompt and how many of them are identical across topics"""
+    print(f"{'layout':<9} {'task':<16} {'tokens':>7} {'shared prefix':>14}")
+    for layout, topic_first in LAYOUTS.items():
+        total = shared = 0
+        for template in TASK_TEMPLATES:
+            description = task_description(template, topic_first)
+            rendered = [description.format(**task_inputs(topic)) for topic in topics]
+            prefix = rendered[0]
+            for text in rendered[1:]:
+                prefix = common_prefix(prefix, text)
+            tokens, prefix_tokens = estimate_tokens(rendered[0]), estimate_tokens(prefix)
+            total += tokens
+            shared += prefix_tokens
+            print(f"{layout:<9} {template['name']:<16} {tokens:>7} {prefix_tokens:>14}")
+        print(f"{layout:<9} {'TOTAL':<16} {total:>7} {shared:>14}")
+
+
+def setup_report(topics, repeat: int):
+    """Time spent preparing the crew of one run"""
+    def legacy(topic):
+        crew = CrewPool(topic_first=True).build()
+        inputs = task_inputs(topic)
+        for task in crew.tasks:
+            task.interpolate_inputs(inputs)
+
+    pool = CrewPool()
+
+    def pooled(topic):
+        crew = pool.acquire()
+        inputs = task_inputs(topic)
+        for task in crew.tasks:
+            task.interpolate_inputs(inputs)
+        pool.release(crew)
+
+    print(f"\n{'setup':<9} {'median ms':>10} {'crews built':>12}")
+    for name, prepare in (('legacy', legacy), ('template', pooled)):
+        timings = []
+        for i in range(repeat):
+            started = time.perf_counter()
+            prepare(topics[i % len(topics)])
+            timings.append(time.perf_counter() - started)
+        built = repeat if name == 'legacy' else pool.built
+        print(f"{name:<9} {statistics.median(timings) * 1000:>10.2f} {built:>12}")
+
+
+def live_report(topics, profile):
+    """Run full crews with each layout and report latency and input tokens"""
+    print(f"\n{'layout':<9} {'topic':<24} {'seconds':>8} {'prompt tok':>11} {'cached tok':>11}")
+    for layout, topic_first in LAYOUTS.items():
+        pool = CrewPool(profile, topic_first=topic_first)
+        for topic in topics:
+            usage = start_run(f"bench_{layout}_{topic}")
+            start_flight()
+            crew = pool.acquire()
+            started = time.perf_counter()
+            try:
+                crew.kickoff(inputs=task_inputs(topic))
+            finally:
+                end_flight()
+                pool.release(crew)
+            totals = usage.totals
+            print(f"{layout:<9} {topic[:24]:<24} {time.perf_counter() - started:>8.1f} "
+                  f"{totals['prompt_tokens']:>11} {totals['cached_tokens']:>11}")
+
+
+@click.command()
+@click.option('--topics', '-t', multiple=True, default=['AI Marketing', 'Python testing', 'Kubernetes'],
+              help='Topics bound to the templates')
+@click.option('--repeat', '-r', default=50, help='Crew setups timed per layout')
+@click.option('--live', is_flag=True, help='Also run the crews against the real LLMs and tools')
+@click.option('--profile', default=None, help='Model routing profile for --live')
+def main(topics, repeat: int, live: bool, profile):
+    """Compare the legacy and template crew layouts"""
+    topics = list(topics)
+    prefix_report(topics)
+    setup_report(topics, repeat)
+    if live:
+        live_report(topics, profile)
+
+
+if __name__ == '__main__':
+    main()
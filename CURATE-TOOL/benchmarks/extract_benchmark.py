@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Throughput and extraction quality of the scraper's content extractor
+
+Compares src.extract.extract_main_content with the previous BeautifulSoup
+whole-page extraction on the fixture corpus in benchmarks/fixtures/extraction.
+Each fixture lists phrases of its main content ("include") and of its
+boilerplate ("exclude") in manifest.json.
+
+    python -m benchmarks.extract_benchmark --repeat 200
+"""
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+import click
+from bs4 import BeautifulSoup
+
+from config.settings import SCRAPE_MAX_CHARS
+from src.extract import extract_main_content
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "extraction"
+
+
+def legacy_extract(page: bytes, max_chars: int) -> str:
+    """Previous scrape_webpage extraction: all page text, then truncated"""
+    soup = BeautifulSoup(page, 'lxml')
+    for element in soup(['script', 'style']):
+        element.decompose()
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    text = ' '.join(chunk for chunk in chunks if chunk)
+    if len(text) > max_chars:
+        text = text[:max_chars] + "..."
+    return text
+
+
+def lxml_extract(page: bytes, max_chars: int) -> str:
+    return extract_main_content(page, max_chars=max_chars)['text']
+
+
+def load_corpus() -> Dict[str, Dict]:
+    manifest = json.loads((FIXTURES_DIR / "manifest.json").read_text(encoding='utf-8'))
+    return {
+        name: {'page': (FIXTURES_DIR / name).read_bytes(), **expected}
+        for name, expected in manifest.items()
+    }
+
+
+def quality(extract: Callable[[bytes, int], str], corpus: Dict[str, Dict], max_chars: int) -> Dict:
+    """Share of content phrases kept and of boilerplate phrases leaked"""
+    kept = leaked = included = excluded = 0
+    for fixture in corpus.values():
+        text = extract(fixture['page'], max_chars)
+        kept += sum(1 for phrase in fixture['include'] if phrase in text)
+        leaked += sum(1 for phrase in fixture['exclude'] if phrase in text)
+        included += len(fixture['include'])
+        excluded += len(fixture['exclude'])
+    return {'recall': kept / included, 'boilerplate': leaked / excluded}
+
+
+def throughput(extract: Callable[[bytes, int], str], corpus: Dict[str, Dict], max_chars: int,
+               repeat: int) -> float:
+    """Pages per second over repeat passes of the corpus"""
+    pages = [fixture['page'] for fixture in corpus.values()]
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            extract(page, max_chars)
+    return repeat * len(pages) / (time.perf_counter() - started)
+
+
+@click.command()
+@click.option('--repeat', '-r', default=100, help='Passes over the corpus for the throughput test')
+@click.option('--max-chars', default=SCRAPE_MAX_CHARS, help='Character budget per page')
+def main(repeat: int, max_chars: int):
+    """Compare the lxml extractor with the previous BeautifulSoup extraction"""
+    corpus = load_corpus()
+    print(f"📄 {len(corpus)} fixture pages, budget {max_chars} chars")
+    print(f"{'extractor':<12} {'pages/s':>9} {'recall':>8} {'boilerplate':>12}")
+    for name, extract in (('legacy', legacy_extract), ('lxml', lxml_extract)):
+        scores = quality(extract, corpus, max_chars)
+        rate = throughput(extract, corpus, max_chars, repeat)
+        print(f"{name:<12} {rate:>9.1f} {scores['recall']:>8.0%} {scores['boilerplate']:>12.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Per-agent LLM latency for each model routing profile
+
+    python -m benchmarks.routing_benchmark -p default -p economy --repeat 3
+"""
+import statistics
+import time
+
+import click
+
+from config.settings import AGENT_NAMES
+from src.agents import AGENT_SPECS
+from src.llm import ROUTING_PROFILES, agent_llm_config, llm_for_agent
+from src.usage import start_run
+
+# Short, representative prompt per agent
+SAMPLE_PROMPTS = {
+    'topic_analyzer': "List five subtopics and search keywords (English and Spanish) for '{topic}'.",
+    'web_researcher': "Suggest three search queries to find tutorials about '{topic}'.",
+    'content_analyst': "Explain in one paragraph what makes a good '{topic}' tutorial.",
+    'quality_controller': "Give three criteria to filter low-quality '{topic}' articles.",
+    'content_curator': "Write one 'Relevancia' sentence in Spanish for a '{topic}' beginner guide.",
+}
+
+
+@click.command()
+@click.option('--profiles', '-p', multiple=True, default=list(ROUTING_PROFILES), help='Profiles to compare')
+@click.option('--topic', default='AI Marketing', help='Topic used in the prompts')
+@click.option('--repeat', '-r', default=3, help='Calls per agent and profile')
+def main(profiles, topic: str, repeat: int):
+    """Measure per-agent LLM latency for each routing profile"""
+    print(f"{'profile':<10} {'agent':<20} {'model':<28} {'median s':>9} {'tokens':>7} {'cost $':>9}")
+    for profile in profiles:
+        profile_total = 0.0
+        for name in AGENT_NAMES:
+            config = agent_llm_config(name, profile)
+            llm = llm_for_agent(name, profile)
+            usage = start_run(f"bench_{profile}_{name}")
+            prompt = f"{AGENT_SPECS[name]['role']}: {SAMPLE_PROMPTS[name].format(topic=topic)}"
+
+            latencies = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                llm.invoke(prompt)
+                latencies.append(time.perf_counter() - started)
+
+            median = statistics.median(latencies)
+            profile_total += median
+            tokens = usage.totals['prompt_tokens'] + usage.totals['completion_tokens']
+            model = f"{config['provider']}:{config['model']}"
+            print(f"{profile:<10} {name:<20} {model:<28} {median:>9.2f} {tokens // repeat:>7} "
+                  f"{usage.totals['cost'] / repeat:>9.5f}")
+        print(f"{profile:<10} {'TOTAL (sequential)':<20} {'':<28} {profile_total:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
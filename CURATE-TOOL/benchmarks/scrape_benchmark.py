@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Pages per second of the two-stage scraper by parse pool size, against the
+previous single-threaded requests + BeautifulSoup scraper
+
+Serves inflated extraction fixtures from a local HTTP server so parsing,
+not the network, is the bottleneck.
+
+    python -m benchmarks.scrape_benchmark --pages 200 --inflate 20 -w 1 -w 2 -w 4 -w 8
+"""
+import os
+import time
+
+import click
+import requests
+
+from benchmarks.async_benchmark import FIXTURES_DIR, start_fixture_server
+from benchmarks.extract_benchmark import legacy_extract
+from config.settings import SCRAPE_MAX_CHARS
+from src import limiter
+from src.scraper import get_parse_pool, scrape_pages
+
+
+def legacy_scrape(urls) -> float:
+    """Previous scrape_webpage, one page after another"""
+    started = time.perf_counter()
+    session = requests.Session()
+    for url in urls:
+        legacy_extract(session.get(url, timeout=10).content, SCRAPE_MAX_CHARS)
+    return time.perf_counter() - started
+
+
+def two_stage_scrape(urls, workers: int) -> float:
+    # Start the pool first so process start-up is not measured
+    pool = get_parse_pool(workers)
+    if pool is not None:
+        list(pool.map(int, range(workers * 4)))
+    started = time.perf_counter()
+    failures = sum(1 for _, status, _, _ in scrape_pages(urls, parse_workers=workers) if status is None)
+    if failures:
+        print(f"⚠️ {failures} pages failed")
+    return time.perf_counter() - started
+
+
+@click.command()
+@click.option('--pages', '-n', default=200, help='Pages to scrape per configuration')
+@click.option('--inflate', default=20, help='Times each fixture body is repeated')
+@click.option('--latency', default=0.02, help='Server response delay in seconds')
+@click.option('--workers', '-w', multiple=True, type=int,
+              default=sorted({0, 1, 2, os.cpu_count() or 1}), help='Parse pool sizes to try (0 = threads)')
+def main(pages: int, inflate: int, latency: float, workers):
+    """Measure scraping throughput as the parse pool grows"""
+    # Every page comes from one local host: measure the pipeline, not its limiter
+    limiter.LIMITER_ENABLED = False
+    server = start_fixture_server(latency, inflate)
+    host, port = server.server_address
+    names = sorted(path.name for path in FIXTURES_DIR.glob("*.html"))
+    urls = [f"http://{host}:{port}/{names[i % len(names)]}?n={i}" for i in range(pages)]
+
+    print(f"🌐 {pages} pages, bodies x{inflate}, {latency:.2f}s latency, {os.cpu_count()} CPUs")
+    print(f"{'scraper':<24} {'seconds':>8} {'pages/s':>9}")
+    elapsed = legacy_scrape(urls)
+    print(f"{'single-threaded (old)':<24} {elapsed:>8.2f} {pages / elapsed:>9.1f}")
+    for size in workers:
+        elapsed = two_stage_scrape(urls, size)
+        label = f"two-stage, {size} procs" if size else "two-stage, threads"
+        print(f"{label:<24} {elapsed:>8.2f} {pages / elapsed:>9.1f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -22,12 +22,137 @@ OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
 TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
 
+# Per-agent model routing. The profile picks a model for each agent (see
+# src/llm.py); per-agent variables override it, for example
+# TOPIC_ANALYZER_MODEL=openai:gpt-4o-mini or CONTENT_CURATOR_MAX_TOKENS=1500
+LLM_ROUTING_PROFILE = os.getenv("LLM_ROUTING_PROFILE", "default")
+AGENT_NAMES = ['topic_analyzer', 'web_researcher', 'content_analyst', 'quality_controller', 'content_curator']
+AGENT_LLM_OVERRIDES = {
+    name: {
+        'model': os.getenv(f"{name.upper()}_MODEL"),
+        'temperature': os.getenv(f"{name.upper()}_TEMPERATURE"),
+        'max_tokens': os.getenv(f"{name.upper()}_MAX_TOKENS")
+    }
+    for name in AGENT_NAMES
+}
+
+# Per-run LLM budget (0 means unlimited)
+RUN_MAX_COST_USD = float(os.getenv("RUN_MAX_COST_USD", "0"))
+RUN_MAX_TOKENS = int(os.getenv("RUN_MAX_TOKENS", "0"))
+
+# Per-run deadline in seconds (0 means none); stages get slices of it
+RUN_DEADLINE = float(os.getenv("RUN_DEADLINE", "0"))
+
 # Search Configuration
 MAX_SEARCH_RESULTS = int(os.getenv("MAX_SEARCH_RESULTS", "10"))
 SEARCH_LANGUAGE = os.getenv("SEARCH_LANGUAGE", "es")
+# "remote" always calls Serper; "local_first" answers from the resource
+# index when it has at least LOCAL_SEARCH_MIN_RESULTS matches
+SEARCH_MODE = os.getenv("SEARCH_MODE", "remote")
+LOCAL_SEARCH_MIN_RESULTS = int(os.getenv("LOCAL_SEARCH_MIN_RESULTS", "5"))
+
+# Query Planner Configuration (search templates are chosen by their past
+# unique-URL yield until QUERY_PLANNER_TARGET unique candidates are expected;
+# every template runs until QUERY_PLANNER_MIN_RUNS runs were recorded)
+QUERY_PLANNER_ENABLED = os.getenv("QUERY_PLANNER_ENABLED", "true").lower() == "true"
+QUERY_PLANNER_PATH = Path(os.getenv("QUERY_PLANNER_PATH", str(OUTPUT_DIR / "query_yield.sqlite3")))
+QUERY_PLANNER_TARGET = int(os.getenv("QUERY_PLANNER_TARGET", "20"))
+QUERY_PLANNER_HISTORY = int(os.getenv("QUERY_PLANNER_HISTORY", "50"))
+QUERY_PLANNER_MIN_RUNS = int(os.getenv("QUERY_PLANNER_MIN_RUNS", "3"))
+QUERY_PLANNER_EXPLORE = float(os.getenv("QUERY_PLANNER_EXPLORE", "0.1"))
 
 # Output Configuration
 OUTPUT_FORMAT = os.getenv("OUTPUT_FORMAT", "markdown")
+# Crew output URLs missing from the run's search/scrape results: "replace"
+# them with the matching indexed URL when possible (else drop the entry),
+# "reject" (always drop the entry) or "off"
+URL_FILTER_MODE = os.getenv("URL_FILTER_MODE", "replace")
+
+# URL Validation Configuration
+VALIDATION_WORKERS = int(os.getenv("VALIDATION_WORKERS", "16"))
+
+# Server Configuration (finished jobs are kept for SERVER_JOB_TTL seconds, and
+# at most SERVER_MAX_FINISHED_JOBS of them, for status and event queries)
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "7860"))
+SERVER_API_PORT = int(os.getenv("SERVER_API_PORT", "8000"))
+SERVER_CONCURRENCY = int(os.getenv("SERVER_CONCURRENCY", "2"))
+SERVER_JOB_TTL = float(os.getenv("SERVER_JOB_TTL", "3600"))
+SERVER_MAX_FINISHED_JOBS = int(os.getenv("SERVER_MAX_FINISHED_JOBS", "500"))
+
+# Metrics Configuration (Prometheus text on a local port, 0 = no server;
+# METRICS_DUMP_PATH is written at exit, empty = no file)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_DUMP_PATH = os.getenv("METRICS_DUMP_PATH", "")
+
+# Profiling Configuration (--profile: functions and allocation sites listed per
+# stage in the summary; PROFILE_MEMORY=false turns tracemalloc off and only the
+# first PROFILE_SNAPSHOTS entries of each stage get a snapshot diff)
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", "15"))
+PROFILE_MEMORY = os.getenv("PROFILE_MEMORY", "true").lower() == "true"
+PROFILE_SNAPSHOTS = int(os.getenv("PROFILE_SNAPSHOTS", "1"))
+PROFILE_TRACEMALLOC_FRAMES = int(os.getenv("PROFILE_TRACEMALLOC_FRAMES", "1"))
+
+# Job Queue Configuration
+JOB_DB_PATH = Path(os.getenv("JOB_DB_PATH", str(OUTPUT_DIR / "jobs.sqlite3")))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", str(os.cpu_count() or 1)))
+
+# Prefetch Configuration (research queries fired while topic analysis runs)
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+PREFETCH_SCRAPE_TOP = int(os.getenv("PREFETCH_SCRAPE_TOP", "0"))
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "7"))
+
+# Scraper Configuration (main-content extraction)
+SCRAPE_MAX_CHARS = int(os.getenv("SCRAPE_MAX_CHARS", "2000"))
+SCRAPE_KEEP_TITLE = os.getenv("SCRAPE_KEEP_TITLE", "true").lower() == "true"
+SCRAPE_KEEP_HEADINGS = os.getenv("SCRAPE_KEEP_HEADINGS", "true").lower() == "true"
+SCRAPE_KEEP_CODE = os.getenv("SCRAPE_KEEP_CODE", "true").lower() == "true"
+
+# Async Tools Configuration (connections in the shared HTTP client pool)
+ASYNC_MAX_CONNECTIONS = int(os.getenv("ASYNC_MAX_CONNECTIONS", "100"))
+
+# Adaptive Concurrency Configuration (AIMD limits per target: the limit is multiplied
+# by LIMITER_BACKOFF on 429s, timeouts or a p95 latency above LIMITER_LATENCY_FACTOR
+# times the target's own baseline p95, and grows by one per round of healthy calls up
+# to the maximum; host limiters unused for LIMITER_IDLE_SECONDS are dropped)
+LIMITER_ENABLED = os.getenv("LIMITER_ENABLED", "true").lower() == "true"
+LIMITER_BACKOFF = float(os.getenv("LIMITER_BACKOFF", "0.5"))
+LIMITER_LATENCY_FACTOR = float(os.getenv("LIMITER_LATENCY_FACTOR", "2.0"))
+LIMITER_WINDOW = int(os.getenv("LIMITER_WINDOW", "50"))
+LIMITER_SERPER_MAX = int(os.getenv("LIMITER_SERPER_MAX", "32"))
+LIMITER_GEMINI_MAX = int(os.getenv("LIMITER_GEMINI_MAX", "16"))
+LIMITER_HOST_MAX = int(os.getenv("LIMITER_HOST_MAX", "8"))
+LIMITER_IDLE_SECONDS = float(os.getenv("LIMITER_IDLE_SECONDS", "600"))
+
+# Two-stage scraper (concurrent fetches, parsing processes, fetched pages waiting to be parsed;
+# parsing processes default to the number of CPUs, 0 parses in threads)
+SCRAPE_FETCH_WORKERS = int(os.getenv("SCRAPE_FETCH_WORKERS", "16"))
+SCRAPE_PARSE_WORKERS = int(os.getenv("SCRAPE_PARSE_WORKERS", str(os.cpu_count() or 1)))
+SCRAPE_QUEUE_SIZE = int(os.getenv("SCRAPE_QUEUE_SIZE", "32"))
+
+# Resource Index Configuration
+RESOURCE_INDEX_ENABLED = os.getenv("RESOURCE_INDEX_ENABLED", "true").lower() == "true"
+RESOURCE_INDEX_PATH = Path(os.getenv("RESOURCE_INDEX_PATH", str(OUTPUT_DIR / "resource_index.sqlite3")))
+
+# Domain Reliability Configuration (domains with at least DOMAIN_MIN_ATTEMPTS recent
+# outcomes and a success rate below DOMAIN_SKIP_BELOW are skipped; outcomes lose
+# half their weight every DOMAIN_HALF_LIFE seconds)
+DOMAIN_RELIABILITY_ENABLED = os.getenv("DOMAIN_RELIABILITY_ENABLED", "true").lower() == "true"
+DOMAIN_RELIABILITY_PATH = Path(os.getenv("DOMAIN_RELIABILITY_PATH", str(OUTPUT_DIR / "domain_reliability.sqlite3")))
+DOMAIN_MIN_ATTEMPTS = float(os.getenv("DOMAIN_MIN_ATTEMPTS", "3"))
+DOMAIN_SKIP_BELOW = float(os.getenv("DOMAIN_SKIP_BELOW", "0.2"))
+DOMAIN_HALF_LIFE = float(os.getenv("DOMAIN_HALF_LIFE", "604800"))
+
+# Resource Dataset Configuration (structured rows of every run, for analytics)
+DATASET_ENABLED = os.getenv("DATASET_ENABLED", "true").lower() == "true"
+DATASET_DIR = Path(os.getenv("DATASET_DIR", str(OUTPUT_DIR / "dataset")))
+
+# Topic Cache Configuration (max age in seconds, 0 disables the cache)
+TOPIC_CACHE_PATH = Path(os.getenv("TOPIC_CACHE_PATH", str(OUTPUT_DIR / "topic_cache.sqlite3")))
+TOPIC_CACHE_MAX_AGE = float(os.getenv("TOPIC_CACHE_MAX_AGE", "86400"))
 
 # Ensure output directory exists
 OUTPUT_DIR.mkdir(exist_ok=True)
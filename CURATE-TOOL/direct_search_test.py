@@ -4,30 +4,30 @@ Test directo para verificar que las herramientas funcionan y encontrar URLs real
 """
 import sys
 from src.tools import search_web
+from src.query_planner import plan_queries, record_plan, search_result_urls
 
 def test_direct_search(topic):
     """Test directo de búsqueda web"""
     print(f"🔍 Probando búsqueda directa para: {topic}")
     print("=" * 50)
     
-    queries = [
-        f"{topic} tutorial",
-        f"{topic} guide", 
-        f"{topic} article",
-        f"{topic} beginner",
-        f"learn {topic}"
-    ]
-    
+    plan = plan_queries(topic)
     all_results = []
     
-    for query in queries:
+    for template in plan.templates:
+        if plan.enough():
+            break
+        query = plan.query(template)
         print(f"\n🔍 Búsqueda: {query}")
         result = search_web(query)
         print(result)
+        plan.observe(template, search_result_urls(result))
         all_results.append(result)
         print("-" * 40)
     
+    record_plan(plan, 'direct')
     print(f"\n✅ Búsquedas completadas. Total: {len(all_results)} consultas realizadas")
+    print(f"🧭 Planificador: {plan.summary()}")
     
     # Verificar si encontramos URLs reales
     found_real_urls = False
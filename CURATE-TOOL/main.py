@@ -6,9 +6,19 @@ import click
 from datetime import datetime
 from typing import Optional
 
-from config.settings import validate_config
+from config.settings import (
+    validate_config, RUN_MAX_COST_USD, RUN_MAX_TOKENS, RUN_DEADLINE, METRICS_PORT, METRICS_DUMP_PATH
+)
 from src.crew import ContentCurationCrew
-from src.utils import save_content, create_project_structure, test_apis, generate_run_id
+from src.fast import curate_fast, compare_modes
+from src.usage import start_run, usage_path_for
+from src.deadline import start_deadline
+from src.limiter import limiter_metrics
+from src.metrics import enable_metrics
+from src.profiling import profile_path_for, profile_stage, start_profiling, stop_profiling
+from src.streaming import TokenStreamer
+from src.dataset import record_run
+from src.utils import save_content, create_project_structure, test_apis, generate_run_id, output_path
 
 
 @click.command()
@@ -16,7 +26,19 @@ from src.utils import save_content, create_project_structure, test_apis, generat
 @click.option('--output-format', '-f', default='markdown', help='Output format (markdown/html)')
 @click.option('--create-structure', '-s', is_flag=True, help='Create folder structure')
 @click.option('--test', '-t', is_flag=True, help='Test API connections')
-def main(topic: str, output_format: str, create_structure: bool, test: bool):
+@click.option('--force', is_flag=True, help='Ignore cached curations of the same topic')
+@click.option('--max-cost', default=RUN_MAX_COST_USD, help='Per-run LLM budget in USD (0 = unlimited)')
+@click.option('--max-tokens', default=RUN_MAX_TOKENS, help='Per-run LLM token budget (0 = unlimited)')
+@click.option('--deadline', default=RUN_DEADLINE, help='Whole-run deadline in seconds; partial results are saved (0 = none)')
+@click.option('--stream', is_flag=True, help='Stream the final curation to the console and output file')
+@click.option('--fast', is_flag=True, help='Deterministic search and ranking with a single LLM call instead of the crew')
+@click.option('--compare', is_flag=True, help='Benchmark --fast against the full crew on this topic')
+@click.option('--metrics-port', default=METRICS_PORT, help='Serve Prometheus metrics on this local port (0 = off)')
+@click.option('--metrics-file', default=METRICS_DUMP_PATH, help='Write Prometheus metrics to this file at exit')
+@click.option('--profile', is_flag=True, help='Write CPU and memory profiles per stage next to the output')
+def main(topic: str, output_format: str, create_structure: bool, test: bool, force: bool,
+         max_cost: float, max_tokens: int, deadline: float, stream: bool, fast: bool, compare: bool,
+         metrics_port: int, metrics_file: str, profile: bool):
     """
     CrewAI Content Curator - Create educational content using AI
     
@@ -24,6 +46,7 @@ def main(topic: str, output_format: str, create_structure: bool, test: bool):
     """
     print(f"\n🎓 CrewAI Content Curator")
     print("=" * 50)
+    enable_metrics(metrics_port, metrics_file)
     
     # Test mode
     if test:
@@ -49,6 +72,20 @@ def main(topic: str, output_format: str, create_structure: bool, test: bool):
         print("Please check your .env file")
         return
     
+    # Benchmark mode: nothing is saved
+    if compare:
+        print(f"\n⏱️ Comparing fast mode and full crew for: {topic}\n")
+        rows = compare_modes(topic)
+        print(f"\n{'mode':<6} {'ok':<4} {'seconds':>8} {'API calls':>10} {'LLM calls':>10} {'cost $':>9}")
+        for row in rows:
+            print(f"{row['mode']:<6} {'✅' if row['success'] else '❌':<4} {row['seconds']:>8.1f} "
+                  f"{row['api_calls']:>10} {row['llm_calls']:>10} {row['cost']:>9.4f}")
+        fast_row, crew_row = rows
+        if fast_row['seconds']:
+            print(f"\n⚡ Fast mode: {crew_row['seconds'] / fast_row['seconds']:.1f}x faster, "
+                  f"{crew_row['api_calls'] - fast_row['api_calls']} fewer API calls")
+        return
+    
     # Generate run ID for this execution
     run_id = generate_run_id(topic)
     
@@ -56,13 +93,49 @@ def main(topic: str, output_format: str, create_structure: bool, test: bool):
     print(f"\n📚 Topic: {topic}")
     print(f"🔖 Run ID: {run_id}")
     print(f"⏰ Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("\n🚀 Starting content curation...\n")
+    print(f"\n🚀 Starting {'fast ' if fast else ''}content curation...\n")
     
-    # Create and run crew
-    crew = ContentCurationCrew()
-    result = crew.run(topic)
+    # Create and run crew (or the fast path)
+    if profile:
+        start_profiling()
+    usage = start_run(run_id, max_cost=max_cost, max_tokens=max_tokens)
+    run_deadline = start_deadline(deadline)
+    streamer = None
+    if stream and fast:
+        print("ℹ️ --stream has no effect in fast mode")
+    elif stream:
+        # Tokens are appended to the final output path; save_content rewrites
+        # it with the complete document once the crew returns
+        stream_dir = create_project_structure(topic, run_id) if create_structure else None
+        streamer = TokenStreamer(output_path(topic, run_id, output_format, stream_dir))
+    
+    if fast:
+        result = curate_fast(topic, force=force, usage=usage, run_id=run_id)
+    else:
+        crew = ContentCurationCrew()
+        try:
+            result = crew.run(topic, force=force, run_id=run_id, usage=usage, streamer=streamer)
+        except BaseException:
+            if streamer:
+                streamer.discard()
+            raise
+        if streamer and not result['success']:
+            # Only part of the answer (or none) was streamed to the output path
+            streamer.discard()
+    
+    if streamer and streamer.time_to_first_token is not None:
+        print(f"\n\n⚡ Time to first content: {streamer.time_to_first_token:.1f}s")
     
     if result['success']:
+        if result.get('cached'):
+            print("♻️ Using cached curation of this topic (use --force to run again)")
+        if result.get('partial'):
+            if run_deadline and run_deadline.exceeded:
+                print(f"⏱️ Deadline of {deadline:.0f}s reached: saving partial results")
+                print(f"   Skipped: {'; '.join(run_deadline.skipped)}")
+            else:
+                print("⚠️ Run budget exceeded: saving partial results")
+        
         # Create folder structure if requested
         base_dir = None
         if create_structure:
@@ -78,6 +151,25 @@ def main(topic: str, output_format: str, create_structure: bool, test: bool):
             base_dir=base_dir
         )
         print(f"\n✅ Content saved to: {filepath}")
+        with profile_stage('save'):
+            # A cache hit repeats an earlier run, which is already in the dataset
+            if not result.get('cached'):
+                record_run(topic, run_id, 'fast' if fast else 'crew',
+                           content=result['content'], resources=result.get('resources'))
+            usage_file = usage.save(usage_path_for(filepath))
+        print(f"💰 Usage: {usage.summary()} ({usage_file})")
+        if usage.counters.get('urls_rejected') or usage.counters.get('urls_replaced'):
+            print(f"🔗 URLs not returned by any tool: {usage.counters['urls_replaced']} replaced, "
+                  f"{usage.counters['urls_rejected']} resources dropped")
+        if usage.counters.get('singleflight_collapsed'):
+            print(f"🔁 Duplicate tool calls served from a shared execution: {usage.counters['singleflight_collapsed']}")
+        limits = limiter_metrics()
+        if limits:
+            hosts = [name for name in limits if name.startswith('host:')]
+            shown = [f"{name}={m['limit']} ({m['decreases']} backoffs)" for name, m in limits.items() if name not in hosts]
+            if hosts:
+                shown.append(f"{len(hosts)} hosts, {sum(limits[name]['decreases'] for name in hosts)} backoffs")
+            print(f"🎚️ Concurrency limits: {', '.join(shown)}")
         
         print(f"\n🎉 Content curation completed successfully!")
         
@@ -85,6 +177,11 @@ def main(topic: str, output_format: str, create_structure: bool, test: bool):
         print(f"\n❌ Error: {result['error']}")
         print("Please check the logs for more details")
     
+    if profile:
+        # Next to the output file, or where it would have been saved
+        profile_dir = profile_path_for(filepath if result['success'] else output_path(topic, run_id, output_format))
+        print(f"🔬 Profile: {stop_profiling(profile_dir)}")
+    
     print(f"\n⏰ Finished: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
 
@@ -2,136 +2,326 @@
 """
 Sistema de curación de contenido educativo con búsqueda REAL
 Version que bypassa el problema de los agentes y usa directamente las herramientas
+
+El camino rápido es un pipeline por etapas (búsqueda → dedupe → scraping opcional
+→ score → render) conectado con colas acotadas: cada recurso se escribe en el
+archivo en cuanto pasa los filtros y el pipeline se detiene al tener 10 recursos.
+Con --rank se reúnen todos los candidatos y se escriben los 10 mejor puntuados
+por el ranking local (calidad, relevancia, diversidad de dominios y estado de la URL).
 """
-import sys
-import json
+import contextvars
+import os
+import queue
+import threading
 from datetime import datetime
-from src.tools import search_web
+
+import click
+
+from config.settings import OUTPUT_DIR, RUN_DEADLINE, METRICS_PORT, METRICS_DUMP_PATH
+from src.tools import search_web, scrape_webpages, content_quality_metrics
+from src.utils import generate_run_id
+from src.cache import get_topic_cache
+from src.formatting import format_header, format_resource, format_summary, parse_search_result
+from src.usage import start_run, usage_path_for
+from src.ranking import rank_resources
+from src.domains import domain_snapshot, is_unreliable
+from src.dataset import record_run
+from src.deadline import DEADLINE_MESSAGE, current_deadline, deadline_passed, enter_stage, start_deadline
+from src.metrics import enable_metrics, tracked_run
+from src.query_planner import plan_queries, record_plan, search_result_urls
+from src.profiling import profile_path_for, profile_stage, start_profiling, stop_profiling
+
+# Número de recursos que forman la lista final
+TARGET_RESOURCES = 10
+
+# Capacidad de las colas entre etapas. La cola de búsqueda admite una sola
+# página de resultados para que el pipeline no adelante más de una consulta.
+STAGE_QUEUE_SIZE = 20
+SEARCH_QUEUE_SIZE = 5
+
+# Páginas que el scraper en dos etapas descarga y procesa a la vez
+SCRAPE_BATCH_SIZE = 10
+
+# Parte del plazo de la ejecución (--deadline) en que termina cada etapa;
+# las etapas corren a la vez, así que el resto queda para escribir el resultado
+SEARCH_SHARE = 0.6
+SCRAPE_SHARE = 0.85
+
+_STAGE_DONE = object()
+
 
 def format_results(topic, search_results):
     """Formatea los resultados en el formato esperado"""
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
-    content = f"""# RECURSOS CURADOS - {topic.upper()}
 
-## TOP 10 RECURSOS SELECCIONADOS
-
-"""
-    
     # Extraer todos los resultados de todas las búsquedas
     all_resources = []
-    
     for result_json in search_results:
-        try:
-            results = json.loads(result_json)
-            for item in results:
-                if item.get('link') and item.get('title'):
-                    all_resources.append({
-                        'title': item['title'],
-                        'url': item['link'],
-                        'description': item.get('snippet', ''),
-                        'language': 'Español' if any(word in item['title'].lower() for word in ['curso', 'guía', 'español']) else 'Inglés',
-                        'level': 'Principiante' if 'beginner' in item['title'].lower() or 'principiante' in item['title'].lower() else 'Intermedio'
-                    })
-        except:
-            continue
-    
+        all_resources.extend(parse_search_result(result_json))
+
     # Tomar los primeros 10 únicos
-    unique_resources = []
-    seen_urls = set()
-    
-    for resource in all_resources:
-        if resource['url'] not in seen_urls and len(unique_resources) < 10:
-            unique_resources.append(resource)
-            seen_urls.add(resource['url'])
-    
-    # Formatear cada recurso
+    unique_resources = list(dedupe_stage(all_resources))[:TARGET_RESOURCES]
+
+    content = format_header(topic)
     for i, resource in enumerate(unique_resources, 1):
-        content += f"""### {i}.
-**Título Original:** {resource['title']}
-**URL:** {resource['url']}
-**Idioma:** {resource['language']}
-**Autor/Fuente:** {resource['url'].split('/')[2] if '/' in resource['url'] else 'Web'}
-**Nivel:** {resource['level']}
-**Relevancia:** {resource['description'][:200]}...
+        content += format_resource(i, resource)
+    content += format_summary(unique_resources, timestamp)
 
-"""
-    
-    content += f"""## RESUMEN
-- Total de recursos curados: {len(unique_resources)}
-- Recursos en inglés: {sum(1 for r in unique_resources if r['language'] == 'Inglés')}
-- Recursos en español: {sum(1 for r in unique_resources if r['language'] == 'Español')}
-- Distribución por nivel: Principiante ({sum(1 for r in unique_resources if r['level'] == 'Principiante')}), Intermedio ({sum(1 for r in unique_resources if r['level'] == 'Intermedio')}), Avanzado (0)
-
-**Sistema Real**: Generado usando APIs reales de búsqueda web
-**Timestamp**: {timestamp}
-"""
-    
     return content
 
-def curate_content_real(topic):
-    """Sistema real de curación que usa las herramientas directamente"""
+
+def run_stage(source, stop, maxsize=STAGE_QUEUE_SIZE):
+    """
+    Ejecuta una etapa del pipeline en un hilo que alimenta una cola acotada
+
+    Args:
+        source: Iterable que produce los elementos de la etapa
+        stop: Event que indica que el consumidor ya no necesita más elementos
+        maxsize: Capacidad de la cola
+
+    Returns:
+        Generador con los elementos producidos por la etapa
+    """
+    items = queue.Queue(maxsize=maxsize)
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker():
+        try:
+            for item in source:
+                if not put(item):
+                    break
+        except Exception as e:
+            print(f"⚠️ Error en etapa del pipeline: {e}")
+        finally:
+            put(_STAGE_DONE)
+
+    # Run the stage with the caller's context so tool calls are accounted to this run
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(worker,), daemon=True).start()
+
+    while not stop.is_set():
+        try:
+            item = items.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if item is _STAGE_DONE:
+            return
+        yield item
+
+
+def search_stage(plan, stop):
+    """
+    Etapa de búsqueda: ejecuta las consultas del plan hasta que el pipeline se
+    detiene, el plan reúne suficientes URLs únicas o se agota su plazo
+    """
+    # Cada etapa corre en su propio hilo y contexto, así que su plazo no afecta a las demás
+    enter_stage('búsqueda', SEARCH_SHARE)
+    for i, template in enumerate(plan.templates, 1):
+        if stop.is_set() or plan.enough() or deadline_passed("búsquedas"):
+            return
+        query = plan.query(template)
+        print(f"   {i}. Buscando: {query}")
+        result = search_web(query)
+        plan.observe(template, search_result_urls(result))
+        resources = parse_search_result(result)
+        if resources:
+            print(f"      ✅ Encontrado: {resources[0]['title'][:50]}...")
+            print(f"      🔗 URL: {resources[0]['url']}")
+        yield from resources
+
+
+def dedupe_stage(resources):
+    """Etapa de deduplicación por URL; descarta dominios que fallan de forma persistente"""
+    seen_urls = set()
+    reliability = domain_snapshot()
+    for resource in resources:
+        if resource['url'] in seen_urls:
+            continue
+        seen_urls.add(resource['url'])
+        if is_unreliable(resource['url'], reliability):
+            print(f"      ⚠️ Descartado (dominio poco fiable): {resource['url']}")
+            continue
+        yield resource
+
+
+def scrape_batch(batch):
+    """Descarga un lote de páginas en paralelo y las devuelve en su orden original"""
+    with profile_stage('scrape'):
+        contents = dict(scrape_webpages(resource['url'] for resource in batch))
+    for resource in batch:
+        content = contents[resource['url']]
+        # Las páginas que el plazo dejó sin descargar se conservan sin contenido
+        resource['content'] = None if content.endswith(DEADLINE_MESSAGE) else content
+        yield resource
+
+
+def scrape_stage(resources):
+    """Etapa opcional de scraping: adjunta el contenido de cada página por lotes"""
+    enter_stage('scraping', SCRAPE_SHARE)
+    batch = []
+    for resource in resources:
+        batch.append(resource)
+        if len(batch) >= SCRAPE_BATCH_SIZE:
+            yield from scrape_batch(batch)
+            batch = []
+    if batch:
+        yield from scrape_batch(batch)
+
+
+def score_stage(resources):
+    """Etapa de puntuación: calcula métricas de calidad y filtra recursos rotos"""
+    for resource in resources:
+        content = resource.get('content')
+        if content is None:
+            yield resource
+            continue
+        if content.startswith('Scraping error'):
+            print(f"      ⚠️ Descartado (no accesible): {resource['url']}")
+            continue
+        resource['quality'] = content_quality_metrics(content)['score']
+        resource['url_status'] = 'ok'
+        yield resource
+
+
+@tracked_run('pipeline')
+def curate_content_real(topic, scrape=False, on_resource=None, run_id=None, force=False, rank=False,
+                        deadline=0):
+    """
+    Sistema real de curación que usa las herramientas directamente
+
+    Args:
+        topic: Tema a curar
+        scrape: Si se descarga cada candidato para filtrar páginas rotas
+        on_resource: Callback opcional llamado con (índice, recurso) al escribir cada recurso
+        run_id: Identificador de la ejecución (se genera si no se indica)
+        force: Ignora la caché de temas equivalentes ya curados
+        rank: Reúne todos los candidatos y escribe los mejor puntuados por el ranking local
+        deadline: Plazo total en segundos (0 = sin plazo);
+            al agotarse se guarda la mejor lista parcial con una nota de lo omitido
+
+    Returns:
+        Ruta del archivo generado
+    """
     print(f"🎓 CrewAI Content Curator - SISTEMA REAL")
     print("=" * 50)
     print(f"📚 Topic: {topic}")
     print(f"⏰ Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
+    cache = get_topic_cache()
+    cached = None if force else cache.lookup(topic, 'pipeline')
+    if cached and cached['path'] and os.path.exists(cached['path']):
+        print(f"♻️ **Caché**: Curación reciente de '{cached['topic']}' reutilizada (usa --force para repetir)")
+        print(f"📄 **Archivo**: {cached['path']}")
+        return cached['path']
+
     print("🚀 Starting content curation...")
     print()
-    
-    # Búsquedas que realmente funcionan
-    queries = [
-        f"{topic} tutorial",
-        f"{topic} guide",
-        f"{topic} article", 
-        f"{topic} beginner",
-        f"{topic} curso",
-        f"{topic} blog"
-    ]
-    
-    search_results = []
-    
+
+    stop = threading.Event()
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    run_id = run_id or generate_run_id(topic)
+    plan = plan_queries(topic, run_id=run_id)
+    usage = start_run(run_id)
+    # Siempre: con 0 se borra el plazo que una ejecución anterior dejara en el hilo
+    start_deadline(deadline)
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    filename = str(OUTPUT_DIR / f"{run_id}.markdown")
+
     print("🔍 **Web Research Specialist**: Ejecutando búsquedas REALES...")
-    
-    for i, query in enumerate(queries, 1):
-        print(f"   {i}. Buscando: {query}")
-        result = search_web(query)
-        search_results.append(result)
-        
-        # Mostrar primeros resultados como evidencia
-        try:
-            parsed = json.loads(result)
-            if parsed:
-                first_result = parsed[0]
-                print(f"      ✅ Encontrado: {first_result['title'][:50]}...")
-                print(f"      🔗 URL: {first_result['link']}")
-        except:
-            pass
-        print()
-    
-    print("📊 **Content Analyst**: Analizando recursos encontrados...")
-    print("✅ **Quality Controller**: Verificando calidad de URLs...")
-    print("📚 **Content Curator**: Organizando resultado final...")
+
+    # search → dedupe → (scrape) → score → render
+    resources = dedupe_stage(run_stage(search_stage(plan, stop), stop, SEARCH_QUEUE_SIZE))
+    if scrape:
+        resources = run_stage(scrape_stage(resources), stop)
+    resources = score_stage(resources)
+    if rank:
+        # El ranking necesita todos los candidatos antes de escribir
+        candidates = list(resources)
+        resources = rank_resources(candidates, topic, TARGET_RESOURCES)
+        print(f"🏆 **Ranking**: {len(resources)} recursos seleccionados de {len(candidates)} candidatos")
+
+    curated = []
+    try:
+        with open(filename, 'w', encoding='utf-8') as f:
+            with profile_stage('save'):
+                f.write(format_header(topic))
+                f.flush()
+
+            for resource in resources:
+                curated.append(resource)
+                with profile_stage('save'):
+                    f.write(format_resource(len(curated), resource))
+                    f.flush()
+                print(f"      📝 Recurso {len(curated)} escrito: {resource['title'][:50]}")
+                if on_resource:
+                    on_resource(len(curated), resource)
+                if len(curated) >= TARGET_RESOURCES:
+                    break
+
+            run_deadline = current_deadline()
+            note = run_deadline.note() if run_deadline else ""
+            if note:
+                f.write("\n" + note)
+                print(f"⏱️ **Plazo**: {note.strip('> ').strip()}")
+            with profile_stage('save'):
+                f.write(format_summary(curated, timestamp))
+    finally:
+        stop.set()
+
+    with profile_stage('save'):
+        if not note:
+            with open(filename, 'r', encoding='utf-8') as f:
+                cache.store(topic, 'pipeline', f.read(), run_id=run_id, path=filename)
+        usage.save(usage_path_for(filename))
+        record_run(topic, run_id, 'pipeline', resources=curated)
+        record_plan(plan, 'pipeline')
+
     print()
-    
-    # Generar contenido final
-    final_content = format_results(topic, search_results)
-    
-    # Guardar archivo
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"output/course_{topic.replace(' ', '_')}_{timestamp}.markdown"
-    
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(final_content)
-    
     print(f"✅ **Sistema**: ¡Curación completada!")
     print(f"📄 **Archivo**: {filename}")
-    print(f"🔗 **URLs Reales**: Encontradas {len(search_results)} búsquedas con resultados reales")
+    print(f"🔗 **URLs Reales**: {len(curated)} recursos de {len(plan.executed)} búsquedas")
+    print(f"🧭 **Planificador**: {plan.summary()}")
+    if plan.saved > 0:
+        if note:
+            reason = "plazo agotado"
+        elif plan.enough():
+            reason = f"{plan.target} URLs únicas encontradas"
+        else:
+            reason = f"objetivo de {TARGET_RESOURCES} recursos alcanzado"
+        print(f"⏭️ **Búsquedas omitidas**: {plan.saved} ({reason})")
     print()
     print("🎉 ¡Proceso completado con URLs REALES!")
-    
+
     return filename
 
+
+@click.command()
+@click.argument('topic', default="AI Marketing")
+@click.option('--scrape', is_flag=True, help='Scrape each candidate and drop unreachable pages')
+@click.option('--force', is_flag=True, help='Ignore cached curations of the same topic')
+@click.option('--rank', is_flag=True, help='Rank all candidates locally instead of keeping the first 10')
+@click.option('--deadline', default=RUN_DEADLINE, help='Whole-run deadline in seconds (0 = none)')
+@click.option('--metrics-port', default=METRICS_PORT, help='Serve Prometheus metrics on this local port (0 = off)')
+@click.option('--metrics-file', default=METRICS_DUMP_PATH, help='Write Prometheus metrics to this file at exit')
+@click.option('--profile', is_flag=True, help='Write CPU and memory profiles per stage next to the output')
+def main(topic, scrape, force, rank, deadline, metrics_port, metrics_file, profile):
+    """Curación rápida usando las herramientas directamente"""
+    enable_metrics(metrics_port, metrics_file)
+    if profile:
+        start_profiling()
+    filename = curate_content_real(topic, scrape=scrape, force=force, rank=rank, deadline=deadline)
+    if profile:
+        print(f"🔬 **Perfil**: {stop_profiling(profile_path_for(filename))}")
+
+
 if __name__ == "__main__":
-    topic = sys.argv[1] if len(sys.argv) > 1 else "AI Marketing"
-    curate_content_real(topic)
\ No newline at end of file
+    main()
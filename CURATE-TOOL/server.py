@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+CrewAI Content Curator - Warm server mode
+
+Runs a persistent process with a Gradio UI and a JSON HTTP API:
+
+    POST /jobs               {"topic": "...", "mode": "fast|crew", "force": false} -> job
+    GET  /jobs               list of jobs
+    GET  /jobs/<id>          job status and, once finished, the content
+    GET  /jobs/<id>/events   progress events as newline-delimited JSON
+    GET  /metrics            operational metrics in the Prometheus text format
+    GET  /limiters           current adaptive concurrency limits per target
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import click
+
+from config.settings import SERVER_HOST, SERVER_PORT, SERVER_API_PORT, SERVER_CONCURRENCY
+from src.service import CurationService
+from src.limiter import limiter_metrics
+from src.metrics import CONTENT_TYPE, render_metrics
+
+
+def make_api_handler(service: CurationService):
+    """Build the HTTP request handler bound to a service instance"""
+
+    class CurationAPIHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send_json(self, payload, status=200):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _write_chunk(self, data: bytes):
+            self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.flush()
+
+        def do_POST(self):
+            if self.path.rstrip('/') != '/jobs':
+                return self._send_json({'error': 'Not found'}, 404)
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                data = json.loads(self.rfile.read(length) or b'{}')
+                job = service.submit(data['topic'], data.get('mode', 'fast'), bool(data.get('force')))
+            except (KeyError, ValueError) as e:
+                return self._send_json({'error': f"Invalid request: {e}"}, 400)
+            self._send_json(job.to_dict(), 202)
+
+        def do_GET(self):
+            parts = [unquote(part) for part in self.path.split('/') if part]
+            if parts == ['jobs']:
+                return self._send_json([job.to_dict() for job in service.list_jobs()])
+            if parts == ['metrics']:
+                body = render_metrics().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if parts == ['limiters']:
+                return self._send_json({'limiters': limiter_metrics()})
+            if len(parts) < 2 or parts[0] != 'jobs' or not service.get(parts[1]):
+                return self._send_json({'error': 'Not found'}, 404)
+
+            job = service.get(parts[1])
+            if len(parts) == 2:
+                return self._send_json(job.to_dict())
+
+            # Stream progress events until the job finishes
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for event in service.stream(job.id):
+                self._write_chunk((json.dumps(event, ensure_ascii=False) + "\n").encode('utf-8'))
+            self._write_chunk((json.dumps(job.to_dict(), ensure_ascii=False) + "\n").encode('utf-8'))
+            self._write_chunk(b"")
+
+        def log_message(self, format, *args):
+            pass
+
+    return CurationAPIHandler
+
+
+def start_api(service: CurationService, host: str, port: int) -> ThreadingHTTPServer:
+    """Start the JSON API in a background thread"""
+    httpd = ThreadingHTTPServer((host, port), make_api_handler(service))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def build_ui(service: CurationService):
+    """Build the Gradio interface"""
+    import gradio as gr
+
+    def curate(topic, mode):
+        job = service.submit(topic, mode)
+        log = []
+        for event in service.stream(job.id):
+            if event['event'] == 'resource':
+                log.append(f"{event['index']}. {event['title']} - {event['url']}")
+            else:
+                log.append(f"[{event['event']}]")
+            yield "\n".join(log), job.content or ""
+        yield "\n".join(log), job.content or job.error or ""
+
+    with gr.Blocks(title="CrewAI Content Curator") as demo:
+        gr.Markdown("# 🎓 CrewAI Content Curator")
+        with gr.Row():
+            topic = gr.Textbox(label="Topic", placeholder="AI Marketing")
+            mode = gr.Radio(['fast', 'crew'], value='fast', label="Mode")
+        run = gr.Button("Curate")
+        progress = gr.Textbox(label="Progress", lines=12)
+        result = gr.Markdown()
+        run.click(curate, inputs=[topic, mode], outputs=[progress, result])
+
+    return demo
+
+
+@click.command()
+@click.option('--host', default=SERVER_HOST, help='Interface to bind')
+@click.option('--port', default=SERVER_PORT, help='Gradio UI port')
+@click.option('--api-port', default=SERVER_API_PORT, help='JSON API port')
+@click.option('--concurrency', '-c', default=SERVER_CONCURRENCY, help='Maximum concurrent jobs')
+@click.option('--no-ui', is_flag=True, help='Only serve the JSON API')
+def main(host: str, port: int, api_port: int, concurrency: int, no_ui: bool):
+    """
+    Run the content curator as a long-lived local service
+    """
+    print(f"\n🎓 CrewAI Content Curator - Server")
+    print("=" * 50)
+    print("🔥 Warming up agents and clients...")
+    service = CurationService(concurrency=concurrency)
+
+    httpd = start_api(service, host, api_port)
+    print(f"🌐 JSON API: http://{host}:{api_port}/jobs")
+
+    if no_ui:
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            httpd.shutdown()
+        return
+
+    print(f"🖥️ UI: http://{host}:{port}")
+    build_ui(service).queue(default_concurrency_limit=concurrency).launch(
+        server_name=host, server_port=port
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Shared event loop and HTTP client pool for the async tools
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache, wraps
+from typing import Awaitable, Callable
+
+import httpx
+
+from config.settings import ASYNC_MAX_CONNECTIONS
+from .domains import is_domain_failure, record_outcome, response_outcome
+from .limiter import host_target, limited
+from .deadline import call_timeout, deadline_expired, deadline_passed
+from .profiling import profile_loop_steps
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+def _task_factory(loop: asyncio.AbstractEventLoop, coro, **kwargs) -> asyncio.Task:
+    # Under --profile, tasks started from a profiled stage are profiled on this thread
+    return asyncio.Task(profile_loop_steps(coro, kwargs.get('context')), loop=loop, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the event loop every async tool runs on, started in a daemon thread"""
+    loop = asyncio.new_event_loop()
+    loop.set_task_factory(_task_factory)
+    threading.Thread(target=loop.run_forever, name='async-tools', daemon=True).start()
+    return loop
+
+
+@lru_cache(maxsize=None)
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the pooled HTTP client of the shared loop
+
+    Only use it from coroutines running on get_event_loop().
+    """
+    return httpx.AsyncClient(
+        headers={'User-Agent': USER_AGENT},
+        timeout=10,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=ASYNC_MAX_CONNECTIONS,
+            max_keepalive_connections=ASYNC_MAX_CONNECTIONS
+        )
+    )
+
+
+def _in_shared_loop() -> bool:
+    try:
+        return asyncio.get_running_loop() is get_event_loop()
+    except RuntimeError:
+        return False
+
+
+async def _with_context(context: contextvars.Context, awaitable: Awaitable):
+    # Carry the caller's run, single-flight scope and streamer into the task
+    for var, value in context.items():
+        var.set(value)
+    return await awaitable
+
+
+def submit(awaitable: Awaitable) -> Future:
+    """Schedule awaitable on the shared loop with the caller's context"""
+    return asyncio.run_coroutine_threadsafe(
+        _with_context(contextvars.copy_context(), awaitable), get_event_loop()
+    )
+
+
+def run_sync(awaitable: Awaitable):
+    """
+    Run awaitable on the shared loop and block until it finishes
+
+    Args:
+        awaitable: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    if _in_shared_loop():
+        raise RuntimeError("run_sync() would block the shared event loop; await the coroutine instead")
+    return submit(awaitable).result()
+
+
+def shared_loop(func: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+    """Decorator making a coroutine function run on the shared loop whatever loop awaits it"""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        if _in_shared_loop():
+            return await func(*args, **kwargs)
+        return await asyncio.wrap_future(submit(func(*args, **kwargs)))
+    return wrapper
+
+
+@shared_loop
+async def check_url_works_async(url: str, timeout: float = 10) -> bool:
+    """Check if URL is accessible, recording the outcome in the domain reliability store"""
+    if deadline_passed("verificación de URLs"):
+        return False
+    started = time.perf_counter()
+    try:
+        async with limited(host_target(url)) as call:
+            started = time.perf_counter()
+            response = await get_http_client().head(url, timeout=call_timeout(timeout))
+            call.observe(response.status_code)
+    except Exception as e:
+        # Only transport errors and timeouts are held against the domain
+        if not deadline_expired() and is_domain_failure(e):
+            error = str(e) or type(e).__name__
+            await asyncio.to_thread(record_outcome, url, False, time.perf_counter() - started, error)
+        return False
+    seconds = time.perf_counter() - started
+    ok, error = response_outcome(response.status_code)
+    await asyncio.to_thread(record_outcome, url, ok, seconds, error)
+    return response.status_code < 400
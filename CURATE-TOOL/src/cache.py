@@ -0,0 +1,113 @@
+"""
+Topic-level result cache so repeated topics reuse a recent curation
+"""
+import re
+import sqlite3
+import time
+import unicodedata
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+from config.settings import TOPIC_CACHE_PATH, TOPIC_CACHE_MAX_AGE
+from .metrics import CACHE_REQUESTS
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS topic_cache (
+    topic_key TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    run_id TEXT,
+    path TEXT,
+    content TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS topic_cache_key ON topic_cache (topic_key, mode, created);
+"""
+
+
+def normalize_topic(topic: str) -> str:
+    """
+    Normalize a topic so equivalent spellings share one cache key
+
+    "AI Marketing", "ai marketing" and "AI  marketing " all map to
+    "ai marketing"; accents are dropped ("Programación" -> "programacion").
+
+    Args:
+        topic: Topic as typed by the user
+
+    Returns:
+        Normalized topic key
+    """
+    decomposed = unicodedata.normalize('NFKD', topic)
+    without_accents = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return re.sub(r'\s+', ' ', without_accents.casefold()).strip()
+
+
+class TopicCache:
+    """Stores curated documents by normalized topic and execution mode"""
+
+    def __init__(self, path: Path = TOPIC_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def lookup(self, topic: str, mode: str, max_age: float = TOPIC_CACHE_MAX_AGE) -> Optional[Dict]:
+        """
+        Find the most recent curation of an equivalent topic
+
+        Args:
+            topic: Topic to look up
+            mode: 'pipeline' (main_fixed), 'fast' (src.fast) or 'crew'
+            max_age: Maximum age in seconds (0 disables the cache)
+
+        Returns:
+            Cached entry as a dictionary, or None
+        """
+        if max_age <= 0:
+            return None
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM topic_cache WHERE topic_key = ? AND mode = ? AND created >= ? "
+                "ORDER BY created DESC LIMIT 1",
+                (normalize_topic(topic), mode, time.time() - max_age)
+            ).fetchone()
+        CACHE_REQUESTS.inc(cache='topic', result='hit' if row else 'miss')
+        return dict(row) if row else None
+
+    def store(self, topic: str, mode: str, content: str,
+              run_id: Optional[str] = None, path: Optional[str] = None):
+        """
+        Record a finished curation
+
+        Args:
+            topic: Topic as curated
+            mode: 'pipeline' (main_fixed), 'fast' (src.fast) or 'crew'
+            content: Curated document
+            run_id: Run ID of the curation
+            path: Path of the saved output, if any
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO topic_cache (topic_key, mode, topic, run_id, path, content, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (normalize_topic(topic), mode, topic, run_id, path, content, time.time())
+            )
+
+
+@lru_cache(maxsize=None)
+def get_topic_cache() -> TopicCache:
+    """Return the process-wide topic cache"""
+    return TopicCache()
@@ -1,76 +1,367 @@
 """
 Crew configuration and execution
 """
-from typing import Dict
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
 from crewai import Crew, Process
 
-from .agents import (
-    topic_analyzer,
-    web_researcher,
-    content_analyst,
-    quality_controller,
-    content_curator
-)
-from .tasks import create_tasks_for_topic
+from config.settings import PREFETCH_ENABLED
+from .tasks import TASK_TEMPLATES, build_task_templates, task_inputs
+from .cache import get_topic_cache
+from .usage import BudgetExceeded, RunUsage, start_run
+from .streaming import TokenStreamer, set_streamer
+from .prefetch import Prefetcher
+from .singleflight import SingleFlight, start_flight, end_flight
+from .ranking import rank_resources, format_candidates
+from .deadline import DeadlineExceeded, current_deadline, enter_stage, reset_stage
+from .metrics import tracked_run
+from .url_index import URLIndex, filter_curated_urls, start_url_index
+from .query_planner import QueryPlan, plan_queries, record_plan, search_result_urls
+from .profiling import profile_stage
+
+# Candidates from the prefetched searches given to the research task
+RANKED_CANDIDATES = 15
+
+# Share of the remaining run deadline each agent's task gets; the slice
+# bounds its tool calls, while LLM calls only stop at the run deadline
+STAGE_SHARES = {
+    'topic_analyzer': 0.15,
+    'web_researcher': 0.4,
+    'content_analyst': 0.4,
+    'quality_controller': 0.4,
+    'content_curator': 1.0,
+}
+
+
+def task_output_text(task) -> Optional[str]:
+    """Return the text output of a finished task, or None if it has not run"""
+    output = getattr(task, 'output', None)
+    if output is None:
+        return None
+    return getattr(output, 'raw', None) or getattr(output, 'raw_output', None) or str(output)
+
+
+def partial_content(tasks: List, reason: str) -> str:
+    """
+    Build the best available document from the tasks that finished
+
+    Args:
+        tasks: Crew tasks in execution order
+        reason: Why the run stopped early
+
+    Returns:
+        Output of the last finished task with a note of what was skipped
+    """
+    finished = [(task, task_output_text(task)) for task in tasks]
+    done = [text for _, text in finished if text]
+    skipped = [task.agent.role for task, text in finished if not text]
+    note = f"> ⚠️ Resultado parcial: {reason}. Tareas omitidas: {', '.join(skipped) or 'ninguna'}\n\n"
+    return note + (done[-1] if done else "")
+
+
+def check_urls(content: str, urls: URLIndex, usage: RunUsage) -> str:
+    """
+    Fix or drop the resources of the final document whose URL no tool
+    returned during the run (offline, see url_index.filter_curated_urls)
+
+    Args:
+        content: Final document
+        urls: The run's URL index
+        usage: Run accounting that gets the replaced/rejected counts
+
+    Returns:
+        Filtered document
+    """
+    content, stats = filter_curated_urls(content, urls)
+    usage.counters['urls_replaced'] += stats['replaced']
+    usage.counters['urls_rejected'] += stats['rejected']
+    return content
+
+
+def observe_searches(plan: QueryPlan, flight: SingleFlight):
+    """
+    Feed the plan with the searches of the run that match one of its
+    templates (prefetched or issued by the web_researcher)
+
+    Args:
+        plan: Query plan of the run
+        flight: Run's single-flight scope holding the search results
+    """
+    for template in plan.templates:
+        future = flight.get('web_search', plan.query(template))
+        if future and future.done() and not future.cancelled():
+            plan.observe(template, search_result_urls(future.result()))
+
+
+def ranked_pre_context(topic: str, prefetcher: Prefetcher) -> str:
+    """
+    Rank the prefetched search results locally for the research task
+
+    Args:
+        topic: Topic being curated
+        prefetcher: Prefetcher of the run
+
+    Returns:
+        Prompt block listing the best candidates, or "" if none finished yet
+    """
+    ranked = rank_resources(prefetcher.prefetched_results(), topic, k=RANKED_CANDIDATES)
+    if not ranked:
+        return ""
+    return (
+        "\n        PRE-RANKED CANDIDATES (already returned by web_search and ranked locally by\n"
+        "        quality, relevance and domain diversity). Start from these and complete the list:\n"
+        + "".join(f"        {line}\n" for line in format_candidates(ranked).splitlines())
+    )
+
+
+class CrewPool:
+    """
+    Idle pre-built crews whose tasks are "{topic}" templates
+
+    Building the agents, tasks and Crew happens once per concurrent run
+    instead of once per run: a crew is held by one run at a time and goes
+    back to the pool afterwards, so the pool only grows to the peak
+    number of simultaneous runs (see server.py).
+    """
+
+    def __init__(self, profile: Optional[str] = None, stream_final: bool = False,
+                 topic_first: bool = False):
+        """
+        Args:
+            profile: Model routing profile of the agents
+            stream_final: Give the final curation task a streaming LLM
+            topic_first: Use the old topic-first prompt layout (benchmarks only)
+        """
+        self.profile = profile
+        self.stream_final = stream_final
+        self.topic_first = topic_first
+        self.built = 0
+        self._idle: List[Crew] = []
+        self._lock = threading.Lock()
+
+    def build(self) -> Crew:
+        tasks = build_task_templates(self.profile, self.stream_final, self.topic_first)
+        return Crew(
+            agents=list(dict.fromkeys(task.agent for task in tasks)),
+            tasks=tasks,
+            process=Process.sequential,
+            verbose=True
+        )
+
+    def acquire(self) -> Crew:
+        """Take an idle crew, building a new one if all are in use"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            self.built += 1
+        return self.build()
+
+    def release(self, crew: Crew):
+        """Clear the run's outputs and callbacks and return the crew to the pool"""
+        # Kickoff copies the crew callbacks onto tasks and agents only when
+        # those are unset, so the per-run ones are cleared where they live
+        for task in crew.tasks:
+            task.output = None
+            task.callback = None
+        for agent in crew.agents:
+            agent.step_callback = None
+        crew.task_callback = None
+        crew.step_callback = None
+        with self._lock:
+            self._idle.append(crew)
+
+
+@lru_cache(maxsize=None)
+def get_crew_pool(profile: Optional[str] = None, stream_final: bool = False) -> CrewPool:
+    """Return the process-wide crew pool of a routing profile"""
+    return CrewPool(profile, stream_final)
 
 
 class ContentCurationCrew:
     """Main crew for content curation"""
     
-    def __init__(self):
-        """Initialize the crew with agents"""
-        self.agents = [
-            topic_analyzer,
-            web_researcher,
-            content_analyst,
-            quality_controller,
-            content_curator
-        ]
+    def __init__(self, profile: Optional[str] = None):
+        """
+        Initialize the crew runner (agents are built per pooled crew)
+        
+        Args:
+            profile: Model routing profile (defaults to LLM_ROUTING_PROFILE)
+        """
+        self.profile = profile
     
-    def create_crew(self, topic: str) -> Crew:
+    def create_crew(self, topic: str, usage: Optional[RunUsage] = None,
+                    stream_final: bool = False,
+                    pre_context: Optional[Callable[[], str]] = None) -> Crew:
         """
-        Create a crew for the given topic
+        Take a pre-built crew from the pool and set it up for one run
+        
+        The run is bound by crew.kickoff(inputs=task_inputs(...)); hand
+        the crew back with release_crew once the run is over.
         
         Args:
             topic: Educational topic to curate
+            usage: Run accounting to attribute LLM calls to the active agent
+            stream_final: Stream the final curation task token by token
+            pre_context: Called when topic analysis finishes; its text is
+                appended to the research task
             
         Returns:
-            Configured Crew instance
+            Crew instance held by this run
         """
-        tasks = create_tasks_for_topic(topic)
+        crew = get_crew_pool(self.profile, stream_final).acquire()
+        tasks = crew.tasks
+        names = [template['agent'] for template in TASK_TEMPLATES]
+        # Tasks run sequentially, so the active agent is the one owning
+        # the first task that has not finished yet
+        finished = []
         
-        return Crew(
-            agents=self.agents,
-            tasks=tasks,
-            process=Process.sequential,
-            verbose=True
-        )
+        def task_callback(output):
+            finished.append(output)
+            if len(finished) < len(tasks):
+                name = names[len(finished)]
+                if usage:
+                    usage.current_agent = name
+                if deadline:
+                    enter_stage(name, STAGE_SHARES.get(name, 1.0))
+            if pre_context and len(finished) == 1:
+                extra = pre_context()
+                if extra:
+                    # Appended after kickoff bound the topic; the next
+                    # kickoff re-renders the description from its template
+                    tasks[1].description += extra
+        
+        if usage:
+            usage.current_agent = names[0]
+            
+            def step_callback(step):
+                usage.check_budget()
+            
+            for agent in crew.agents:
+                agent.step_callback = step_callback
+        deadline = current_deadline()
+        if usage or pre_context or deadline:
+            for task in tasks:
+                task.callback = task_callback
+        return crew
+    
+    def release_crew(self, crew: Crew, stream_final: bool = False):
+        """Return a crew taken by create_crew to the pool"""
+        get_crew_pool(self.profile, stream_final).release(crew)
     
-    def run(self, topic: str) -> Dict:
+    @tracked_run('crew')
+    def run(self, topic: str, force: bool = False, run_id: Optional[str] = None,
+            usage: Optional[RunUsage] = None, streamer: Optional[TokenStreamer] = None) -> Dict:
         """
         Execute the content curation process
         
         Args:
             topic: Educational topic to curate
+            force: Ignore any cached curation of an equivalent topic
+            run_id: Run identifier used for usage accounting
+            usage: Run accounting (started here if not provided)
+            streamer: Receives the final task's tokens as they are generated
             
         Returns:
             Dictionary with results
         """
+        usage = usage or start_run(run_id or topic)
+        set_streamer(streamer)
+        crew = None
+        prefetcher = None
+        # Identical tool calls within the run (including prefetched ones)
+        # share a single execution
+        flight = start_flight()
+        # Every URL returned by search and scrape calls, to catch invented ones
+        urls = start_url_index()
         try:
-            crew = self.create_crew(topic)
-            result = crew.kickoff()
+            cache = get_topic_cache()
+            cached = None if force else cache.lookup(topic, 'crew')
+            if cached:
+                return {
+                    'success': True,
+                    'topic': topic,
+                    'content': cached['content'],
+                    'cached': True,
+                    'partial': False,
+                    'usage': usage,
+                    'error': None
+                }
+            
+            # The research task runs the planned queries only: the crew
+            # cannot stop an agent once enough URLs were found
+            plan = plan_queries(topic, run_id=run_id)
+            # Fire the research queries while topic analysis runs
+            if PREFETCH_ENABLED:
+                prefetcher = Prefetcher(topic, flight, plan.planned_queries)
+                prefetcher.start()
+            
+            pre_context = (lambda: ranked_pre_context(topic, prefetcher)) if prefetcher else None
+            crew = self.create_crew(topic, usage, stream_final=streamer is not None, pre_context=pre_context)
+            # The first task's slice starts here; task_callback moves to the next ones
+            first_agent = TASK_TEMPLATES[0]['agent']
+            stage_token = enter_stage(first_agent, STAGE_SHARES.get(first_agent, 1.0))
+            try:
+                # Tool calls made by the agents are profiled as their own stages
+                with profile_stage('llm'):
+                    result = crew.kickoff(inputs=task_inputs(topic, plan.planned_queries))
+            finally:
+                reset_stage(stage_token)
+                if prefetcher:
+                    prefetcher.stop()
+                observe_searches(plan, flight)
+                record_plan(plan, 'crew')
+                print(f"🧭 Query planner: {plan.summary()}")
+                usage.counters['prefetch_hits'] += flight.stats['seeded_hits']
+                usage.counters['singleflight_collapsed'] += flight.collapsed
+                if streamer:
+                    streamer.close()
+                    if streamer.time_to_first_token is not None:
+                        usage.timings['time_to_first_token'] = round(streamer.time_to_first_token, 3)
+            # Tool calls skipped by a stage deadline leave gaps in the result
+            content = check_urls(str(result), urls, usage)
+            deadline = current_deadline()
+            note = deadline.note() if deadline else ""
+            if note:
+                content = note + content
+            else:
+                cache.store(topic, 'crew', content)
             
             return {
                 'success': True,
                 'topic': topic,
-                'content': result,
+                'content': content,
+                'cached': False,
+                'partial': bool(note),
+                'usage': usage,
                 'error': None
             }
             
         except Exception as e:
+            # CrewAI may wrap BudgetExceeded and DeadlineExceeded, so rely
+            # on the usage flag and the deadline too
+            deadline = current_deadline()
+            if (isinstance(e, (BudgetExceeded, DeadlineExceeded)) or usage.budget_exceeded
+                    or (deadline and deadline.root.expired())):
+                return {
+                    'success': True,
+                    'topic': topic,
+                    'content': check_urls(partial_content(crew.tasks if crew else [], str(e)), urls, usage),
+                    'cached': False,
+                    'partial': True,
+                    'usage': usage,
+                    'error': None
+                }
             return {
                 'success': False,
                 'topic': topic,
                 'content': None,
+                'cached': False,
+                'partial': False,
+                'usage': usage,
                 'error': str(e)
-            }
\ No newline at end of file
+            }
+        finally:
+            end_flight()
+            if crew is not None:
+                self.release_crew(crew, stream_final=streamer is not None)
\ No newline at end of file
@@ -0,0 +1,196 @@
+"""
+Structured resource rows of every run, stored as date-partitioned JSONL
+"""
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from config.settings import DATASET_DIR, DATASET_ENABLED
+from .cache import normalize_topic
+
+
+# Columns of a resource row, in order
+RESOURCE_COLUMNS = [
+    'topic', 'topic_key', 'run_id', 'mode', 'created', 'rank', 'url', 'domain',
+    'title', 'language', 'level', 'source', 'quality', 'rank_score',
+]
+
+# "**Field:** value" lines of a curated resource (see task_curate / src.formatting.format_resource)
+FIELD_PATTERN = re.compile(r'^\*\*(Título Original|URL|Idioma|Autor/Fuente|Nivel|Relevancia):\*\*\s*(.*)$')
+FIELD_KEYS = {
+    'Título Original': 'title',
+    'URL': 'url',
+    'Idioma': 'language',
+    'Autor/Fuente': 'source',
+    'Nivel': 'level',
+    'Relevancia': 'description',
+}
+HEADING_PATTERN = re.compile(r'^###\s*(\d+)\.')
+TOPIC_PATTERN = re.compile(r'^# (?:RECURSOS CURADOS - |Recursos Curados: )(.+)$', re.MULTILINE)
+
+
+def parse_curated_markdown(content: str) -> List[Dict]:
+    """
+    Parse the resources of a curated document
+
+    Args:
+        content: Markdown in the "### n." / "**Campo:** valor" format
+
+    Returns:
+        One dictionary per resource with rank, title, url, language, source,
+        level and description
+    """
+    resources = []
+    current = None
+    for line in content.splitlines():
+        line = line.strip()
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            current = {'rank': int(heading.group(1))}
+            resources.append(current)
+            continue
+        field = FIELD_PATTERN.match(line)
+        if field and current is not None:
+            current[FIELD_KEYS[field.group(1)]] = field.group(2).strip()
+    return [resource for resource in resources if resource.get('url')]
+
+
+def resource_rows(topic: str, run_id: str, mode: str, resources: Iterable[Dict],
+                  created: Optional[datetime] = None) -> List[Dict]:
+    """
+    Build dataset rows for the resources of a run
+
+    Args:
+        topic: Curated topic
+        run_id: Run identifier
+        mode: 'pipeline' (main_fixed), 'fast' (src.fast) or 'crew'
+        resources: Curated resources, best first
+        created: Run time (defaults to now)
+
+    Returns:
+        Rows with the RESOURCE_COLUMNS keys
+    """
+    created = (created or datetime.now()).isoformat(timespec='seconds')
+    rows = []
+    for position, resource in enumerate(resources, 1):
+        url = resource.get('url') or resource.get('link') or ''
+        netloc = urlparse(url).netloc.lower()
+        rows.append({
+            'topic': topic,
+            'topic_key': normalize_topic(topic),
+            'run_id': run_id,
+            'mode': mode,
+            'created': created,
+            'rank': resource.get('rank', position),
+            'url': url,
+            'domain': netloc[4:] if netloc.startswith('www.') else netloc,
+            'title': resource.get('title'),
+            'language': resource.get('language'),
+            'level': resource.get('level'),
+            'source': resource.get('source') or netloc,
+            'quality': resource.get('quality'),
+            'rank_score': resource.get('rank_score'),
+        })
+    return rows
+
+
+def write_rows(rows: List[Dict], run_id: str, dataset_dir: Path = DATASET_DIR,
+               created: Optional[datetime] = None) -> Path:
+    """
+    Write a run's rows to its own file in the day's partition
+
+    Files are written to a temporary name and renamed, so readers never see
+    a partial run.
+
+    Returns:
+        Path of the written file
+    """
+    partition = Path(dataset_dir) / f"date={(created or datetime.now()).strftime('%Y-%m-%d')}"
+    partition.mkdir(parents=True, exist_ok=True)
+    path = partition / f"{run_id}.jsonl"
+    tmp_path = path.with_suffix('.jsonl.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, path)
+    return path
+
+
+def record_run(topic: str, run_id: str, mode: str, content: Optional[str] = None,
+               resources: Optional[List[Dict]] = None) -> Optional[Path]:
+    """
+    Store the resource rows of a finished run, ignoring dataset errors
+
+    Args:
+        topic: Curated topic
+        run_id: Run identifier
+        mode: 'pipeline' (main_fixed), 'fast' (src.fast) or 'crew'
+        content: Curated markdown, parsed when resources are not given
+        resources: Curated resources with their scores
+
+    Returns:
+        Path of the written file, or None if nothing was written
+    """
+    if not DATASET_ENABLED:
+        return None
+    try:
+        if resources is None:
+            resources = parse_curated_markdown(str(content or ''))
+        if not resources:
+            return None
+        return write_rows(resource_rows(topic, run_id, mode, resources), run_id)
+    except Exception as e:
+        print(f"⚠️ Could not record dataset rows for {run_id}: {e}")
+        return None
+
+
+def backfill(root: Path, dataset_dir: Path = DATASET_DIR) -> int:
+    """
+    Add rows for curated documents written before the dataset existed
+
+    Args:
+        root: Directory searched recursively for .markdown/.md files
+        dataset_dir: Dataset location
+
+    Returns:
+        Number of runs added
+    """
+    existing = {path.stem for path in Path(dataset_dir).glob('date=*/*.jsonl')}
+    added = 0
+    for path in sorted(Path(root).rglob('*')):
+        # Files inside a project structure are named after their folder
+        run_id = path.parent.name if path.stem == 'full_content' else path.stem
+        if path.suffix not in ('.markdown', '.md') or run_id in existing or not path.is_file():
+            continue
+        content = path.read_text(encoding='utf-8', errors='ignore')
+        resources = parse_curated_markdown(content)
+        if not resources:
+            continue
+        topic_match = TOPIC_PATTERN.search(content)
+        topic = topic_match.group(1).strip() if topic_match else path.stem
+        created = datetime.fromtimestamp(path.stat().st_mtime)
+        rows = resource_rows(topic, run_id, 'unknown', resources, created)
+        write_rows(rows, run_id, dataset_dir, created)
+        added += 1
+    return added
+
+
+def load_resources(dataset_dir: Path = DATASET_DIR):
+    """
+    Load every resource row into a pandas DataFrame
+
+    Returns:
+        DataFrame with the RESOURCE_COLUMNS columns
+    """
+    import pandas as pd
+
+    files = sorted(Path(dataset_dir).glob('date=*/*.jsonl'))
+    rows = []
+    for path in files:
+        with open(path, encoding='utf-8') as f:
+            rows.extend(json.loads(line) for line in f if line.strip())
+    return pd.DataFrame.from_records(rows, columns=RESOURCE_COLUMNS)
@@ -0,0 +1,152 @@
+"""
+Run-level deadline with per-stage time slices
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import List, Optional
+
+from config.settings import RUN_DEADLINE
+
+# Error text of tool calls skipped or cut short by the deadline
+DEADLINE_MESSAGE = "run deadline exceeded"
+
+
+class DeadlineExceeded(Exception):
+    """Raised before new work once the run (or stage) deadline has passed"""
+
+
+class Deadline:
+    """
+    Time budget of a run, or a slice of it for one stage
+
+    Slices share the run's list of skipped work, so the final document can
+    say what the deadline left out.
+    """
+
+    def __init__(self, seconds: float, stage: str = 'run', parent: Optional['Deadline'] = None):
+        self.stage = stage
+        self.parent = parent
+        self.root = parent.root if parent else self
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        if parent:
+            self.expires_at = min(self.expires_at, parent.expires_at)
+        else:
+            self.skipped: List[str] = []
+            self.exceeded = False
+            self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def slice(self, stage: str, share: float) -> 'Deadline':
+        """
+        Deadline for a stage getting a share of the time left
+
+        Args:
+            stage: Stage name used in the partial-result note
+            share: Fraction of the remaining time (1 gives the stage all of it)
+
+        Returns:
+            Child deadline, never later than this one
+        """
+        return Deadline(self.remaining() * share, stage, self)
+
+    def skip(self, what: str):
+        """Record work left out because this deadline passed"""
+        root = self.root
+        with root._lock:
+            root.exceeded = True
+            entry = f"{what} ({self.stage})"
+            if entry not in root.skipped:
+                root.skipped.append(entry)
+
+    def check(self, what: str = 'LLM call'):
+        """Raise DeadlineExceeded (recording the skipped work) if the deadline passed"""
+        if self.expired():
+            self.skip(what)
+            raise DeadlineExceeded(f"Deadline of {self.root.seconds:.0f}s exceeded in stage '{self.stage}'")
+
+    def note(self) -> str:
+        """Markdown note for a partial document ('' if nothing was skipped)"""
+        root = self.root
+        if not root.exceeded:
+            return ""
+        return (f"> ⚠️ Resultado parcial: plazo de {root.seconds:.0f}s agotado. "
+                f"Omitido: {'; '.join(root.skipped) or 'nada'}\n\n")
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar('current_deadline', default=None)
+
+
+def start_deadline(seconds: float = RUN_DEADLINE) -> Optional[Deadline]:
+    """Start the run deadline in the current context (none when seconds is 0)"""
+    deadline = Deadline(seconds) if seconds and seconds > 0 else None
+    _current_deadline.set(deadline)
+    return deadline
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline of the active stage (or run), if any"""
+    return _current_deadline.get()
+
+
+def enter_stage(stage: str, share: float) -> Optional[Token]:
+    """
+    Make a slice of the run deadline the active one in this context
+
+    Returns:
+        Token for reset_stage, or None when there is no deadline
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return None
+    return _current_deadline.set(deadline.root.slice(stage, share))
+
+
+def reset_stage(token: Optional[Token]):
+    if token is not None:
+        _current_deadline.reset(token)
+
+
+@contextmanager
+def stage(name: str, share: float):
+    """Run a block with a slice of the run deadline (see Deadline.slice)"""
+    token = enter_stage(name, share)
+    try:
+        yield current_deadline()
+    finally:
+        reset_stage(token)
+
+
+def call_timeout(default: Optional[float]) -> Optional[float]:
+    """Per-call timeout: the default (None = no timeout), shortened to what is left of the stage"""
+    deadline = current_deadline()
+    if deadline is None:
+        return default
+    return deadline.remaining() if default is None else min(default, deadline.remaining())
+
+
+def deadline_expired() -> bool:
+    """Whether the active deadline has passed (for telling deadline cuts from real failures)"""
+    deadline = current_deadline()
+    return deadline is not None and deadline.expired()
+
+
+def deadline_passed(what: str) -> bool:
+    """
+    Whether the active deadline has passed, recording the skipped work if so
+
+    Args:
+        what: Description of the work that would be skipped
+    """
+    deadline = current_deadline()
+    if deadline is None or not deadline.expired():
+        return False
+    deadline.skip(what)
+    return True
@@ -0,0 +1,231 @@
+"""
+Domain reliability store: rolling success rate, latency and last failure of
+every domain the scraper and the URL validator have contacted
+"""
+import asyncio
+import json
+import sqlite3
+import statistics
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from config.settings import (
+    DOMAIN_RELIABILITY_ENABLED, DOMAIN_RELIABILITY_PATH, DOMAIN_HALF_LIFE,
+    DOMAIN_MIN_ATTEMPTS, DOMAIN_SKIP_BELOW
+)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS domain_stats (
+    domain TEXT PRIMARY KEY,
+    successes REAL NOT NULL,
+    failures REAL NOT NULL,
+    latencies TEXT NOT NULL,
+    last_failure REAL,
+    last_error TEXT,
+    updated REAL NOT NULL
+);
+"""
+
+# Successful response times kept per domain for the median
+LATENCY_SAMPLES = 20
+
+# Error of a rate-limited call, which is not held against the domain
+THROTTLED = 'HTTP 429'
+
+
+def url_domain(url: str) -> str:
+    netloc = urlparse(url).netloc.lower()
+    return netloc[4:] if netloc.startswith('www.') else netloc
+
+
+def response_outcome(status: int) -> Tuple[bool, Optional[str]]:
+    """
+    Domain outcome of an HTTP response
+    
+    Only server errors count against the domain: a 404 or 403 is about the
+    URL, not the site, and a 429 is left to the adaptive limiter.
+    
+    Args:
+        status: HTTP status code
+        
+    Returns:
+        (success, error) for record_outcome
+    """
+    if status == 429:
+        return False, THROTTLED
+    if status >= 500:
+        return False, f"HTTP {status}"
+    return True, None
+
+
+def is_domain_failure(error: BaseException) -> bool:
+    """Whether a failed request says the domain is down (transport errors and timeouts)"""
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError))
+
+
+def decay_factor(age: float, half_life: float = DOMAIN_HALF_LIFE) -> float:
+    """Weight left to an outcome observed age seconds ago (1 when decay is off)"""
+    return 0.5 ** (max(age, 0) / half_life) if half_life > 0 else 1.0
+
+
+class DomainStore:
+    """Per-domain outcomes of scrapes and URL checks, decayed over time"""
+
+    def __init__(self, path: Path = DOMAIN_RELIABILITY_PATH, half_life: float = DOMAIN_HALF_LIFE,
+                 min_attempts: float = DOMAIN_MIN_ATTEMPTS, skip_below: float = DOMAIN_SKIP_BELOW):
+        self.path = Path(path)
+        self.half_life = half_life
+        self.min_attempts = min_attempts
+        self.skip_below = skip_below
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def record(self, outcomes: Iterable[Tuple[str, bool, float, Optional[str]]]):
+        """
+        Add scrape or validation outcomes
+
+        Args:
+            outcomes: (url, success, seconds, error) tuples; the seconds of
+                successful calls feed the median latency
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for url, ok, seconds, error in outcomes:
+                    domain = url_domain(url)
+                    # Rate limiting is left to the adaptive limiter: the domain is alive
+                    if not domain or error == THROTTLED:
+                        continue
+                    row = conn.execute("SELECT * FROM domain_stats WHERE domain = ?", (domain,)).fetchone()
+                    successes, failures, latencies, last_failure, last_error = 0.0, 0.0, [], None, None
+                    if row:
+                        factor = decay_factor(now - row['updated'], self.half_life)
+                        successes = row['successes'] * factor
+                        failures = row['failures'] * factor
+                        latencies = json.loads(row['latencies'])
+                        last_failure, last_error = row['last_failure'], row['last_error']
+                    if ok:
+                        successes += 1
+                        latencies = (latencies + [round(seconds, 3)])[-LATENCY_SAMPLES:]
+                    else:
+                        failures += 1
+                        last_failure, last_error = now, error
+                    conn.execute(
+                        "INSERT OR REPLACE INTO domain_stats "
+                        "(domain, successes, failures, latencies, last_failure, last_error, updated) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (domain, successes, failures, json.dumps(latencies), last_failure, last_error, now)
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _stats(self, row: sqlite3.Row, now: float) -> Dict:
+        factor = decay_factor(now - row['updated'], self.half_life)
+        successes = row['successes'] * factor
+        failures = row['failures'] * factor
+        attempts = successes + failures
+        latencies = json.loads(row['latencies'])
+        stats = {
+            'domain': row['domain'],
+            'attempts': round(attempts, 2),
+            'success_rate': round(successes / attempts, 3) if attempts else None,
+            'median_latency': statistics.median(latencies) if latencies else None,
+            'last_failure': row['last_failure'],
+            'last_error': row['last_error'],
+        }
+        # As old failures decay the domain drops under min_attempts and is tried again
+        stats['unreliable'] = (
+            stats['attempts'] >= self.min_attempts and stats['success_rate'] < self.skip_below
+        )
+        return stats
+
+    def get(self, url_or_domain: str) -> Optional[Dict]:
+        """Decayed statistics of a domain, or None if it was never contacted"""
+        domain = url_domain(url_or_domain) if '//' in url_or_domain else url_or_domain.lower()
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM domain_stats WHERE domain = ?", (domain,)).fetchone()
+        return self._stats(row, time.time()) if row else None
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Decayed statistics of every known domain, for filtering many candidates at once"""
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM domain_stats").fetchall()
+        return {row['domain']: self._stats(row, now) for row in rows}
+
+
+@lru_cache(maxsize=None)
+def get_domain_store() -> DomainStore:
+    """Return the process-wide domain reliability store"""
+    return DomainStore()
+
+
+def record_outcomes(outcomes: Iterable[Tuple[str, bool, float, Optional[str]]]):
+    """Record outcomes in the domain store, ignoring store errors"""
+    if not DOMAIN_RELIABILITY_ENABLED:
+        return
+    try:
+        get_domain_store().record(outcomes)
+    except Exception as e:
+        print(f"⚠️ Could not update domain reliability: {e}")
+
+
+def record_outcome(url: str, ok: bool, seconds: float, error: Optional[str] = None):
+    """Record a single scrape or URL check"""
+    record_outcomes([(url, ok, seconds, error)])
+
+
+def domain_snapshot() -> Dict[str, Dict]:
+    """Statistics of every known domain ({} when disabled or unavailable)"""
+    if not DOMAIN_RELIABILITY_ENABLED:
+        return {}
+    try:
+        return get_domain_store().snapshot()
+    except Exception as e:
+        print(f"⚠️ Could not read domain reliability: {e}")
+        return {}
+
+
+def is_unreliable(url: str, snapshot: Optional[Dict[str, Dict]] = None) -> bool:
+    """
+    Whether to skip a URL before any network work
+
+    Args:
+        url: Candidate URL
+        snapshot: Output of domain_snapshot, to avoid one query per URL
+
+    Returns:
+        True if the URL's domain keeps failing
+    """
+    if snapshot is not None:
+        stats = snapshot.get(url_domain(url))
+    elif not DOMAIN_RELIABILITY_ENABLED:
+        return False
+    else:
+        try:
+            stats = get_domain_store().get(url)
+        except Exception as e:
+            print(f"⚠️ Could not read domain reliability: {e}")
+            return False
+    return bool(stats and stats['unreliable'])
@@ -0,0 +1,213 @@
+"""
+Readability-style main-content extraction built directly on lxml
+"""
+import re
+from typing import Dict, List, Optional, Union
+
+from lxml import etree, html as lxml_html
+
+from config.settings import SCRAPE_MAX_CHARS, SCRAPE_KEEP_TITLE, SCRAPE_KEEP_HEADINGS, SCRAPE_KEEP_CODE
+from .profiling import profiled
+
+
+# Elements that never hold main content
+DROP_TAGS = [
+    'script', 'style', 'noscript', 'iframe', 'form', 'svg', 'canvas', 'button',
+    'input', 'select', 'textarea', 'nav', 'footer', 'aside', 'template',
+]
+
+# class/id hints for boilerplate and for content containers
+NEGATIVE_HINTS = re.compile(
+    r'cookie|consent|gdpr|banner|navbar|nav-|menu|footer|sidebar|share|social|comment|'
+    r'related|advert|\bads?\b|promo|newsletter|subscribe|popup|modal|breadcrumb|masthead|widget',
+    re.IGNORECASE
+)
+POSITIVE_HINTS = re.compile(r'article|content|main|post|entry|body|text|tutorial|lesson|docs?\b', re.IGNORECASE)
+
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+CODE_TAGS = {'pre'}
+# Blocks whose text is emitted as a unit
+BLOCK_TAGS = HEADING_TAGS | CODE_TAGS | {'p', 'li', 'blockquote', 'td', 'dd', 'dt', 'figcaption'}
+# Blocks that contribute to a container's score
+SCORED_TAGS = ['p', 'pre', 'blockquote', 'td', 'li']
+
+MIN_BLOCK_CHARS = 25
+WHITESPACE = re.compile(r'\s+')
+
+
+def _normalize(text: str) -> str:
+    return WHITESPACE.sub(' ', text).strip()
+
+
+def _hints(element) -> str:
+    return f"{element.get('class', '')} {element.get('id', '')}"
+
+
+def _class_weight(element) -> int:
+    hints = _hints(element)
+    weight = 0
+    if NEGATIVE_HINTS.search(hints):
+        weight -= 25
+    if POSITIVE_HINTS.search(hints):
+        weight += 25
+    return weight
+
+
+def _link_density(element, text_length: int) -> float:
+    if not text_length:
+        return 1.0
+    link_length = sum(len(_normalize(link.text_content())) for link in element.iter('a'))
+    return min(1.0, link_length / text_length)
+
+
+def _remove_boilerplate(root):
+    """Drop non-content tags and elements flagged as boilerplate by class/id"""
+    etree.strip_elements(root, *DROP_TAGS, etree.Comment, with_tail=False)
+    for element in list(root.iter('header', 'div', 'section', 'ul', 'table', 'span')):
+        if element.getparent() is None:
+            continue
+        hints = _hints(element)
+        if NEGATIVE_HINTS.search(hints) and not POSITIVE_HINTS.search(hints):
+            element.drop_tree()
+    # Page headers are boilerplate unless they sit inside the article
+    for element in list(root.iter('header')):
+        if element.getparent() is not None and not any(
+                ancestor.tag in ('article', 'main') for ancestor in element.iterancestors()):
+            element.drop_tree()
+
+
+def _best_candidate(root):
+    """Score containers by the paragraphs they hold and return the best one"""
+    for container in root.iter('article', 'main'):
+        if len(_normalize(container.text_content())) >= 200:
+            return container
+
+    scores: Dict = {}
+    for block in root.iter(*SCORED_TAGS):
+        text = _normalize(block.text_content())
+        if len(text) < MIN_BLOCK_CHARS:
+            continue
+        score = 1 + text.count(',') + min(len(text) // 100, 3)
+        parent = block.getparent()
+        grandparent = parent.getparent() if parent is not None else None
+        for ancestor, share in ((parent, 1.0), (grandparent, 0.5)):
+            if ancestor is None or ancestor.tag in ('html', 'body'):
+                continue
+            if ancestor not in scores:
+                scores[ancestor] = _class_weight(ancestor)
+            scores[ancestor] += score * share
+
+    best, best_score = None, 0.0
+    for element, score in scores.items():
+        score *= 1 - _link_density(element, len(_normalize(element.text_content())))
+        if score > best_score:
+            best, best_score = element, score
+    if best is None:
+        return root.find('body') if root.find('body') is not None else root
+    # Include siblings when the article is split across containers
+    parent = best.getparent()
+    if parent is not None and parent.tag != 'body':
+        siblings = [s for s in parent if s in scores and scores[s] >= best_score * 0.3]
+        if len(siblings) > 1:
+            return parent
+    return best
+
+
+def _page_title(root) -> str:
+    for path in ('.//meta[@property="og:title"]', './/meta[@name="twitter:title"]'):
+        meta = root.find(path)
+        if meta is not None and meta.get('content'):
+            return _normalize(meta.get('content'))
+    title = root.find('.//title')
+    if title is not None and title.text_content().strip():
+        return _normalize(title.text_content())
+    heading = root.find('.//h1')
+    return _normalize(heading.text_content()) if heading is not None else ''
+
+
+def _nested_block(element, container) -> bool:
+    """Nested blocks are emitted as part of their outermost block"""
+    for ancestor in element.iterancestors():
+        if ancestor is container:
+            return False
+        if ancestor.tag in BLOCK_TAGS:
+            return True
+    return False
+
+
+def _blocks(container, keep_headings: bool, keep_code: bool) -> List[str]:
+    """Render the container's blocks in document order"""
+    blocks = []
+    for element in container.iter(*BLOCK_TAGS):
+        if _nested_block(element, container):
+            continue
+        if element.tag in CODE_TAGS:
+            if keep_code:
+                code = element.text_content().strip('\n')
+                if code.strip():
+                    blocks.append(f"```\n{code}\n```")
+            continue
+        text = _normalize(element.text_content())
+        if not text:
+            continue
+        if element.tag in HEADING_TAGS:
+            if keep_headings:
+                blocks.append(f"{'#' * int(element.tag[1])} {text}")
+            continue
+        if element.tag == 'li':
+            text = f"- {text}"
+        blocks.append(text)
+
+    if not blocks:
+        text = _normalize(container.text_content())
+        if text:
+            blocks.append(text)
+    return blocks
+
+
+def truncate_text(text: str, max_chars: Optional[int]) -> str:
+    """Cut text to max_chars at a word boundary, marking the cut with '...'"""
+    if not max_chars or len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    space = cut.rfind(' ')
+    if space > max_chars * 0.8:
+        cut = cut[:space]
+    return cut.rstrip() + "..."
+
+
+@profiled('parse')
+def extract_main_content(page: Union[str, bytes], max_chars: Optional[int] = SCRAPE_MAX_CHARS,
+                         keep_title: bool = SCRAPE_KEEP_TITLE, keep_headings: bool = SCRAPE_KEEP_HEADINGS,
+                         keep_code: bool = SCRAPE_KEEP_CODE) -> Dict:
+    """
+    Extract the main content of an HTML page, leaving out navigation,
+    footers, cookie banners and other boilerplate
+
+    Args:
+        page: Raw HTML (bytes let lxml honour the declared encoding)
+        max_chars: Character budget for the text (None for no limit)
+        keep_title: Start the text with the page title
+        keep_headings: Keep section headings as markdown headings
+        keep_code: Keep code blocks as fenced blocks
+
+    Returns:
+        Dictionary with title, text (within the budget) and full_text
+    """
+    if not page or not page.strip():
+        return {'title': '', 'text': '', 'full_text': ''}
+    try:
+        root = lxml_html.document_fromstring(page)
+    except (etree.ParserError, ValueError):
+        # Unicode strings with an encoding declaration are rejected by lxml
+        root = lxml_html.document_fromstring(page.encode('utf-8') if isinstance(page, str) else page)
+
+    title = _page_title(root)
+    _remove_boilerplate(root)
+    blocks = _blocks(_best_candidate(root), keep_headings, keep_code)
+    # The article's own h1 already serves as its title
+    if keep_title and title and not (blocks and blocks[0].startswith('# ')):
+        blocks.insert(0, f"# {title}")
+
+    full_text = '\n\n'.join(blocks)
+    return {'title': title, 'text': truncate_text(full_text, max_chars), 'full_text': full_text}
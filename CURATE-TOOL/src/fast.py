@@ -0,0 +1,250 @@
+"""
+Fast curation mode: deterministic search, ranking and formatting with at most
+one batched LLM call for the "Relevancia" texts
+"""
+import asyncio
+import json
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .aio import run_sync
+from .cache import get_topic_cache
+from .deadline import DeadlineExceeded, current_deadline, stage
+from .formatting import format_header, format_resource, format_summary, parse_search_result
+from .llm import llm_for_agent
+from .metrics import tracked_run
+from .profiling import profile_stage, profiled
+from .query_planner import plan_queries, record_plan, search_result_urls
+from .ranking import rank_resources
+from .tools import search_web_async
+from .usage import BudgetExceeded, RunUsage, current_run, start_run
+
+# Number of resources in the curated list
+TARGET_RESOURCES = 10
+
+# Share of the remaining run deadline given to each stage
+SEARCH_SHARE = 0.7
+RELEVANCE_SHARE = 1.0
+
+RELEVANCE_PROMPT = """Eres un curador experto de contenido educativo sobre "{topic}".
+Para cada recurso de la lista, escribe en español una explicación breve (máximo 200 caracteres)
+de por qué es valioso, qué se aprende y para quién es.
+
+Responde SOLO con un array JSON de {count} strings, en el mismo orden que la lista.
+
+{resources}
+"""
+
+
+def search_candidates(topic: str, run_id: Optional[str] = None) -> List[Dict]:
+    """
+    Run the planned queries concurrently, then the reserve queries one at a
+    time while fewer than the planner's target unique URLs were found
+
+    Args:
+        topic: Topic being curated
+        run_id: Run identifier the query yields are recorded under
+
+    Returns:
+        Parsed search results of every executed query
+    """
+    plan = plan_queries(topic, run_id=run_id)
+    results = []
+
+    async def search(templates):
+        found = await asyncio.gather(*(search_web_async(plan.query(template)) for template in templates))
+        for template, result in zip(templates, found):
+            plan.observe(template, search_result_urls(result))
+            results.append(result)
+
+    try:
+        with profile_stage('search'):
+            run_sync(search(plan.planned))
+        for template in plan.templates[len(plan.planned):]:
+            if plan.enough():
+                break
+            with profile_stage('search'):
+                run_sync(search([template]))
+    finally:
+        record_plan(plan, 'fast')
+        print(f"🧭 Query planner: {plan.summary()}")
+
+    return [resource for result in results for resource in parse_search_result(result)]
+
+
+def parse_relevance(text: str, count: int) -> Optional[List[str]]:
+    """Extract the JSON array of relevance texts from the LLM answer"""
+    match = re.search(r'\[.*\]', text or '', re.DOTALL)
+    if not match:
+        return None
+    try:
+        texts = json.loads(match.group(0))
+    except ValueError:
+        return None
+    if not isinstance(texts, list) or len(texts) != count:
+        return None
+    return [str(item).strip() for item in texts]
+
+
+@profiled('llm')
+def write_relevance(topic: str, resources: List[Dict]) -> bool:
+    """
+    Replace each resource's description with a Spanish relevance text,
+    generated for the whole list in a single LLM call
+
+    Args:
+        topic: Topic being curated
+        resources: Selected resources (updated in place)
+
+    Returns:
+        True if the texts were generated, False if the snippets were kept
+    """
+    listing = "\n".join(
+        f"{i}. {resource['title']} ({resource['url']}): {resource['description']}"
+        for i, resource in enumerate(resources, 1)
+    )
+    prompt = RELEVANCE_PROMPT.format(topic=topic, count=len(resources), resources=listing)
+    deadline = current_deadline()
+    try:
+        llm = llm_for_agent('content_curator')
+        if deadline:
+            # Cancel the request if it outlives the stage
+            response = run_sync(asyncio.wait_for(llm.ainvoke(prompt), deadline.remaining()))
+        else:
+            response = llm.invoke(prompt)
+    except BudgetExceeded:
+        print("⚠️ Run budget exceeded: keeping search snippets as Relevancia")
+        return False
+    except (DeadlineExceeded, asyncio.TimeoutError) as e:
+        if deadline is None:
+            # asyncio.TimeoutError is the builtin TimeoutError: without a
+            # deadline this is a plain network timeout of the LLM client
+            print(f"⚠️ Relevancia generation timed out ({e}): keeping search snippets")
+            return False
+        deadline.skip("textos de Relevancia")
+        print("⚠️ Run deadline reached: keeping search snippets as Relevancia")
+        return False
+    except Exception as e:
+        print(f"⚠️ Relevancia generation failed ({e}): keeping search snippets")
+        return False
+
+    texts = parse_relevance(getattr(response, 'content', str(response)), len(resources))
+    if texts is None:
+        print("⚠️ Unexpected Relevancia answer: keeping search snippets")
+        return False
+    for resource, text in zip(resources, texts):
+        resource['description'] = text
+    return True
+
+
+@tracked_run('fast')
+def curate_fast(topic: str, force: bool = False, usage: Optional[RunUsage] = None,
+                relevance: bool = True, run_id: Optional[str] = None) -> Dict:
+    """
+    Curate a topic without the agent crew
+
+    Args:
+        topic: Educational topic to curate
+        force: Ignore any cached curation of an equivalent topic
+        usage: Run accounting (the current run, or a new one, if not provided)
+        relevance: Generate the Relevancia texts with one LLM call
+        run_id: Run identifier the query yields are recorded under (the usage's run ID
+            if not provided)
+
+    Returns:
+        Dictionary with results, shaped like ContentCurationCrew.run
+    """
+    usage = usage or current_run() or start_run(topic)
+    run_id = run_id or usage.run_id
+    cache = get_topic_cache()
+    cached = None if force else cache.lookup(topic, 'fast')
+    if cached:
+        return {
+            'success': True,
+            'topic': topic,
+            'content': cached['content'],
+            'resources': None,
+            'cached': True,
+            'partial': False,
+            'usage': usage,
+            'error': None
+        }
+
+    try:
+        usage.current_agent = 'web_researcher'
+        with stage('búsqueda', SEARCH_SHARE):
+            candidates = search_candidates(topic, run_id=run_id)
+        resources = rank_resources(candidates, topic, TARGET_RESOURCES)
+        print(f"🔍 {len(candidates)} search results, {len(resources)} resources selected")
+
+        if relevance and resources:
+            usage.current_agent = 'content_curator'
+            with stage('relevancia', RELEVANCE_SHARE):
+                write_relevance(topic, resources)
+
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        deadline = current_deadline()
+        note = deadline.note() if deadline else ""
+        content = format_header(topic) + note
+        content += ''.join(format_resource(i, resource) for i, resource in enumerate(resources, 1))
+        content += format_summary(resources, timestamp)
+        if not note:
+            cache.store(topic, 'fast', content)
+
+        return {
+            'success': True,
+            'topic': topic,
+            'content': content,
+            'resources': resources,
+            'cached': False,
+            'partial': bool(note),
+            'usage': usage,
+            'error': None
+        }
+
+    except Exception as e:
+        return {
+            'success': False,
+            'topic': topic,
+            'content': None,
+            'resources': None,
+            'cached': False,
+            'partial': False,
+            'usage': usage,
+            'error': str(e)
+        }
+
+
+def compare_modes(topic: str, crew=None) -> List[Dict]:
+    """
+    Run the fast mode and the full crew on the same topic, bypassing the cache
+
+    Args:
+        topic: Topic to curate
+        crew: ContentCurationCrew to reuse (created if not provided)
+
+    Returns:
+        One row per mode with wall-clock seconds, API calls, LLM calls and cost
+    """
+    rows = []
+    for mode in ('fast', 'crew'):
+        usage = start_run(f"compare_{mode}")
+        started = time.perf_counter()
+        if mode == 'fast':
+            result = curate_fast(topic, force=True, usage=usage)
+        else:
+            if crew is None:
+                from .crew import ContentCurationCrew
+                crew = ContentCurationCrew()
+            result = crew.run(topic, force=True, usage=usage)
+        rows.append({
+            'mode': mode,
+            'success': result['success'],
+            'seconds': time.perf_counter() - started,
+            'api_calls': usage.api_calls(),
+            'llm_calls': usage.totals['calls'],
+            'cost': usage.totals['cost'],
+        })
+    return rows
@@ -0,0 +1,76 @@
+"""
+Formato de los documentos curados: recursos a partir de resultados de
+búsqueda y el markdown de la lista (cabecera, recursos y resumen)
+"""
+import json
+
+from .index import detect_text_language
+from .profiling import profiled
+
+
+def detect_language(title, snippet=''):
+    """Adivina el idioma del recurso a partir del título y el snippet"""
+    if any(word in title.lower() for word in ['curso', 'guía', 'español']):
+        return 'Español'
+    return 'Español' if detect_text_language(f"{title} {snippet}") == 'es' else 'Inglés'
+
+
+def detect_level(title):
+    """Adivina el nivel del recurso a partir del título"""
+    return 'Principiante' if 'beginner' in title.lower() or 'principiante' in title.lower() else 'Intermedio'
+
+
+def format_header(topic):
+    """Cabecera del documento curado"""
+    return f"""# RECURSOS CURADOS - {topic.upper()}
+
+## TOP 10 RECURSOS SELECCIONADOS
+
+"""
+
+
+def format_resource(index, resource):
+    """Formatea un recurso en el formato esperado"""
+    return f"""### {index}.
+**Título Original:** {resource['title']}
+**URL:** {resource['url']}
+**Idioma:** {resource['language']}
+**Autor/Fuente:** {resource['url'].split('/')[2] if '/' in resource['url'] else 'Web'}
+**Nivel:** {resource['level']}
+**Relevancia:** {resource['description'][:200]}...
+
+"""
+
+
+def format_summary(resources, timestamp):
+    """Resumen final del documento curado"""
+    return f"""## RESUMEN
+- Total de recursos curados: {len(resources)}
+- Recursos en inglés: {sum(1 for r in resources if r['language'] == 'Inglés')}
+- Recursos en español: {sum(1 for r in resources if r['language'] == 'Español')}
+- Distribución por nivel: Principiante ({sum(1 for r in resources if r['level'] == 'Principiante')}), Intermedio ({sum(1 for r in resources if r['level'] == 'Intermedio')}), Avanzado (0)
+
+**Sistema Real**: Generado usando APIs reales de búsqueda web
+**Timestamp**: {timestamp}
+"""
+
+
+@profiled('parse')
+def parse_search_result(result_json):
+    """Convierte la respuesta JSON de search_web en recursos"""
+    try:
+        results = json.loads(result_json)
+    except (TypeError, ValueError):
+        return []
+
+    resources = []
+    for item in results:
+        if item.get('link') and item.get('title'):
+            resources.append({
+                'title': item['title'],
+                'url': item['link'],
+                'description': item.get('snippet') or '',
+                'language': detect_language(item['title'], item.get('snippet') or ''),
+                'level': detect_level(item['title'])
+            })
+    return resources
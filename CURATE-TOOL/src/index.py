@@ -0,0 +1,140 @@
+"""
+Local full-text index of scraped resources (SQLite FTS5)
+"""
+import json
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config.settings import RESOURCE_INDEX_PATH
+
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5(
+    url UNINDEXED,
+    title,
+    text,
+    language UNINDEXED,
+    quality UNINDEXED,
+    metrics UNINDEXED,
+    updated UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# Longest text stored per page
+MAX_INDEXED_CHARS = 50000
+
+SPANISH_MARKERS = {'el', 'la', 'los', 'las', 'de', 'que', 'y', 'en', 'para', 'con', 'una', 'por', 'como', 'es'}
+ENGLISH_MARKERS = {'the', 'and', 'of', 'to', 'in', 'for', 'with', 'is', 'on', 'that', 'how', 'you', 'are', 'a'}
+
+
+def detect_text_language(text: str) -> str:
+    """
+    Guess whether a text is Spanish or English from common stopwords
+
+    Args:
+        text: Text to inspect
+
+    Returns:
+        'es' or 'en'
+    """
+    words = re.findall(r'[a-záéíóúñü]+', text[:5000].lower())
+    spanish = sum(1 for word in words if word in SPANISH_MARKERS)
+    english = sum(1 for word in words if word in ENGLISH_MARKERS)
+    return 'es' if spanish > english else 'en'
+
+
+def build_match_query(query: str) -> str:
+    """Turn a free-text query into an FTS5 query requiring every term"""
+    terms = re.findall(r'\w+', query.lower())
+    return ' '.join(f'"{term}"' for term in terms)
+
+
+class ResourceIndex:
+    """Full-text store of every scraped page"""
+
+    def __init__(self, path: Path = RESOURCE_INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def add_page(self, url: str, title: str, text: str, metrics: Dict,
+                 language: Optional[str] = None):
+        """
+        Store or replace a scraped page
+
+        Args:
+            url: Page URL
+            title: Page title
+            text: Extracted text
+            metrics: Quality metrics from content_quality_metrics
+            language: Language code (detected if not provided)
+        """
+        text = text[:MAX_INDEXED_CHARS]
+        language = language or detect_text_language(text)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            conn.execute(
+                "INSERT INTO pages (url, title, text, language, quality, metrics, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, title, text, language, metrics.get('score', 0), json.dumps(metrics), time.time())
+            )
+            conn.execute("COMMIT")
+
+    def search(self, query: str, limit: int = 5) -> List[Dict]:
+        """
+        Find indexed pages matching every term of the query
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of results
+
+        Returns:
+            Results in the same shape as search_web (title, snippet, link)
+        """
+        match = build_match_query(query)
+        if not match:
+            return []
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT url, title, snippet(pages, 2, '', '', '...', 30) AS snippet, language, quality "
+                "FROM pages WHERE pages MATCH ? ORDER BY bm25(pages, 0, 5.0, 1.0) LIMIT ?",
+                (match, limit)
+            ).fetchall()
+        return [
+            {
+                'title': row['title'],
+                'snippet': row['snippet'],
+                'link': row['url'],
+                'language': row['language'],
+                'quality': row['quality']
+            }
+            for row in rows
+        ]
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+
+@lru_cache(maxsize=None)
+def get_resource_index() -> ResourceIndex:
+    """Return the process-wide resource index"""
+    return ResourceIndex()
@@ -0,0 +1,180 @@
+"""
+Durable SQLite-backed job queue shared by several worker processes
+"""
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config.settings import JOB_DB_PATH, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS
+from .utils import generate_run_id
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    run_id TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    mode TEXT NOT NULL DEFAULT 'fast',
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    output_path TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+"""
+
+
+class JobQueue:
+    """
+    Job queue stored in a SQLite database
+
+    Workers claim jobs with a time-limited lease. A job whose lease expires
+    (for example because its worker crashed) becomes claimable again until
+    it runs out of attempts.
+    """
+
+    def __init__(self, path: Path = JOB_DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, topic: str, mode: str = 'fast', run_id: Optional[str] = None,
+                max_attempts: int = JOB_MAX_ATTEMPTS) -> str:
+        """
+        Add a job to the queue
+
+        Enqueuing an existing run ID is a no-op, so retried submissions
+        never create duplicate runs.
+
+        Args:
+            topic: Educational topic to curate
+            mode: 'fast' or 'crew'
+            run_id: Explicit run ID (generated if not provided)
+            max_attempts: How many times the job may be tried
+
+        Returns:
+            The job's run ID
+        """
+        run_id = run_id or generate_run_id(topic)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO jobs (run_id, topic, mode, max_attempts, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, topic, mode, max_attempts, now, now)
+            )
+        return run_id
+
+    def claim(self, worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS) -> Optional[Dict]:
+        """
+        Lease the oldest available job
+
+        Args:
+            worker_id: Identifier of the claiming worker
+            lease_seconds: How long the lease lasts without a heartbeat
+
+        Returns:
+            The claimed job as a dictionary, or None if nothing is available
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs abandoned by crashed workers that are out of attempts
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = 'Lease expired', lease_owner = NULL, updated = ? "
+                    "WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts",
+                    (now, now)
+                )
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' "
+                    "OR (status = 'running' AND lease_expires < ?) "
+                    "ORDER BY created LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, "
+                    "lease_expires = ?, updated = ? WHERE run_id = ?",
+                    (worker_id, now + lease_seconds, now, row['run_id'])
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        job = dict(row)
+        job.update(status='running', attempts=row['attempts'] + 1, lease_owner=worker_id)
+        return job
+
+    def heartbeat(self, run_id: str, worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS) -> bool:
+        """Extend a lease; returns False if the worker no longer owns the job"""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated = ? "
+                "WHERE run_id = ? AND lease_owner = ? AND status = 'running'",
+                (now + lease_seconds, now, run_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, run_id: str, worker_id: str, output_path: str) -> bool:
+        """Mark a job as completed with the path of its saved output"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'completed', output_path = ?, error = NULL, "
+                "lease_owner = NULL, lease_expires = NULL, updated = ? "
+                "WHERE run_id = ? AND lease_owner = ?",
+                (output_path, time.time(), run_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, run_id: str, worker_id: str, error: str) -> bool:
+        """Record a failed attempt; the job is requeued while attempts remain"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END, "
+                "error = ?, lease_owner = NULL, lease_expires = NULL, updated = ? "
+                "WHERE run_id = ? AND lease_owner = ?",
+                (error, time.time(), run_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def get(self, run_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE run_id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        with self._connect() as conn:
+            if status:
+                rows = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created DESC LIMIT ?", (status, limit)
+                ).fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM jobs ORDER BY created DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
@@ -0,0 +1,286 @@
+"""
+Adaptive (AIMD) concurrency limits for Serper, Gemini and every scraped host
+"""
+import asyncio
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from config.settings import (
+    LIMITER_ENABLED, LIMITER_BACKOFF, LIMITER_LATENCY_FACTOR, LIMITER_WINDOW,
+    LIMITER_SERPER_MAX, LIMITER_GEMINI_MAX, LIMITER_HOST_MAX, LIMITER_IDLE_SECONDS
+)
+from .deadline import deadline_expired
+from .metrics import PROVIDER_REQUESTS, REGISTRY, gauge
+
+# (initial, maximum) concurrent calls for each kind of target
+TARGET_LIMITS = {
+    'serper': (8, LIMITER_SERPER_MAX),
+    'gemini': (4, LIMITER_GEMINI_MAX),
+    'host': (4, LIMITER_HOST_MAX),
+}
+
+# Status codes meaning the target is overloaded
+OVERLOAD_STATUSES = {429, 502, 503, 504}
+
+# Latency samples needed before p95 is compared with the baseline
+MIN_SAMPLES = 10
+
+# Host limiters are looked for idle ones at most this often (seconds)
+EVICT_INTERVAL = 60
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Whether an exception signals an overloaded target (timeouts, quota, 429)"""
+    if isinstance(error, (httpx.TimeoutException, asyncio.TimeoutError)):
+        return True
+    text = f"{type(error).__name__} {error}"
+    return any(marker in text for marker in ('429', 'ResourceExhausted', 'DeadlineExceeded', 'Timeout'))
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit that grows additively while a target is healthy and
+    shrinks multiplicatively on 429s, timeouts or a rising p95 latency
+
+    Must be used from the shared event loop (see src.aio).
+    """
+
+    def __init__(self, name: str, initial: int, maximum: int, minimum: int = 1,
+                 backoff: float = LIMITER_BACKOFF, latency_factor: float = LIMITER_LATENCY_FACTOR,
+                 window: int = LIMITER_WINDOW):
+        self.name = name
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_factor = latency_factor
+        self.in_flight = 0
+        self.waiting = 0
+        self.samples = deque(maxlen=window)
+        # Lowest p95 latency seen (the target's normal spread included)
+        self.baseline: Optional[float] = None
+        self.last_decrease = 0.0
+        self.last_used = time.monotonic()
+        self.stats = {'calls': 0, 'failures': 0, 'decreases': 0}
+        self._condition: Optional[asyncio.Condition] = None
+
+    def on_success(self, started: float, seconds: float):
+        self.samples.append(seconds)
+        if len(self.samples) < MIN_SAMPLES:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            return
+        p95 = statistics.quantiles(self.samples, n=20)[-1]
+        # p95 is compared with its own history, not with the median: a target
+        # with a wide but steady latency spread is not overloaded. The baseline
+        # creeps up slowly so a permanently slower target does not keep the
+        # limit down.
+        self.baseline = p95 if self.baseline is None else min(p95, self.baseline * 1.01)
+        if p95 > self.latency_factor * self.baseline:
+            self.on_overload(started)
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_overload(self, started: float):
+        """Back off, once per round of calls: those started before the last decrease are ignored"""
+        self.stats['failures'] += 1
+        if started < self.last_decrease:
+            return
+        self.limit = max(self.minimum, self.limit * self.backoff)
+        self.last_decrease = time.monotonic()
+        self.samples.clear()
+        self.stats['decreases'] += 1
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Wait for a free slot and hold it for one call
+
+        Yields:
+            A CallOutcome; call observe(status_code) on it so overload
+            status codes count as failures
+        """
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            self.waiting += 1
+            try:
+                await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+
+        outcome = CallOutcome()
+        started = time.monotonic()
+        try:
+            yield outcome
+        except BaseException as e:
+            outcome.fail(e)
+            raise
+        finally:
+            self.stats['calls'] += 1
+            self.last_used = time.monotonic()
+            if outcome.overloaded:
+                self.on_overload(started)
+            elif not outcome.neutral:
+                self.on_success(started, time.monotonic() - started)
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def idle(self, now: float, seconds: float) -> bool:
+        """Whether no call has held or waited for a slot in the last seconds"""
+        return not self.in_flight and not self.waiting and now - self.last_used > seconds
+
+    def metrics(self) -> Dict:
+        return {
+            'limit': int(self.limit),
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'p95': round(statistics.quantiles(self.samples, n=20)[-1], 3) if len(self.samples) >= 2 else None,
+            **self.stats,
+        }
+
+
+class CallOutcome:
+    """How a call holding a limiter slot ended"""
+
+    def __init__(self):
+        self.overloaded = False
+        # Errors unrelated to load (bad request, cancellation) do not move the limit
+        self.neutral = False
+        self.failed = False
+        self.status_code: Optional[int] = None
+
+    def observe(self, status_code: int):
+        self.status_code = status_code
+        if status_code in OVERLOAD_STATUSES:
+            self.overloaded = True
+
+    def fail(self, error: BaseException):
+        """Classify an exception raised while holding the slot"""
+        # Timeouts shortened by the run deadline are not the target's fault
+        expired = deadline_expired()
+        if isinstance(error, Exception) and is_overload_error(error) and not expired:
+            self.overloaded = True
+        else:
+            self.neutral = True
+        self.failed = isinstance(error, Exception) and not expired
+
+    def result(self) -> Optional[str]:
+        """Provider metrics label ('ok', 'error', 'overload'), None for cancellations and deadline cuts"""
+        if self.overloaded:
+            return 'overload'
+        if self.failed or (self.status_code or 0) >= 400:
+            return 'error'
+        return None if self.neutral else 'ok'
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+_last_eviction = time.monotonic()
+
+
+def evict_idle_limiters(seconds: float = LIMITER_IDLE_SECONDS) -> int:
+    """
+    Drop the host limiters (and their gauges) unused for the given time,
+    so a long-running service does not keep one per host ever scraped
+
+    Args:
+        seconds: Idle time after which a host limiter is dropped
+
+    Returns:
+        Number of limiters dropped
+    """
+    global _last_eviction
+    now = time.monotonic()
+    with _limiters_lock:
+        _last_eviction = now
+        idle = [name for name, limiter in _limiters.items()
+                if name.startswith('host:') and limiter.idle(now, seconds)]
+        for name in idle:
+            del _limiters[name]
+    for name in idle:
+        for metric in (LIMITER_LIMIT, LIMITER_IN_FLIGHT, LIMITER_WAITING):
+            metric.remove(target=name)
+    return len(idle)
+
+
+def get_limiter(target: str) -> AdaptiveLimiter:
+    """
+    Return the limiter of a target
+
+    Args:
+        target: 'serper', 'gemini' or 'host:<netloc>'
+
+    Returns:
+        The target's AdaptiveLimiter, created on first use
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(target)
+        if limiter is None:
+            initial, maximum = TARGET_LIMITS[target.split(':', 1)[0]]
+            limiter = _limiters[target] = AdaptiveLimiter(target, initial, maximum)
+        # Not idle any more: the sweep below must not drop it
+        limiter.last_used = time.monotonic()
+        sweep = time.monotonic() - _last_eviction > EVICT_INTERVAL
+    if sweep:
+        evict_idle_limiters()
+    return limiter
+
+
+def host_target(url: str) -> str:
+    return f"host:{urlparse(url).netloc.lower()}"
+
+
+@asynccontextmanager
+async def limited(target: str):
+    """
+    Hold a slot of the target's limiter (a no-op outcome when limiting is
+    disabled) and count the call in the provider metrics
+    """
+    outcome = None
+    try:
+        if not LIMITER_ENABLED:
+            outcome = CallOutcome()
+            try:
+                yield outcome
+            except BaseException as e:
+                outcome.fail(e)
+                raise
+            return
+        async with get_limiter(target).slot() as outcome:
+            yield outcome
+    finally:
+        result = outcome.result() if outcome else None
+        if result:
+            PROVIDER_REQUESTS.inc(provider=target.split(':', 1)[0], result=result)
+
+
+def limiter_metrics() -> Dict[str, Dict]:
+    """Current limit, in-flight and waiting calls, p95 latency and counters per target"""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.metrics() for name, limiter in sorted(limiters.items())}
+
+
+LIMITER_LIMIT = gauge('curator_limiter_limit', 'Current adaptive concurrency limit per target', ('target',))
+LIMITER_IN_FLIGHT = gauge('curator_limiter_in_flight', 'Calls holding a limiter slot per target', ('target',))
+LIMITER_WAITING = gauge('curator_limiter_waiting', 'Calls waiting for a limiter slot per target', ('target',))
+
+
+def collect_limiter_metrics():
+    evict_idle_limiters()
+    for name, metrics in limiter_metrics().items():
+        LIMITER_LIMIT.set(metrics['limit'], target=name)
+        LIMITER_IN_FLIGHT.set(metrics['in_flight'], target=name)
+        LIMITER_WAITING.set(metrics['waiting'], target=name)
+
+
+REGISTRY.on_collect(collect_limiter_metrics)
@@ -0,0 +1,115 @@
+"""
+Per-agent model routing with lazily created, pooled LLM clients
+"""
+from functools import lru_cache
+from typing import Dict, Optional
+
+from config.settings import (
+    OPENAI_MODEL, GEMINI_MODEL, TEMPERATURE, OPENAI_API_KEY, GOOGLE_API_KEY,
+    LLM_ROUTING_PROFILE, AGENT_LLM_OVERRIDES
+)
+from .usage import usage_callback
+from .streaming import streaming_callback
+
+
+# Routing profiles: agent name -> (model spec, temperature, max tokens).
+# A model spec is "provider:model"; agents missing from a profile use "*".
+ROUTING_PROFILES: Dict[str, Dict[str, tuple]] = {
+    'default': {
+        '*': (f"openai:{OPENAI_MODEL}", TEMPERATURE, None),
+    },
+    'economy': {
+        '*': (f"openai:{OPENAI_MODEL}", TEMPERATURE, None),
+        'topic_analyzer': ("openai:gpt-4o-mini", 0.3, 800),
+        'content_curator': ("openai:gpt-4o-mini", 0.5, 2000),
+        'quality_controller': (f"gemini:{GEMINI_MODEL}", 0.2, 1500),
+    },
+    'quality': {
+        '*': ("openai:gpt-4o", TEMPERATURE, None),
+        'topic_analyzer': ("openai:gpt-4o-mini", 0.3, 800),
+    },
+}
+
+
+def parse_model_spec(spec: str) -> tuple:
+    """Split "provider:model" (provider defaults to openai)"""
+    provider, _, model = spec.partition(':')
+    return (provider, model) if model else ('openai', provider)
+
+
+def agent_llm_config(agent_name: str, profile: Optional[str] = None) -> Dict:
+    """
+    Resolve the model configuration for an agent
+
+    Args:
+        agent_name: Agent name as in config.settings.AGENT_NAMES
+        profile: Routing profile (defaults to LLM_ROUTING_PROFILE)
+
+    Returns:
+        Dictionary with provider, model, temperature and max_tokens
+    """
+    profile = profile or LLM_ROUTING_PROFILE
+    if profile not in ROUTING_PROFILES:
+        raise ValueError(f"Unknown routing profile: {profile}")
+    routes = ROUTING_PROFILES[profile]
+    spec, temperature, max_tokens = routes.get(agent_name, routes['*'])
+
+    overrides = AGENT_LLM_OVERRIDES.get(agent_name, {})
+    spec = overrides.get('model') or spec
+    if overrides.get('temperature'):
+        temperature = float(overrides['temperature'])
+    if overrides.get('max_tokens'):
+        max_tokens = int(overrides['max_tokens'])
+
+    provider, model = parse_model_spec(spec)
+    return {'provider': provider, 'model': model, 'temperature': temperature, 'max_tokens': max_tokens}
+
+
+@lru_cache(maxsize=None)
+def get_llm(provider: str, model: str, temperature: float, max_tokens: Optional[int] = None,
+            streaming: bool = False):
+    """
+    Return a pooled LLM client, creating it on first use
+
+    Agents with the same configuration share one client.
+
+    Args:
+        provider: 'openai' or 'gemini'
+        model: Model name
+        temperature: Sampling temperature
+        max_tokens: Completion token limit (None for the provider default)
+        streaming: Emit tokens to the active TokenStreamer as they arrive
+
+    Returns:
+        LangChain chat model
+    """
+    callbacks = [usage_callback, streaming_callback] if streaming else [usage_callback]
+    if provider == 'openai':
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            openai_api_key=OPENAI_API_KEY,
+            streaming=streaming,
+            callbacks=callbacks
+        )
+    if provider == 'gemini':
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(
+            model=model,
+            temperature=temperature,
+            max_output_tokens=max_tokens,
+            google_api_key=GOOGLE_API_KEY,
+            streaming=streaming,
+            callbacks=callbacks
+        )
+    raise ValueError(f"Unknown LLM provider: {provider}")
+
+
+def llm_for_agent(agent_name: str, profile: Optional[str] = None, streaming: bool = False):
+    """Return the routed LLM client for an agent"""
+    config = agent_llm_config(agent_name, profile)
+    return get_llm(
+        config['provider'], config['model'], config['temperature'], config['max_tokens'], streaming
+    )
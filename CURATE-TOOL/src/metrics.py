@@ -0,0 +1,279 @@
+"""
+Process-wide operational metrics in the Prometheus text format
+
+The metrics are shared by the tools, the runners (crew, fast path and the
+main_fixed pipeline) and the URL validator. They are served on a local
+HTTP port (METRICS_PORT, or GET /metrics of server.py) and can be written
+to a file at exit (METRICS_DUMP_PATH) for batch runs.
+"""
+import atexit
+import bisect
+import threading
+import time
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from config.settings import METRICS_HOST, METRICS_PORT, METRICS_DUMP_PATH
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Latency buckets in seconds, from a cached tool call to a full crew run
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names: Sequence[str], values: Sequence, extra: str = '') -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    """A named family of samples, one per combination of label values"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def remove(self, **labels):
+        """Drop the sample of a label combination that no longer exists"""
+        key = self._key(labels)
+        with self._lock:
+            self._values.pop(key, None)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key: Tuple, value) -> List[str]:
+        return [f"{self.name}{format_labels(self.labels, key)} {format_value(value)}"]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * len(self.buckets), 0.0)
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def _samples(self, key: Tuple, value) -> List[str]:
+        counts, total = value
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            le = f'le="{format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{format_labels(self.labels, key, le)} {cumulative}")
+        labels = format_labels(self.labels, key)
+        lines.append(f"{self.name}_sum{labels} {format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Registered metrics plus callbacks refreshing gauges right before rendering"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            self._metrics.setdefault(metric.name, metric)
+            return self._metrics[metric.name]
+
+    def on_collect(self, callback: Callable[[], None]):
+        """Call callback (e.g. to set gauges from live state) on every render"""
+        with self._lock:
+            self._collectors.append(callback)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = list(self._metrics.values())
+        for callback in collectors:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ Metrics collector failed: {e}")
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help, labels))
+
+
+def gauge(name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, help, labels))
+
+
+def histogram(name: str, help: str, labels: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, help, labels, buckets))
+
+
+RUNS = counter('curator_runs_total', 'Finished curation runs by mode and result', ('mode', 'result'))
+RUNS_IN_FLIGHT = gauge('curator_runs_in_flight', 'Curation runs currently executing', ('mode',))
+RUN_SECONDS = histogram('curator_run_duration_seconds', 'Duration of curation runs', ('mode',))
+TOOL_CALLS = counter('curator_tool_calls_total', 'Tool calls by tool and result', ('tool', 'result'))
+TOOL_SECONDS = histogram('curator_tool_duration_seconds', 'Latency of tool calls', ('tool',))
+CACHE_REQUESTS = counter('curator_cache_requests_total', 'Cache lookups by cache and hit/miss', ('cache', 'result'))
+PROVIDER_REQUESTS = counter('curator_provider_requests_total',
+                            'Requests to external providers by result (ok, error, overload)',
+                            ('provider', 'result'))
+LLM_TOKENS = counter('curator_llm_tokens_total', 'LLM tokens by kind (prompt, cached, completion)', ('kind',))
+URL_CHECKS = counter('curator_url_checks_total', 'URLs classified by the validator', ('status',))
+JOBS = gauge('curator_jobs', 'Jobs known to the server by status', ('status',))
+
+
+def result_label(result) -> str:
+    """Result label of a runner's return value (the crew/fast result dict, or a path)"""
+    if not isinstance(result, dict):
+        return 'success'
+    if not result.get('success'):
+        return 'failed'
+    if result.get('cached'):
+        return 'cached'
+    return 'partial' if result.get('partial') else 'success'
+
+
+def tracked_run(mode: str) -> Callable:
+    """Decorator counting a runner's in-flight calls, duration and results"""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            RUNS_IN_FLIGHT.inc(mode=mode)
+            started = time.perf_counter()
+            result = 'failed'
+            try:
+                value = func(*args, **kwargs)
+                result = result_label(value)
+                return value
+            finally:
+                RUNS_IN_FLIGHT.dec(mode=mode)
+                RUN_SECONDS.observe(time.perf_counter() - started, mode=mode)
+                RUNS.inc(mode=mode, result=result)
+        return wrapper
+    return decorator
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+def dump_metrics(path) -> str:
+    """Write the current metrics to a file in the Prometheus text format"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(render_metrics(), encoding='utf-8')
+    return str(path)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0].rstrip('/') not in ('', '/metrics'):
+            self.send_error(404)
+            return
+        body = render_metrics().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST) -> ThreadingHTTPServer:
+    """Serve GET /metrics on a local port from a background thread"""
+    httpd = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def enable_metrics(port: int = METRICS_PORT, dump_path: Optional[str] = METRICS_DUMP_PATH) -> Optional[ThreadingHTTPServer]:
+    """
+    Expose the metrics of this process as configured
+
+    Args:
+        port: Local HTTP port for GET /metrics (0 = no server)
+        dump_path: File the metrics are written to at exit ('' = none)
+
+    Returns:
+        The metrics HTTP server, if one was started
+    """
+    httpd = None
+    if port:
+        try:
+            httpd = start_metrics_server(port)
+            print(f"📈 Metrics: http://{METRICS_HOST}:{port}/metrics")
+        except OSError as e:
+            print(f"⚠️ Metrics server not started on port {port}: {e}")
+    if dump_path:
+        atexit.register(dump_metrics, dump_path)
+    return httpd
@@ -0,0 +1,86 @@
+"""
+Speculative prefetch of the planned research queries while topic analysis runs
+"""
+import contextvars
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from config.settings import PREFETCH_SCRAPE_TOP, PREFETCH_WORKERS
+from .query_planner import QUERY_TEMPLATES
+from .singleflight import SingleFlight
+
+
+def research_queries(topic: str, templates: List[str] = QUERY_TEMPLATES) -> List[str]:
+    """Render research query templates for a topic"""
+    return [template.format(topic=topic) for template in templates]
+
+
+class Prefetcher:
+    """Fires the research searches (and optionally scrapes) in the background"""
+
+    def __init__(self, topic: str, flight: SingleFlight, queries: Optional[List[str]] = None,
+                 scrape_top: int = PREFETCH_SCRAPE_TOP, workers: int = PREFETCH_WORKERS):
+        """
+        Args:
+            topic: Topic being curated
+            flight: Run's single-flight scope the results are registered in
+            queries: Queries the research task will run (every template if not provided)
+            scrape_top: Number of top hits per query to scrape as well
+            workers: Background threads
+        """
+        self.topic = topic
+        self.flight = flight
+        self.queries = queries or research_queries(topic)
+        self.scrape_top = scrape_top
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='prefetch')
+        # Context of the run, captured by start()
+        self._context: Optional[contextvars.Context] = None
+
+    def _submit(self, func: Callable, *args) -> Future:
+        # Each task runs in a copy of the run's context (usage, deadline,
+        # single-flight scope, URL index), even when submitted from a
+        # done-callback in a worker thread. A context can only be entered
+        # by one thread at a time, hence the copy per task.
+        return self.executor.submit(self._context.copy().run, func, *args)
+
+    def start(self):
+        """Submit the prefetch work; tool calls then find it in the single-flight scope"""
+        from .tools import search_web, scrape_webpage
+
+        self._context = contextvars.copy_context()
+
+        for query in self.queries:
+            future = self._submit(search_web, query)
+            self.flight.seed('web_search', future, query)
+            if self.scrape_top:
+                future.add_done_callback(lambda done: self._scrape_hits(done, scrape_webpage))
+
+    def _scrape_hits(self, search_future: Future, scrape: Callable[[str], str]):
+        try:
+            hits = json.loads(search_future.result())[:self.scrape_top]
+        except Exception:
+            return
+        for hit in hits:
+            link = hit.get('link')
+            if link and self.flight.get('webpage_scraper', link) is None:
+                try:
+                    self.flight.seed('webpage_scraper', self._submit(scrape, link), link)
+                except RuntimeError:
+                    return  # executor already shut down
+
+    def prefetched_results(self) -> List[Dict]:
+        """Search results that finished so far, for use as pre-context"""
+        results = []
+        for query in self.queries:
+            future = self.flight.get('web_search', query)
+            if future and future.done() and not future.cancelled():
+                try:
+                    results.extend(json.loads(future.result()))
+                except Exception:
+                    continue
+        return results
+
+    def stop(self):
+        """Cancel work that has not started"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
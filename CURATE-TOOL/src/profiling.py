@@ -0,0 +1,405 @@
+"""
+Per-stage CPU and memory profiling of a run (--profile)
+
+Every entry into a stage (search, scrape, parse, score, llm, save, check)
+gets its own cProfile profile and its net traced memory; the first
+PROFILE_SNAPSHOTS entries of each stage also get a tracemalloc snapshot
+diff (snapshots take seconds in a large process, so not every entry gets
+one). Everything is merged per stage and written next to the run output
+as <stage>.prof (pstats, e.g. for snakeviz), <stage>.tracemalloc (last
+snapshot, for tracemalloc.Snapshot.load) and summary.txt.
+
+cProfile only hooks the calling thread, so stages running in other
+threads (pipeline stages, prefetch, the parse threads) get their own
+profiles; a stage entered inside another one in the same thread pauses
+the outer profile. Async stages block on the shared event loop (see
+src.aio), so their own profile only shows the wait: the coroutines they
+submit, and the tasks those start, are profiled step by step on the loop
+thread into a separate <stage>.loop.prof. Allocations are the net growth
+of the whole process while the stage ran, so stages that overlap in time
+share them.
+"""
+import contextvars
+import cProfile
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from config.settings import PROFILE_TOP, PROFILE_MEMORY, PROFILE_SNAPSHOTS, PROFILE_TRACEMALLOC_FRAMES
+
+# Stages the runners and tools are instrumented with
+STAGES = ('search', 'scrape', 'parse', 'score', 'llm', 'save', 'check')
+
+# Stage of the code submitting coroutines to the shared loop; copied into
+# the loop's tasks with the rest of the caller's context
+_loop_stage: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('profiled_stage', default=None)
+
+# Allocation sites not worth listing: the profiler, tracemalloc and imports
+IGNORED_FILES = (__file__, tracemalloc.__file__, '<unknown>',
+                 '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>')
+
+
+def short_path(filename: str) -> str:
+    """Path relative to the project or the installed package it belongs to"""
+    for marker in ('site-packages/', 'lib/python'):
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    try:
+        return str(Path(filename).resolve().relative_to(Path.cwd()))
+    except ValueError:
+        return filename
+
+
+def format_size(size: int) -> str:
+    sign = '-' if size < 0 else '+'
+    size = abs(size)
+    for unit in ('B', 'KiB', 'MiB'):
+        if size < 1024 or unit == 'MiB':
+            return f"{sign}{size:.0f} {unit}" if unit == 'B' else f"{sign}{size:.1f} {unit}"
+        size /= 1024
+
+
+class StageProfile:
+    """CPU profile and net allocations accumulated over every entry of one stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.cpu_skipped = 0
+        self.memory = 0
+        # Entries that took (or are taking) snapshots
+        self.snapshots = 0
+        self.stats: Optional[pstats.Stats] = None
+        # Steps of the stage's coroutines on the event loop thread
+        self.loop_profile: Optional[cProfile.Profile] = None
+        # "file:line" -> [net bytes, net blocks]
+        self.allocations: Dict[str, List[int]] = {}
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def add(self, seconds: float, memory: int, profile: Optional[cProfile.Profile],
+            start: Optional[tracemalloc.Snapshot], end: Optional[tracemalloc.Snapshot]):
+        self.calls += 1
+        self.seconds += seconds
+        self.memory += memory
+        if profile is None:
+            self.cpu_skipped += 1
+        elif self.stats is None:
+            self.stats = pstats.Stats(profile)
+        else:
+            self.stats.add(profile)
+        if start is not None and end is not None:
+            for stat in end.compare_to(start, 'lineno'):
+                frame = stat.traceback[0]
+                if not stat.size_diff or frame.filename in IGNORED_FILES:
+                    continue
+                totals = self.allocations.setdefault(f"{short_path(frame.filename)}:{frame.lineno}", [0, 0])
+                totals[0] += stat.size_diff
+                totals[1] += stat.count_diff
+            self.snapshot = end
+
+    def loop_stats(self) -> Optional[pstats.Stats]:
+        if self.loop_profile is None:
+            return None
+        try:
+            return pstats.Stats(self.loop_profile)
+        except TypeError:
+            # Never enabled (another profiler was active)
+            return None
+
+    def top_functions(self, top: int, stats: Optional[pstats.Stats] = None) -> List[str]:
+        """Functions with the highest cumulative time, one formatted line each"""
+        stats = stats or self.stats
+        if stats is None:
+            return []
+        rows = []
+        for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+            if filename == __file__ or function.startswith("<method 'disable'"):
+                continue
+            where = function if filename == '~' else f"{short_path(filename)}:{line}({function})"
+            rows.append((cumulative, own, calls, where))
+        rows.sort(reverse=True)
+        return [f"  {calls:>8} {own:>9.3f} {cumulative:>9.3f}  {where}"
+                for cumulative, own, calls, where in rows[:top]]
+
+    def top_allocations(self, top: int) -> List[str]:
+        """Allocation sites with the largest net growth, one formatted line each"""
+        rows = sorted(self.allocations.items(), key=lambda item: item[1][0], reverse=True)
+        return [f"  {format_size(size):>12} {blocks:>8}  {where}"
+                for where, (size, blocks) in rows[:top] if size > 0]
+
+
+class RunProfiler:
+    """Stage profiles of one process run"""
+
+    def __init__(self, memory: bool = PROFILE_MEMORY, top: int = PROFILE_TOP,
+                 snapshots: int = PROFILE_SNAPSHOTS):
+        self.memory = memory
+        self.top = top
+        self.snapshots = snapshots
+        self.stages: Dict[str, StageProfile] = {}
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        # Per-thread stack of the profiles of the stages entered in that thread
+        self._local = threading.local()
+        self._started_tracing = False
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+            self._started_tracing = True
+
+    def _traced(self) -> int:
+        return tracemalloc.get_traced_memory()[0] if self.memory and tracemalloc.is_tracing() else 0
+
+    def _take_snapshots(self, name: str) -> bool:
+        """Whether this entry of the stage gets a snapshot diff"""
+        if not self.memory or not tracemalloc.is_tracing():
+            return False
+        with self._lock:
+            stage = self.stages.setdefault(name, StageProfile(name))
+            if stage.snapshots >= self.snapshots:
+                return False
+            stage.snapshots += 1
+            return True
+
+    @contextmanager
+    def stage(self, name: str):
+        """Profile the enclosed code as part of stage name"""
+        stack = self._local.__dict__.setdefault('stack', [])
+        # Snapshots are taken outside the timed and profiled section
+        snapshots = self._take_snapshots(name)
+        start = tracemalloc.take_snapshot() if snapshots else None
+        traced = self._traced()
+        profile = cProfile.Profile()
+        if stack and stack[-1] is not None:
+            stack[-1].disable()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active (Python 3.12+ allows one per process)
+            profile = None
+        stack.append(profile)
+        loop_stage = _loop_stage.set(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            _loop_stage.reset(loop_stage)
+            if profile is not None:
+                profile.disable()
+            memory = self._traced() - traced
+            stack.pop()
+            if stack and stack[-1] is not None:
+                try:
+                    stack[-1].enable()
+                except ValueError:
+                    pass
+            end = tracemalloc.take_snapshot() if snapshots else None
+            with self._lock:
+                self.stages.setdefault(name, StageProfile(name)).add(seconds, memory, profile, start, end)
+
+    def loop_profile(self, name: str) -> cProfile.Profile:
+        """Profile collecting the event loop steps of stage name"""
+        with self._lock:
+            stage = self.stages.setdefault(name, StageProfile(name))
+            if stage.loop_profile is None:
+                stage.loop_profile = cProfile.Profile()
+            return stage.loop_profile
+
+    def summary(self) -> str:
+        """Text summary with the top functions and allocation sites of every stage"""
+        with self._lock:
+            stages = sorted(self.stages.values(), key=lambda stage: stage.seconds, reverse=True)
+        lines = [
+            f"Run profile: {time.perf_counter() - self.started:.1f}s wall time",
+            "Stage times are summed over their entries; stages in different threads overlap.",
+            "Async stages wait for the event loop: their CPU time is under \"on the event loop thread\".",
+        ]
+        for stage in stages:
+            lines.append("")
+            memory = f", {format_size(stage.memory)} traced" if self.memory else ""
+            lines.append(f"== {stage.name}: {stage.calls} entries, {stage.seconds:.2f}s{memory} ==")
+            if stage.cpu_skipped:
+                lines.append(f"  ({stage.cpu_skipped} entries not CPU-profiled: another profiler was active)")
+            functions = stage.top_functions(self.top)
+            if functions:
+                lines.append("Top functions by cumulative time:")
+                lines.append(f"  {'ncalls':>8} {'tottime':>9} {'cumtime':>9}  function")
+                lines.extend(functions)
+            functions = stage.top_functions(self.top, stage.loop_stats())
+            if functions:
+                lines.append("Top functions on the event loop thread by cumulative time:")
+                lines.append(f"  {'ncalls':>8} {'tottime':>9} {'cumtime':>9}  function")
+                lines.extend(functions)
+            allocations = stage.top_allocations(self.top)
+            if allocations:
+                lines.append(f"Largest allocations (net growth during its first {min(stage.snapshots, stage.calls)} entries):")
+                lines.append(f"  {'size':>12} {'blocks':>8}  line")
+                lines.extend(allocations)
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory) -> Path:
+        """
+        Write the stage profiles, snapshots and summary
+
+        Args:
+            directory: Directory to write into (created if missing)
+
+        Returns:
+            Path of summary.txt
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            stages = list(self.stages.values())
+        for stage in stages:
+            if stage.stats is not None:
+                stage.stats.dump_stats(str(directory / f"{stage.name}.prof"))
+            loop_stats = stage.loop_stats()
+            if loop_stats is not None:
+                loop_stats.dump_stats(str(directory / f"{stage.name}.loop.prof"))
+            if stage.snapshot is not None:
+                stage.snapshot.dump(str(directory / f"{stage.name}.tracemalloc"))
+        path = directory / "summary.txt"
+        path.write_text(self.summary(), encoding='utf-8')
+        return path
+
+    def close(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+
+
+# Process-wide, like the metrics registry: thread pools started by any
+# module see it without the run's context being copied
+_active: Optional[RunProfiler] = None
+
+
+def start_profiling(memory: bool = PROFILE_MEMORY, top: int = PROFILE_TOP) -> RunProfiler:
+    """Begin profiling the stages of this process"""
+    global _active
+    _active = RunProfiler(memory, top)
+    return _active
+
+
+def current_profiler() -> Optional[RunProfiler]:
+    return _active
+
+
+def stop_profiling(directory) -> Optional[Path]:
+    """
+    Stop profiling and write the results
+
+    Args:
+        directory: Where to write (see profile_path_for)
+
+    Returns:
+        Path of the summary, or None if profiling was not started
+    """
+    global _active
+    profiler, _active = _active, None
+    if profiler is None:
+        return None
+    try:
+        return profiler.write(directory)
+    finally:
+        profiler.close()
+
+
+def profile_path_for(output_path) -> Path:
+    """Directory of the profile saved next to an output file"""
+    return Path(output_path).with_suffix('.profile')
+
+
+@contextmanager
+def profile_stage(name: str):
+    """Profile the enclosed code as part of stage name, if profiling is on"""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
+
+
+class _ProfiledSteps:
+    """Awaitable running a coroutine with a profile enabled during each of its steps"""
+
+    # Profile enabled by the step in progress (the loop runs one step at a time)
+    running: Optional[cProfile.Profile] = None
+
+    def __init__(self, awaitable: Awaitable, profile: cProfile.Profile):
+        self.awaitable = awaitable
+        self.profile = profile
+
+    def _step(self, method, value):
+        if _ProfiledSteps.running is not None:
+            # Awaited from a step that is already profiled
+            return method(value)
+        try:
+            self.profile.enable()
+        except ValueError:
+            # Another profiler is active (Python 3.12+ allows one per process)
+            return method(value)
+        _ProfiledSteps.running = self.profile
+        try:
+            return method(value)
+        finally:
+            self.profile.disable()
+            _ProfiledSteps.running = None
+
+    def __await__(self):
+        steps = self.awaitable.__await__()
+        method, value = steps.send, None
+        while True:
+            try:
+                future = self._step(method, value)
+            except StopIteration as e:
+                return e.value
+            try:
+                method, value = steps.send, (yield future)
+            except BaseException as e:
+                method, value = steps.throw, e
+
+
+async def _profile_steps(awaitable: Awaitable, profile: cProfile.Profile):
+    return await _ProfiledSteps(awaitable, profile)
+
+
+def profile_loop_steps(awaitable: Awaitable, context: Optional[contextvars.Context] = None) -> Awaitable:
+    """
+    Profile a coroutine on the event loop thread as part of the stage that
+    submitted it (see src.aio)
+
+    Args:
+        awaitable: Coroutine about to be scheduled
+        context: Context it will run in (the current one if not provided)
+
+    Returns:
+        A coroutine profiling the steps of awaitable, or awaitable itself
+        when profiling is off or it was not submitted from a stage
+    """
+    profiler = _active
+    if profiler is None:
+        return awaitable
+    name = context.get(_loop_stage) if context is not None else _loop_stage.get()
+    if name is None:
+        return awaitable
+    return _profile_steps(awaitable, profiler.loop_profile(name))
+
+
+def profiled(name: str) -> Callable:
+    """Decorator profiling every call of a (blocking) function as part of stage name"""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            with _active.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,312 @@
+"""
+Yield-driven search query planner: learns how many new unique URLs each
+query template adds across past runs and picks the fewest templates that
+reach a target number of candidates
+"""
+import json
+import random
+import sqlite3
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from config.settings import (
+    QUERY_PLANNER_ENABLED, QUERY_PLANNER_PATH, QUERY_PLANNER_TARGET,
+    QUERY_PLANNER_HISTORY, QUERY_PLANNER_MIN_RUNS, QUERY_PLANNER_EXPLORE
+)
+from .cache import normalize_topic
+from .url_index import canonical_url
+
+# Every search query template, in the order used while there is no history
+QUERY_TEMPLATES = [
+    "{topic} tutorial",
+    "{topic} guide",
+    "{topic} article",
+    "{topic} beginner",
+    "{topic} curso",
+    "{topic} español",
+    "{topic} blog",
+    "learn {topic}",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS query_results (
+    run_id TEXT NOT NULL,
+    template TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    results INTEGER NOT NULL,
+    new_urls INTEGER NOT NULL,
+    urls TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (run_id, template)
+);
+CREATE TABLE IF NOT EXISTS query_runs (
+    run_id TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    topic_key TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    planned INTEGER NOT NULL,
+    executed INTEGER NOT NULL,
+    available INTEGER NOT NULL,
+    unique_urls INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS query_results_created ON query_results (created);
+"""
+
+
+class QueryYieldStore:
+    """Unique URLs each query template returned in past runs"""
+
+    def __init__(self, path: Path = QUERY_PLANNER_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def record(self, plan: 'QueryPlan', mode: str):
+        """Store the URLs each executed query returned and the run summary"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for position, (template, urls) in enumerate(plan.results.items()):
+                    conn.execute(
+                        "INSERT OR REPLACE INTO query_results "
+                        "(run_id, template, position, results, new_urls, urls, created) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (plan.run_id, template, position, len(urls), plan.new_urls[template],
+                         json.dumps(sorted(urls)), now)
+                    )
+                conn.execute(
+                    "INSERT OR REPLACE INTO query_runs "
+                    "(run_id, topic, topic_key, mode, planned, executed, available, unique_urls, created) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (plan.run_id, plan.topic, normalize_topic(plan.topic), mode, len(plan.planned),
+                     len(plan.executed), len(plan.templates), len(plan.seen), now)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def history(self, runs: int = QUERY_PLANNER_HISTORY) -> List[Dict[str, Set[str]]]:
+        """URL sets per template of the most recent runs"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT run_id, template, urls FROM query_results WHERE run_id IN ("
+                "SELECT run_id FROM query_runs ORDER BY created DESC LIMIT ?)",
+                (runs,)
+            ).fetchall()
+        by_run: Dict[str, Dict[str, Set[str]]] = {}
+        for row in rows:
+            by_run.setdefault(row['run_id'], {})[row['template']] = set(json.loads(row['urls']))
+        return list(by_run.values())
+
+    def template_stats(self) -> List[Dict]:
+        """Average results and marginal new URLs per template over all runs"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT template, COUNT(*) AS runs, AVG(results) AS avg_results, "
+                "AVG(new_urls) AS avg_new_urls, AVG(position) AS avg_position "
+                "FROM query_results GROUP BY template ORDER BY avg_new_urls DESC"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def topic_stats(self) -> List[Dict]:
+        """Queries planned, executed and saved per topic"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT topic_key, COUNT(*) AS runs, SUM(executed) AS executed, "
+                "SUM(available) - SUM(executed) AS saved, AVG(unique_urls) AS avg_unique_urls "
+                "FROM query_runs GROUP BY topic_key ORDER BY saved DESC"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def search_result_urls(result) -> Optional[List[str]]:
+    """URLs of a web_search result (JSON list of hits), or None if the search failed"""
+    try:
+        hits = json.loads(result)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(hits, list):
+        return None
+    return [hit['link'] for hit in hits if isinstance(hit, dict) and hit.get('link')]
+
+
+def marginal_gain(template: str, chosen: List[str], history: List[Dict[str, Set[str]]]) -> Optional[float]:
+    """
+    Average number of URLs a template adds to those of the chosen templates
+
+    Only runs that executed the template count; None if there are none.
+    """
+    gains = []
+    for run in history:
+        if template not in run:
+            continue
+        covered = set().union(*(run[name] for name in chosen if name in run))
+        gains.append(len(run[template] - covered))
+    return sum(gains) / len(gains) if gains else None
+
+
+def select_templates(history: List[Dict[str, Set[str]]], target: int,
+                     templates: List[str] = QUERY_TEMPLATES) -> List[str]:
+    """
+    Greedily pick the templates with the highest marginal yield until the
+    expected unique URLs reach target
+
+    Args:
+        history: URL sets per template of past runs
+        target: Unique candidates wanted
+        templates: Templates to choose from
+
+    Returns:
+        Templates in the order they should run
+    """
+    chosen, expected = [], 0.0
+    remaining = list(templates)
+    while remaining and expected < target:
+        gains = {template: marginal_gain(template, chosen, history) for template in remaining}
+        # Templates never executed have no estimate; they are left for exploration
+        known = {template: gain for template, gain in gains.items() if gain is not None}
+        if not known:
+            break
+        best = max(known, key=lambda template: (known[template], -templates.index(template)))
+        if known[best] <= 0:
+            break
+        chosen.append(best)
+        remaining.remove(best)
+        expected += known[best]
+    return chosen
+
+
+class QueryPlan:
+    """
+    Queries of one run: the planned templates first, then the rest as a
+    reserve used only while fewer than target unique URLs were found
+    """
+
+    def __init__(self, topic: str, planned: List[str], templates: List[str] = QUERY_TEMPLATES,
+                 target: int = QUERY_PLANNER_TARGET, run_id: Optional[str] = None):
+        self.topic = topic
+        self.run_id = run_id or f"{normalize_topic(topic)}_{time.time():.6f}"
+        self.target = target
+        self.planned = list(planned)
+        self.templates = self.planned + [template for template in templates if template not in self.planned]
+        self.results: Dict[str, Set[str]] = {}
+        self.new_urls: Dict[str, int] = {}
+        self.seen: Set[str] = set()
+        self.executed: List[str] = []
+
+    def query(self, template: str) -> str:
+        return template.format(topic=self.topic)
+
+    @property
+    def queries(self) -> List[str]:
+        """Every query, planned ones first"""
+        return [self.query(template) for template in self.templates]
+
+    @property
+    def planned_queries(self) -> List[str]:
+        return [self.query(template) for template in self.planned]
+
+    def template_of(self, query: str) -> Optional[str]:
+        return next((template for template in self.templates if self.query(template) == query), None)
+
+    def observe(self, template: str, urls: Optional[Iterable[str]]):
+        """
+        Record the URLs a template's query returned
+
+        Args:
+            template: Query template
+            urls: Result URLs, or None if the call failed (it counts as
+                executed but its yield is not recorded)
+        """
+        self.executed.append(template)
+        if urls is None:
+            return
+        keys = {canonical_url(url) for url in urls if url}
+        keys.discard('')
+        self.results[template] = keys
+        self.new_urls[template] = len(keys - self.seen)
+        self.seen |= keys
+
+    def enough(self) -> bool:
+        """Whether the queries so far found the target number of unique URLs"""
+        return len(self.seen) >= self.target
+
+    @property
+    def saved(self) -> int:
+        """Search calls saved compared with running every template"""
+        return len(self.templates) - len(self.executed)
+
+    def summary(self) -> str:
+        return (f"{len(self.executed)} de {len(self.templates)} consultas "
+                f"({self.saved} ahorradas), {len(self.seen)} URLs únicas")
+
+
+@lru_cache(maxsize=None)
+def get_query_store() -> QueryYieldStore:
+    """Return the process-wide query yield store"""
+    return QueryYieldStore()
+
+
+def plan_queries(topic: str, target: int = QUERY_PLANNER_TARGET,
+                 run_id: Optional[str] = None, templates: List[str] = QUERY_TEMPLATES) -> QueryPlan:
+    """
+    Plan the search queries of a run
+
+    Until QUERY_PLANNER_MIN_RUNS runs were recorded (or with the planner
+    disabled) every template is planned in catalog order. Afterwards the
+    greedy selection is used and, with probability QUERY_PLANNER_EXPLORE,
+    one reserve template is added so its yield keeps being measured.
+
+    Args:
+        topic: Topic being curated
+        target: Unique candidates wanted
+        run_id: Run identifier the yields are recorded under
+        templates: Templates to choose from
+
+    Returns:
+        QueryPlan of the run
+    """
+    if not QUERY_PLANNER_ENABLED:
+        return QueryPlan(topic, templates, templates, target, run_id)
+    try:
+        history = get_query_store().history()
+    except Exception as e:
+        print(f"⚠️ Could not read query yields: {e}")
+        history = []
+    if len(history) < QUERY_PLANNER_MIN_RUNS:
+        return QueryPlan(topic, templates, templates, target, run_id)
+
+    planned = select_templates(history, target, templates)
+    reserve = [template for template in templates if template not in planned]
+    if reserve and random.random() < QUERY_PLANNER_EXPLORE:
+        # Templates never measured go first, so new ones get a yield estimate
+        untried = [template for template in reserve if marginal_gain(template, [], history) is None]
+        planned.append(random.choice(untried or reserve))
+    return QueryPlan(topic, planned or templates[:1], templates, target, run_id)
+
+
+def record_plan(plan: QueryPlan, mode: str):
+    """Store the yields of a finished plan, ignoring store errors"""
+    if not QUERY_PLANNER_ENABLED or not plan.results:
+        return
+    try:
+        get_query_store().record(plan, mode)
+    except Exception as e:
+        print(f"⚠️ Could not record query yields: {e}")
@@ -0,0 +1,202 @@
+"""
+Local ranking of candidate resources for the curated top 10
+"""
+import heapq
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Pattern, Set
+from urllib.parse import urlparse
+
+from .cache import normalize_topic
+from .domains import domain_snapshot
+from .tools import content_metrics
+from .profiling import profiled
+
+
+# Weight of each signal in the base score (each signal is in 0-1)
+RANKING_WEIGHTS = {
+    'quality': 0.35,
+    'relevance': 0.45,
+    'health': 0.20,
+}
+
+# Subtracted from a candidate's score for every resource already selected
+# from the same domain
+DOMAIN_PENALTY = 0.15
+
+# URL health by validation status (see validate_urls.classify_url);
+# candidates that were never checked get their domain's smoothed success
+# rate, or HEALTH_UNKNOWN for domains never contacted
+URL_HEALTH = {'ok': 1.0, 'unreachable': 0.0}
+HEALTH_UNKNOWN = 0.5
+EXCLUDED_STATUSES = {'fake', 'invalid'}
+
+# Words ignored when matching the topic
+STOPWORDS = {'de', 'la', 'el', 'en', 'y', 'para', 'con', 'the', 'and', 'of', 'for', 'to', 'in', 'a'}
+
+
+WORD = re.compile(r'\w+')
+
+# Host of an http(s)-style URL, without parsing the rest of it
+NETLOC = re.compile(r'[a-zA-Z][\w+.-]*://([^/?#]*)')
+
+
+class _AccentTable(dict):
+    """str.translate table stripping accents, filled in as characters are met"""
+
+    def __missing__(self, code: int) -> str:
+        decomposed = unicodedata.normalize('NFKD', chr(code))
+        self[code] = ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+        return self[code]
+
+
+_ACCENTS = _AccentTable()
+
+
+def fold(text: str) -> str:
+    """Casefolded, accent-free text (as normalize_topic, one character at a time, which is much faster)"""
+    text = text.casefold()
+    return text if text.isascii() else text.translate(_ACCENTS)
+
+
+def words(text: str) -> Set[str]:
+    """Casefolded, accent-free words of a text"""
+    return set(WORD.findall(fold(text)))
+
+
+def topic_terms(topic: str) -> List[str]:
+    """Significant, accent-free terms of a topic"""
+    return [term for term in dict.fromkeys(WORD.findall(normalize_topic(topic))) if term not in STOPWORDS]
+
+
+def resource_domain(url: str) -> str:
+    match = NETLOC.match(url)
+    netloc = (match.group(1) if match else urlparse(url).netloc).lower()
+    return netloc[4:] if netloc.startswith('www.') else netloc
+
+
+def terms_pattern(terms: List[str]) -> Pattern:
+    """Regex matching any of the topic terms as a whole word"""
+    return re.compile(r'\b(?:' + '|'.join(map(re.escape, terms)) + r')\b')
+
+
+def matched_terms(text: str, pattern: Pattern) -> Set[str]:
+    """Topic terms found in a text (casefolded, accent-free)"""
+    return set(pattern.findall(fold(text)))
+
+
+def relevance(resource: Dict, terms: List[str], pattern: Optional[Pattern] = None) -> float:
+    """
+    Share of topic terms found in the title (counted double) and snippet
+
+    Args:
+        resource: Candidate with title and description/snippet
+        terms: Output of topic_terms
+        pattern: terms_pattern(terms), built once per ranking
+
+    Returns:
+        Relevance between 0 and 1
+    """
+    if not terms:
+        return 0.0
+    pattern = pattern or terms_pattern(terms)
+    title = matched_terms(resource.get('title') or '', pattern)
+    snippet = matched_terms(resource.get('description') or resource.get('snippet') or '', pattern)
+    return (2 * len(title) + len(snippet)) / (3 * len(terms))
+
+
+def quality(resource: Dict) -> float:
+    """Quality metrics score of the scraped content (or the snippet), scaled to 0-1"""
+    if resource.get('quality') is not None:
+        return resource['quality'] / 100
+    text = resource.get('content') or resource.get('description') or resource.get('snippet') or ''
+    return content_metrics(text)['score'] / 100
+
+
+def health(resource: Dict, domain_stats: Optional[Dict] = None) -> float:
+    content = resource.get('content')
+    if content and content.startswith('Scraping error'):
+        return 0.0
+    if resource.get('url_status') in URL_HEALTH:
+        return URL_HEALTH[resource['url_status']]
+    if domain_stats and domain_stats['success_rate'] is not None:
+        # Few outcomes stay close to HEALTH_UNKNOWN
+        attempts = domain_stats['attempts']
+        return (domain_stats['success_rate'] * attempts + HEALTH_UNKNOWN) / (attempts + 1)
+    return HEALTH_UNKNOWN
+
+
+def score_resource(resource: Dict, terms: List[str], domain_stats: Optional[Dict] = None,
+                   pattern: Optional[Pattern] = None) -> float:
+    """Weighted base score of a candidate (before domain diversity)"""
+    return (
+        RANKING_WEIGHTS['quality'] * quality(resource)
+        + RANKING_WEIGHTS['relevance'] * relevance(resource, terms, pattern)
+        + RANKING_WEIGHTS['health'] * health(resource, domain_stats)
+    )
+
+
+@profiled('score')
+def rank_resources(candidates: Iterable[Dict], topic: str, k: int = 10,
+                   domain_penalty: float = DOMAIN_PENALTY,
+                   reliability: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+    """
+    Select the k best candidates, spreading the selection across domains
+
+    Candidates are deduplicated by URL and kept in a heap by base score.
+    Because the domain penalty only grows as resources are selected, a
+    popped candidate whose penalized score still beats the next entry is
+    the best remaining one; otherwise it is pushed back with its new score.
+
+    Args:
+        candidates: Resources with url/link, title, description/snippet and
+            optionally content, quality (0-100) and url_status
+        topic: Topic being curated
+        k: Number of resources to select
+        domain_penalty: Score lost per already selected resource of the same domain
+        reliability: Domain statistics (defaults to the domain reliability
+            store); candidates from unreliable domains are dropped
+
+    Returns:
+        Up to k resources, best first, each with 'rank_score' and 'domain'
+    """
+    # Topic terms, their pattern and every candidate's domain are worked out once
+    terms = topic_terms(topic)
+    pattern = terms_pattern(terms) if terms else None
+    if reliability is None:
+        reliability = domain_snapshot()
+    heap = []
+    seen = set()
+    for position, resource in enumerate(candidates):
+        url = resource.get('url') or resource.get('link')
+        if not url or url in seen or resource.get('url_status') in EXCLUDED_STATUSES:
+            continue
+        seen.add(url)
+        domain = resource_domain(url)
+        domain_stats = reliability.get(domain)
+        if domain_stats and domain_stats['unreliable']:
+            continue
+        heap.append((-score_resource(resource, terms, domain_stats, pattern), position, domain, resource, 0))
+    heapq.heapify(heap)
+
+    selected = []
+    domain_counts: Dict[str, int] = {}
+    while heap and len(selected) < k:
+        negative, position, domain, resource, applied = heapq.heappop(heap)
+        count = domain_counts.get(domain, 0)
+        if count != applied:
+            # Penalty changed since this entry was pushed: re-score lazily
+            score = -negative - (count - applied) * domain_penalty
+            heapq.heappush(heap, (-score, position, domain, resource, count))
+            continue
+        domain_counts[domain] = count + 1
+        selected.append({**resource, 'rank_score': round(-negative, 4), 'domain': domain})
+    return selected
+
+
+def format_candidates(ranked: List[Dict], limit: Optional[int] = None) -> str:
+    """Numbered 'title - url' list of ranked candidates for use in a prompt"""
+    return "\n".join(
+        f"{i}. {resource.get('title')} - {resource.get('url') or resource.get('link')} (score {resource['rank_score']:.2f})"
+        for i, resource in enumerate(ranked[:limit] if limit else ranked, 1)
+    )
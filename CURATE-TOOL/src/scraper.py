@@ -0,0 +1,128 @@
+"""
+Two-stage scraper: async I/O workers fetch raw pages and a process pool
+parses them, connected by a bounded queue
+"""
+import asyncio
+import queue
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from config.settings import SCRAPE_PARSE_WORKERS, SCRAPE_FETCH_WORKERS, SCRAPE_QUEUE_SIZE
+from .aio import get_http_client, submit
+from .extract import extract_main_content
+from .limiter import host_target, limited
+from .domains import is_domain_failure, record_outcome
+from .deadline import DEADLINE_MESSAGE, call_timeout, deadline_expired, deadline_passed
+from .profiling import current_profiler
+
+_DONE = object()
+
+
+@lru_cache(maxsize=None)
+def get_parse_pool(workers: int = SCRAPE_PARSE_WORKERS) -> Optional[Executor]:
+    """Return the process pool used for HTML parsing (None when workers is 0)"""
+    return ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+
+
+async def parse_page(content: bytes, workers: int = SCRAPE_PARSE_WORKERS) -> Dict:
+    """
+    Extract the main content of a page outside the event loop
+
+    Args:
+        content: Raw HTML
+        workers: Size of the parse pool (0 parses in a thread)
+
+    Returns:
+        Output of extract_main_content, without a character budget
+    """
+    pool = get_parse_pool(workers)
+    # The profiler cannot see into the pool's processes
+    if pool is None or current_profiler() is not None:
+        return await asyncio.to_thread(extract_main_content, content, None)
+    return await asyncio.get_running_loop().run_in_executor(pool, extract_main_content, content, None)
+
+
+async def _scrape_all(urls, emit, parse_workers: int, fetch_workers: int, queue_size: int):
+    pending = asyncio.Queue()
+    for url in urls:
+        pending.put_nowait(url)
+    # Fetched pages waiting to be parsed; fetchers block when it is full
+    fetched = asyncio.Queue(maxsize=queue_size)
+
+    async def fetcher():
+        while not pending.empty():
+            url = pending.get_nowait()
+            started = time.perf_counter()
+            if deadline_passed("scraping de páginas"):
+                emit(url, None, f"Scraping error: {DEADLINE_MESSAGE}", 0.0)
+                continue
+            try:
+                async with limited(host_target(url)) as call:
+                    started = time.perf_counter()
+                    response = await get_http_client().get(url, timeout=call_timeout(10))
+                    call.observe(response.status_code)
+                await fetched.put((url, response.status_code, response.content, started))
+            except Exception as e:
+                seconds = time.perf_counter() - started
+                if deadline_expired():
+                    emit(url, None, f"Scraping error: {DEADLINE_MESSAGE}", seconds)
+                    continue
+                # Transport errors and timeouts count against the domain, parse errors do not
+                if is_domain_failure(e):
+                    await asyncio.to_thread(record_outcome, url, False, seconds, f"Scraping error: {str(e)}")
+                emit(url, None, f"Scraping error: {str(e)}", seconds)
+
+    async def parser():
+        while True:
+            item = await fetched.get()
+            if item is _DONE:
+                return
+            url, status, content, started = item
+            try:
+                page = await parse_page(content, parse_workers)
+                emit(url, status, page, time.perf_counter() - started)
+            except Exception as e:
+                emit(url, None, f"Scraping error: {str(e)}", time.perf_counter() - started)
+
+    parsers = [asyncio.create_task(parser()) for _ in range(max(1, parse_workers))]
+    await asyncio.gather(*(fetcher() for _ in range(max(1, fetch_workers))))
+    for _ in parsers:
+        await fetched.put(_DONE)
+    await asyncio.gather(*parsers)
+
+
+def scrape_pages(urls: Iterable[str], parse_workers: int = SCRAPE_PARSE_WORKERS,
+                 fetch_workers: int = SCRAPE_FETCH_WORKERS,
+                 queue_size: int = SCRAPE_QUEUE_SIZE) -> Iterator[Tuple[str, Optional[int], object, float]]:
+    """
+    Fetch and parse many pages, yielding each one as soon as it is parsed
+
+    Args:
+        urls: URLs to scrape
+        parse_workers: Parsing processes (0 parses in threads)
+        fetch_workers: Concurrent fetches (each host is further limited by
+            its adaptive limiter)
+        queue_size: Fetched pages allowed to wait for a parser
+
+    Fetches are bounded by the active deadline (see src.deadline); pages
+    not fetched in time are reported as "Scraping error: run deadline exceeded".
+
+    Yields:
+        (url, HTTP status, extract_main_content result, seconds) for parsed
+        pages and (url, None, "Scraping error: ...", seconds) for failures,
+        in completion order
+    """
+    results = queue.Queue()
+    done = submit(_scrape_all(
+        list(urls), lambda *result: results.put(result), parse_workers, fetch_workers, queue_size
+    ))
+    done.add_done_callback(lambda _: results.put(_DONE))
+
+    while True:
+        result = results.get()
+        if result is _DONE:
+            break
+        yield result
+    done.result()  # re-raise unexpected errors
@@ -0,0 +1,229 @@
+"""
+Warm curation service: keeps agents, clients and HTTP pools loaded and runs
+curation jobs from a bounded queue
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+from config.settings import SERVER_CONCURRENCY, SERVER_JOB_TTL, SERVER_MAX_FINISHED_JOBS
+from .utils import save_content, generate_run_id
+from .usage import usage_path_for
+from .dataset import record_run
+from .metrics import JOBS, REGISTRY
+
+
+def run_curation(topic: str, mode: str = 'fast', run_id: Optional[str] = None,
+                 crew=None, on_resource=None, force: bool = False) -> str:
+    """
+    Run one curation and save its output
+
+    Args:
+        topic: Educational topic to curate
+        mode: 'fast' for the direct pipeline or 'crew' for the full crew
+        run_id: Unique identifier for the run (generated if not provided)
+        crew: ContentCurationCrew to reuse (created if not provided)
+        on_resource: Optional callback for each resource written in fast mode
+        force: Ignore cached curations of an equivalent topic
+
+    Returns:
+        Path to the saved file
+    """
+    run_id = run_id or generate_run_id(topic)
+
+    if mode == 'fast':
+        import main_fixed
+        return main_fixed.curate_content_real(
+            topic, on_resource=on_resource, run_id=run_id, force=force
+        )
+
+    if crew is None:
+        from .crew import ContentCurationCrew
+        crew = ContentCurationCrew()
+    result = crew.run(topic, force=force, run_id=run_id)
+    if not result['success']:
+        raise RuntimeError(result['error'])
+    filepath = save_content(content=result['content'], topic=topic, run_id=run_id)
+    if not result.get('cached'):
+        record_run(topic, run_id, 'crew', content=result['content'])
+    result['usage'].save(usage_path_for(filepath))
+    return filepath
+
+
+class CurationJob:
+    """A single curation request and its progress events"""
+
+    def __init__(self, topic: str, mode: str = 'fast', force: bool = False):
+        # The job ID doubles as the run ID of the saved output
+        self.id = generate_run_id(topic)
+        self.topic = topic
+        self.mode = mode
+        self.force = force
+        self.status = 'queued'
+        self.filepath: Optional[str] = None
+        self.content: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.events: List[Dict] = []
+        self._changed = threading.Condition()
+        self.emit('queued')
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('completed', 'failed')
+
+    def emit(self, event: str, **data):
+        """Record a progress event and wake up any listeners"""
+        with self._changed:
+            self.events.append({'event': event, 'time': time.time(), **data})
+            self._changed.notify_all()
+
+    def finish(self, status: str, **data):
+        """Set the final status and record its event together, so listeners see both at once"""
+        with self._changed:
+            self.status = status
+            self.finished = time.time()
+            self.events.append({'event': status, 'time': time.time(), **data})
+            self._changed.notify_all()
+
+    def wait_events(self, start: int, timeout: float = 1.0) -> List[Dict]:
+        """Return events after index start, waiting up to timeout for new ones"""
+        with self._changed:
+            if len(self.events) <= start and not self.done:
+                self._changed.wait(timeout)
+            return self.events[start:]
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'topic': self.topic,
+            'mode': self.mode,
+            'status': self.status,
+            'filepath': self.filepath,
+            'error': self.error,
+            'content': self.content if self.done else None
+        }
+
+
+class CurationService:
+    """Long-lived curation runner with a concurrency-limited job queue"""
+
+    def __init__(self, concurrency: int = SERVER_CONCURRENCY, job_ttl: float = SERVER_JOB_TTL,
+                 max_finished: int = SERVER_MAX_FINISHED_JOBS):
+        """
+        Initialize the service and warm up the heavy imports
+
+        Args:
+            concurrency: Maximum number of jobs running at the same time
+            job_ttl: Seconds a finished job stays available
+            max_finished: Finished jobs kept at most (oldest dropped first)
+        """
+        # Importing here loads crewai/langchain, the agents and the tool
+        # clients once for the lifetime of the process
+        from .crew import ContentCurationCrew
+        import main_fixed  # noqa: F401
+
+        self.crew = ContentCurationCrew()
+        self.jobs: Dict[str, CurationJob] = {}
+        self.job_ttl = job_ttl
+        self.max_finished = max_finished
+        self._jobs_lock = threading.Lock()
+        # Crew jobs can run concurrently: every run gets its own pooled crew
+        # and agents, and its accounting lives in context variables
+        self.executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+        REGISTRY.on_collect(self.collect_metrics)
+
+    def collect_metrics(self):
+        """Set the job gauges from the current job statuses"""
+        counts = {status: 0 for status in ('queued', 'running', 'completed', 'failed')}
+        for job in self.list_jobs():
+            counts[job.status] += 1
+        for status, count in counts.items():
+            JOBS.set(count, status=status)
+
+    def submit(self, topic: str, mode: str = 'fast', force: bool = False) -> CurationJob:
+        """
+        Queue a curation job
+
+        Args:
+            topic: Educational topic to curate
+            mode: 'fast' for the direct pipeline or 'crew' for the full crew
+            force: Ignore cached curations of an equivalent topic
+
+        Returns:
+            The queued job
+        """
+        if mode not in ('fast', 'crew'):
+            raise ValueError(f"Unknown mode: {mode}")
+        job = CurationJob(topic, mode, force)
+        with self._jobs_lock:
+            self._evict_finished()
+            self.jobs[job.id] = job
+        self.executor.submit(self._run, job)
+        return job
+
+    def _evict_finished(self):
+        """Drop finished jobs past their TTL, then the oldest beyond max_finished (holding _jobs_lock)"""
+        now = time.time()
+        finished = sorted((job for job in self.jobs.values() if job.finished is not None),
+                          key=lambda job: job.finished)
+        excess = len(finished) - self.max_finished
+        for i, job in enumerate(finished):
+            if i < excess or now - job.finished > self.job_ttl:
+                del self.jobs[job.id]
+
+    def list_jobs(self) -> List[CurationJob]:
+        with self._jobs_lock:
+            self._evict_finished()
+            return list(self.jobs.values())
+
+    def get(self, job_id: str) -> Optional[CurationJob]:
+        with self._jobs_lock:
+            return self.jobs.get(job_id)
+
+    def stream(self, job_id: str) -> Iterator[Dict]:
+        """
+        Yield a job's progress events as they happen, ending with the result
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Iterator of event dictionaries
+        """
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        seen = 0
+        while True:
+            events = job.wait_events(seen)
+            seen += len(events)
+            yield from events
+            if job.done and seen >= len(job.events):
+                return
+
+    def _run(self, job: CurationJob):
+        job.status = 'running'
+        job.emit('started')
+        try:
+            on_resource = lambda index, resource: job.emit(
+                'resource', index=index, title=resource['title'], url=resource['url']
+            )
+            if job.mode == 'fast':
+                job.filepath = run_curation(
+                    job.topic, 'fast', run_id=job.id, on_resource=on_resource, force=job.force
+                )
+            else:
+                job.filepath = run_curation(
+                    job.topic, 'crew', run_id=job.id, crew=self.crew, force=job.force
+                )
+
+            with open(job.filepath, 'r', encoding='utf-8') as f:
+                job.content = f.read()
+            job.finish('completed', filepath=job.filepath)
+
+        except Exception as e:
+            job.error = str(e)
+            job.finish('failed', error=job.error)
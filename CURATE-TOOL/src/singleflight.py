@@ -0,0 +1,177 @@
+"""
+Run-scoped single-flight deduplication of identical tool calls
+"""
+import asyncio
+import re
+import threading
+from concurrent.futures import Future
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from .metrics import CACHE_REQUESTS
+
+# Tool results starting with these prefixes are errors: concurrent callers
+# share them, but they are not kept, so a later retry goes to the network
+ERROR_PREFIXES = ('Error:', 'Search error:', 'Scraping error:', 'Analysis error:', 'Analysis skipped:')
+
+
+def normalize_argument(value) -> str:
+    """Normalize a tool argument so trivially different spellings match"""
+    value = re.sub(r'\s+', ' ', str(value).strip().strip('"\''))
+    # URL paths are case-sensitive; search queries are not
+    return value if value.startswith(('http://', 'https://')) else value.lower()
+
+
+class SingleFlight:
+    """
+    Shares one execution among identical tool calls of a run
+
+    The first caller for a (tool, arguments) key runs the function; callers
+    arriving while it is in flight wait for the same result, and later
+    callers get the completed result from memory.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Tuple, Future] = {}
+        self._seeded = set()
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'executed': 0, 'collapsed_in_flight': 0, 'memory_hits': 0,
+                      'seeded_hits': 0}
+
+    @staticmethod
+    def key(tool: str, *args) -> Tuple:
+        return (tool,) + tuple(normalize_argument(arg) for arg in args)
+
+    @property
+    def collapsed(self) -> int:
+        """Calls that did not reach the network"""
+        return self.stats['collapsed_in_flight'] + self.stats['memory_hits']
+
+    def seed(self, tool: str, future: Future, *args):
+        """Register work started elsewhere (e.g. a prefetch) under a call key"""
+        key = self.key(tool, *args)
+        with self._lock:
+            if self._calls.setdefault(key, future) is future:
+                self._seeded.add(key)
+        future.add_done_callback(lambda done: self._forget_if_failed(key, done))
+
+    def get(self, tool: str, *args) -> Optional[Future]:
+        with self._lock:
+            return self._calls.get(self.key(tool, *args))
+
+    def _claim(self, key: Tuple) -> Tuple[Future, bool]:
+        """Return the future for key and whether the caller must execute it"""
+        with self._lock:
+            self.stats['calls'] += 1
+            future = self._calls.get(key)
+            owner = future is None or future.cancelled()
+            if owner:
+                future = Future()
+                self._calls[key] = future
+                self._seeded.discard(key)
+                self.stats['executed'] += 1
+            elif future.done():
+                self.stats['memory_hits'] += 1
+            else:
+                self.stats['collapsed_in_flight'] += 1
+            if not owner and key in self._seeded:
+                self.stats['seeded_hits'] += 1
+        CACHE_REQUESTS.inc(cache='singleflight', result='miss' if owner else 'hit')
+        return future, owner
+
+    def call(self, tool: str, func: Callable, *args) -> str:
+        """
+        Run func(*args) once per key, sharing the result with identical calls
+
+        Args:
+            tool: Tool name
+            func: Function performing the call
+            *args: Tool arguments
+
+        Returns:
+            Tool result
+        """
+        key = self.key(tool, *args)
+        future, owner = self._claim(key)
+
+        if not owner:
+            try:
+                return future.result()
+            except Exception:
+                # The shared execution failed; run it ourselves
+                return func(*args)
+
+        try:
+            result = func(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            self._forget(key, future)
+            raise
+        future.set_result(result)
+        self._forget_if_failed(key, future)
+        return result
+
+    async def acall(self, tool: str, func: Callable[..., Awaitable], *args) -> str:
+        """Async counterpart of call for coroutine functions"""
+        key = self.key(tool, *args)
+        future, owner = self._claim(key)
+
+        if not owner:
+            try:
+                # Shielded so a cancelled waiter does not cancel the shared call
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                return await func(*args)
+
+        try:
+            result = await func(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            self._forget(key, future)
+            raise
+        future.set_result(result)
+        self._forget_if_failed(key, future)
+        return result
+
+    def _forget(self, key: Tuple, future: Future):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def _forget_if_failed(self, key: Tuple, future: Future):
+        if future.cancelled() or future.exception() is not None:
+            self._forget(key, future)
+        elif isinstance(future.result(), str) and future.result().startswith(ERROR_PREFIXES):
+            self._forget(key, future)
+
+
+_current_flight: ContextVar[Optional[SingleFlight]] = ContextVar('current_flight', default=None)
+
+
+def start_flight() -> SingleFlight:
+    """Begin a single-flight scope for the current run"""
+    flight = SingleFlight()
+    _current_flight.set(flight)
+    return flight
+
+
+def current_flight() -> Optional[SingleFlight]:
+    return _current_flight.get()
+
+
+def end_flight():
+    _current_flight.set(None)
+
+
+def singleflight_call(tool: str, func: Callable, *args) -> str:
+    """Run a tool call through the active single-flight scope, if any"""
+    flight = _current_flight.get()
+    return flight.call(tool, func, *args) if flight else func(*args)
+
+
+async def singleflight_acall(tool: str, func: Callable[..., Awaitable], *args) -> str:
+    """Async counterpart of singleflight_call"""
+    flight = _current_flight.get()
+    return await flight.acall(tool, func, *args) if flight else await func(*args)
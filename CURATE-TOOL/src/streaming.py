@@ -0,0 +1,115 @@
+"""
+Token streaming of the final curation task to the console and output file
+"""
+import sys
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional
+
+try:
+    from langchain_core.callbacks import BaseCallbackHandler
+except ImportError:
+    BaseCallbackHandler = object
+
+# Marker of the answer in CrewAI's ReAct format; what an LLM call writes
+# before it ("Thought: ...", tool calls) is the agent's scaffolding
+FINAL_ANSWER = 'Final Answer:'
+
+
+class TokenStreamer:
+    """
+    Writes the final answer's tokens to the console and appends them to a
+    file as they arrive, leaving out the ReAct scaffolding before it
+    """
+
+    def __init__(self, path: Path, started: Optional[float] = None, echo: bool = True):
+        """
+        Args:
+            path: File the tokens are appended to
+            started: Reference time for time-to-first-token (defaults to now)
+            echo: Also print tokens to the console
+        """
+        self.path = Path(path)
+        self.started = started or time.perf_counter()
+        self.echo = echo
+        self.first_token_at: Optional[float] = None
+        self.tokens = 0
+        self._file = None
+        # Text of the current LLM call not yet known to be part of the answer
+        self._pending = ''
+        self._answering = False
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        """Seconds from the start of the run to the first streamed token"""
+        return self.first_token_at - self.started if self.first_token_at else None
+
+    def start_call(self):
+        """A new LLM call starts: hold its tokens back until its final answer begins"""
+        self._pending = ''
+        self._answering = False
+
+    def write(self, token: str):
+        if not self._answering:
+            self._pending += token or ''
+            start = self._pending.find(FINAL_ANSWER)
+            if start < 0:
+                return
+            token = self._pending[start + len(FINAL_ANSWER):]
+            self._pending = ''
+            self._answering = True
+        if self.first_token_at is None:
+            token = (token or '').lstrip()
+        if not token:
+            return
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self.tokens += 1
+        self._file.write(token)
+        self._file.flush()
+        if self.echo:
+            sys.stdout.write(token)
+            sys.stdout.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        """Close and delete the streamed file, so a failed run leaves no partial output behind"""
+        self.close()
+        if self.first_token_at is not None:
+            self.path.unlink(missing_ok=True)
+
+
+_current_streamer: ContextVar[Optional[TokenStreamer]] = ContextVar('current_streamer', default=None)
+
+
+def set_streamer(streamer: Optional[TokenStreamer]):
+    """Route streamed tokens in the current context to streamer"""
+    _current_streamer.set(streamer)
+
+
+class StreamingCallbackHandler(BaseCallbackHandler):
+    """LangChain callback forwarding new tokens to the active streamer"""
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        streamer = _current_streamer.get()
+        if streamer:
+            streamer.start_call()
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.on_llm_start(serialized, messages, **kwargs)
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        streamer = _current_streamer.get()
+        if streamer:
+            streamer.write(token)
+
+
+# Shared handler attached to streaming LLM clients
+streaming_callback = StreamingCallbackHandler()
@@ -1,28 +1,68 @@
 """
 Custom tools for CrewAI agents
 """
+import asyncio
 import json
-import requests
-from typing import Dict, List, Callable
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, Tuple
 import google.generativeai as genai
-from bs4 import BeautifulSoup
 
-from config.settings import SERPER_API_KEY, GOOGLE_API_KEY, MAX_SEARCH_RESULTS, SEARCH_LANGUAGE, GEMINI_MODEL
+from config.settings import (
+    SERPER_API_KEY, GOOGLE_API_KEY, MAX_SEARCH_RESULTS, SEARCH_LANGUAGE, GEMINI_MODEL,
+    SEARCH_MODE, LOCAL_SEARCH_MIN_RESULTS, RESOURCE_INDEX_ENABLED, SCRAPE_MAX_CHARS
+)
+from .index import get_resource_index
+from .extract import truncate_text
+from .scraper import parse_page, scrape_pages
+from .usage import track_tool, observe_tool, current_run, estimate_tokens
+from .singleflight import singleflight_call, singleflight_acall
+from .aio import get_http_client, run_sync, shared_loop
+from .domains import (
+    domain_snapshot, is_domain_failure, is_unreliable, record_outcome, response_outcome, url_domain
+)
+from .limiter import host_target, limited
+from .deadline import DEADLINE_MESSAGE, call_timeout, deadline_expired, deadline_passed
+from .url_index import record_url
+from .profiling import profiled
 
 # Configure Gemini
 genai.configure(api_key=GOOGLE_API_KEY)
 
+@lru_cache(maxsize=None)
+def get_gemini_model(model_name: str = GEMINI_MODEL):
+    """Return a cached Gemini model client"""
+    return genai.GenerativeModel(model_name)
 
-def search_web(query: str) -> str:
+
+@track_tool('web_search')
+@shared_loop
+async def search_web_async(query: str) -> str:
     """
     Search the web using Serper API
     
+    In "local_first" search mode the local resource index is queried first
+    and Serper is only called when it has too few matches.
+    
     Args:
         query: Search query string
         
     Returns:
         JSON string with search results
     """
+    if SEARCH_MODE == 'local_first':
+        try:
+            # Both paths return up to MAX_SEARCH_RESULTS results
+            local_results = await asyncio.to_thread(get_resource_index().search, query, MAX_SEARCH_RESULTS)
+            if len(local_results) >= min(LOCAL_SEARCH_MIN_RESULTS, MAX_SEARCH_RESULTS):
+                for item in local_results:
+                    record_url(item['link'], item['title'])
+                return json.dumps(local_results, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"⚠️ Local index search failed: {e}")
+    
+    if deadline_passed("búsquedas"):
+        return f"Search error: {DEADLINE_MESSAGE}"
     try:
         url = "https://google.serper.dev/search"
         
@@ -38,29 +78,40 @@ def search_web(query: str) -> str:
             "num": MAX_SEARCH_RESULTS
         }
         
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
+        async with limited('serper') as call:
+            response = await get_http_client().post(url, headers=headers, json=payload, timeout=call_timeout(10))
+            call.observe(response.status_code)
         
         if response.status_code == 200:
             data = response.json()
             results = []
             
             # Extract organic results
-            for item in data.get('organic', [])[:5]:
+            for item in data.get('organic', [])[:MAX_SEARCH_RESULTS]:
                 results.append({
                     'title': item.get('title'),
                     'snippet': item.get('snippet'),
                     'link': item.get('link')
                 })
+                record_url(item.get('link'), item.get('title'))
             
             return json.dumps(results, indent=2, ensure_ascii=False)
         else:
             return f"Error: HTTP {response.status_code}"
             
     except Exception as e:
-        return f"Search error: {str(e)}"
+        return f"Search error: {DEADLINE_MESSAGE if deadline_expired() else str(e)}"
 
 
-def analyze_with_gemini(prompt: str, context: str = "") -> str:
+@profiled('search')
+def search_web(query: str) -> str:
+    """Blocking wrapper of search_web_async"""
+    return run_sync(search_web_async(query))
+
+
+@track_tool('gemini_analysis')
+@shared_loop
+async def analyze_with_gemini_async(prompt: str, context: str = "") -> str:
     """
     Perform deep analysis using Gemini AI
     
@@ -72,7 +123,7 @@ def analyze_with_gemini(prompt: str, context: str = "") -> str:
         Analysis result as string
     """
     try:
-        model = genai.GenerativeModel(GEMINI_MODEL)
+        model = get_gemini_model()
         
         full_prompt = f"""
         You are an expert educational content analyst.
@@ -84,14 +135,49 @@ def analyze_with_gemini(prompt: str, context: str = "") -> str:
         Provide a detailed, structured analysis.
         """
         
-        response = model.generate_content(full_prompt)
+        usage = current_run()
+        if usage and usage.over_budget():
+            usage.budget_exceeded = True
+            return "Analysis skipped: run budget exceeded"
+        if deadline_passed("análisis con Gemini"):
+            return f"Analysis skipped: {DEADLINE_MESSAGE}"
+        
+        started = time.perf_counter()
+        async with limited('gemini'):
+            response = await asyncio.wait_for(model.generate_content_async(full_prompt), call_timeout(None))
+        
+        if usage:
+            metadata = getattr(response, 'usage_metadata', None)
+            usage.record_llm(
+                GEMINI_MODEL,
+                getattr(metadata, 'prompt_token_count', 0) or estimate_tokens(full_prompt),
+                getattr(metadata, 'candidates_token_count', 0) or estimate_tokens(response.text),
+                time.perf_counter() - started,
+                tool='gemini_analysis'
+            )
         return response.text
         
     except Exception as e:
-        return f"Analysis error: {str(e)}"
+        return f"Analysis error: {DEADLINE_MESSAGE if deadline_expired() else str(e)}"
 
 
-def scrape_webpage(url: str) -> str:
+@profiled('llm')
+def analyze_with_gemini(prompt: str, context: str = "") -> str:
+    """Blocking wrapper of analyze_with_gemini_async"""
+    return run_sync(analyze_with_gemini_async(prompt, context))
+
+
+def index_page(url: str, title: str, text: str):
+    """Store a scraped page in the local resource index, ignoring index errors"""
+    try:
+        get_resource_index().add_page(url, title, text, content_quality_metrics(text))
+    except Exception as e:
+        print(f"⚠️ Could not index {url}: {e}")
+
+
+@track_tool('webpage_scraper')
+@shared_loop
+async def scrape_webpage_async(url: str) -> str:
     """
     Extract content from a webpage
     
@@ -101,45 +187,100 @@ def scrape_webpage(url: str) -> str:
     Returns:
         Extracted content as string
     """
+    if await asyncio.to_thread(is_unreliable, url):
+        return skipped_domain_error(url)
+    if deadline_passed("scraping de páginas"):
+        return f"Scraping error: {DEADLINE_MESSAGE}"
+    started = time.perf_counter()
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.content, 'lxml')
-        
-        # Remove scripts and styles
-        for element in soup(['script', 'style']):
-            element.decompose()
-        
-        # Extract text
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        # Limit length
-        max_length = 2000
-        if len(text) > max_length:
-            text = text[:max_length] + "..."
-        
-        return text
+        async with limited(host_target(url)) as call:
+            started = time.perf_counter()  # time spent waiting for a slot is not the domain's
+            response = await get_http_client().get(url, timeout=call_timeout(10))
+            call.observe(response.status_code)
+        # Main content only: navigation, footers and banners are left out.
+        # Parsing runs in the parse process pool, indexing in a thread.
+        page = await parse_page(response.content)
+        return await asyncio.to_thread(
+            finish_scrape, url, response.status_code, page, time.perf_counter() - started
+        )
         
     except Exception as e:
-        return f"Scraping error: {str(e)}"
+        if deadline_expired():
+            # Cut short by the deadline: says nothing about the domain
+            return f"Scraping error: {DEADLINE_MESSAGE}"
+        error = f"Scraping error: {str(e)}"
+        # Parse errors say nothing about the domain either
+        if is_domain_failure(e):
+            await asyncio.to_thread(record_outcome, url, False, time.perf_counter() - started, error)
+        return error
 
 
-def evaluate_content_quality(content: str) -> str:
+@profiled('scrape')
+def scrape_webpage(url: str) -> str:
+    """Blocking wrapper of scrape_webpage_async"""
+    return run_sync(scrape_webpage_async(url))
+
+
+def skipped_domain_error(url: str) -> str:
+    return f"Scraping error: skipped, {url_domain(url)} keeps failing (domain reliability)"
+
+
+def finish_scrape(url: str, status: int, page: Dict, seconds: float) -> str:
+    """Record the domain outcome, index an extracted page and cut its text to the scraper budget"""
+    ok, error = response_outcome(status)
+    record_outcome(url, ok, seconds, error)
+    if status < 400:
+        record_url(url)
+    text = page['full_text']
+    if RESOURCE_INDEX_ENABLED and status < 400:
+        index_page(url, page['title'] or url, text)
+    return truncate_text(text, SCRAPE_MAX_CHARS)
+
+
+def scrape_webpages(urls: Iterable[str]) -> Iterator[Tuple[str, str]]:
     """
-    Evaluate the quality of educational content
+    Scrape many pages with the two-stage scraper
+    
+    Args:
+        urls: URLs to scrape
+        
+    Yields:
+        (url, extracted content or "Scraping error: ...") in completion order,
+        starting with the URLs of unreliable domains, which are not fetched
+    """
+    reliability = domain_snapshot()
+    pending = []
+    for url in urls:
+        if is_unreliable(url, reliability):
+            yield url, skipped_domain_error(url)
+        else:
+            pending.append(url)
+    for url, status, page, seconds in scrape_pages(pending):
+        if status is None:
+            # Fetch failures of the domain were recorded by the scraper
+            observe_tool('webpage_scraper', seconds, 'error')
+            yield url, page
+        else:
+            observe_tool('webpage_scraper', seconds)
+            yield url, finish_scrape(url, status, page, seconds)
+
+
+@profiled('score')
+def content_quality_metrics(content: str) -> Dict:
+    """
+    Compute the quality metrics and score used by evaluate_content_quality
     
     Args:
         content: Content to evaluate
         
     Returns:
-        Quality report as string
+        Dictionary with the individual metrics and the 0-100 score
     """
+    return content_metrics(content)
+
+
+def content_metrics(content: str) -> Dict:
+    """content_quality_metrics without the profiling hook, for per-candidate loops"""
     # Calculate metrics
     word_count = len(content.split())
     paragraph_count = len(content.split('\n\n'))
@@ -155,22 +296,74 @@ def evaluate_content_quality(content: str) -> str:
     if has_examples: score += 20
     if has_sources: score += 25
     
+    return {
+        'score': score,
+        'word_count': word_count,
+        'paragraph_count': paragraph_count,
+        'has_structure': has_structure,
+        'has_examples': has_examples,
+        'has_sources': has_sources
+    }
+
+
+def evaluate_content_quality(content: str) -> str:
+    """
+    Evaluate the quality of educational content
+    
+    Args:
+        content: Content to evaluate
+        
+    Returns:
+        Quality report as string
+    """
+    metrics = content_quality_metrics(content)
+    
     # Generate report
     report = f"""
 📊 Content Quality Evaluation
-Score: {score}/100
+Score: {metrics['score']}/100
 
 📈 Metrics:
-- Words: {word_count}
-- Paragraphs: {paragraph_count}
-- Structured: {'Yes' if has_structure else 'No'}
-- Examples: {'Yes' if has_examples else 'No'}
-- Sources: {'Yes' if has_sources else 'No'}
+- Words: {metrics['word_count']}
+- Paragraphs: {metrics['paragraph_count']}
+- Structured: {'Yes' if metrics['has_structure'] else 'No'}
+- Examples: {'Yes' if metrics['has_examples'] else 'No'}
+- Sources: {'Yes' if metrics['has_sources'] else 'No'}
 """
     
     return report
 
 
+# Tool entry points. Identical calls within a run share one execution
+# (including prefetched results) through the run's single-flight scope.
+def run_web_search(query: str) -> str:
+    return singleflight_call('web_search', search_web, query)
+
+
+def run_gemini_analysis(prompt: str, context: str = "") -> str:
+    return singleflight_call('gemini_analysis', analyze_with_gemini, prompt, context)
+
+
+def run_webpage_scraper(url: str) -> str:
+    return singleflight_call('webpage_scraper', scrape_webpage, url)
+
+
+def run_quality_evaluator(content: str) -> str:
+    return singleflight_call('quality_evaluator', evaluate_content_quality, content)
+
+
+async def run_web_search_async(query: str) -> str:
+    return await singleflight_acall('web_search', search_web_async, query)
+
+
+async def run_gemini_analysis_async(prompt: str, context: str = "") -> str:
+    return await singleflight_acall('gemini_analysis', analyze_with_gemini_async, prompt, context)
+
+
+async def run_webpage_scraper_async(url: str) -> str:
+    return await singleflight_acall('webpage_scraper', scrape_webpage_async, url)
+
+
 # Intentar usar las herramientas nativas de CrewAI
 try:
     from crewai_tools import BaseTool
@@ -188,7 +381,10 @@ try:
         args_schema: Type[BaseModel] = WebSearchInput
         
         def _run(self, query: str) -> str:
-            return search_web(query)
+            return run_web_search(query)
+        
+        async def _arun(self, query: str) -> str:
+            return await run_web_search_async(query)
     
     class GeminiAnalysisInput(BaseModel):
         """Input schema for GeminiAnalysisTool."""
@@ -201,7 +397,10 @@ try:
         args_schema: Type[BaseModel] = GeminiAnalysisInput
         
         def _run(self, prompt: str, context: str = "") -> str:
-            return analyze_with_gemini(prompt, context)
+            return run_gemini_analysis(prompt, context)
+        
+        async def _arun(self, prompt: str, context: str = "") -> str:
+            return await run_gemini_analysis_async(prompt, context)
     
     class WebScrapeInput(BaseModel):
         """Input schema for WebScrapeTool."""
@@ -213,7 +412,10 @@ try:
         args_schema: Type[BaseModel] = WebScrapeInput
         
         def _run(self, url: str) -> str:
-            return scrape_webpage(url)
+            return run_webpage_scraper(url)
+        
+        async def _arun(self, url: str) -> str:
+            return await run_webpage_scraper_async(url)
     
     class QualityInput(BaseModel):
         """Input schema for QualityTool."""
@@ -225,7 +427,7 @@ try:
         args_schema: Type[BaseModel] = QualityInput
         
         def _run(self, content: str) -> str:
-            return evaluate_content_quality(content)
+            return run_quality_evaluator(content)
     
     # Crear instancias de las herramientas
     search_tool = WebSearchTool()
@@ -245,28 +447,37 @@ except ImportError:
             description: str = "Search for information on the web"
             
             def _run(self, query: str) -> str:
-                return search_web(query)
+                return run_web_search(query)
+            
+            async def _arun(self, query: str) -> str:
+                return await run_web_search_async(query)
         
         class GeminiAnalysisTool(BaseTool):
             name: str = "gemini_analysis"
             description: str = "Perform deep analysis using Gemini AI"
             
             def _run(self, prompt: str, context: str = "") -> str:
-                return analyze_with_gemini(prompt, context)
+                return run_gemini_analysis(prompt, context)
+            
+            async def _arun(self, prompt: str, context: str = "") -> str:
+                return await run_gemini_analysis_async(prompt, context)
         
         class WebScrapeTool(BaseTool):
             name: str = "webpage_scraper"
             description: str = "Extract content from webpages"
             
             def _run(self, url: str) -> str:
-                return scrape_webpage(url)
+                return run_webpage_scraper(url)
+            
+            async def _arun(self, url: str) -> str:
+                return await run_webpage_scraper_async(url)
         
         class QualityTool(BaseTool):
             name: str = "quality_evaluator"
             description: str = "Evaluate content quality"
             
             def _run(self, content: str) -> str:
-                return evaluate_content_quality(content)
+                return run_quality_evaluator(content)
         
         # Crear instancias de las herramientas
         search_tool = WebSearchTool()
@@ -282,11 +493,12 @@ except ImportError:
         
         # Crear objetos simples que simulen herramientas
         class FunctionTool:
-            def __init__(self, name, description, func):
+            def __init__(self, name, description, func, afunc=None):
                 self.name = name
                 self.description = description
                 self.func = func
                 self._run = func
+                self._arun = afunc
                 
             def run(self, *args, **kwargs):
                 return self.func(*args, **kwargs)
@@ -294,23 +506,26 @@ except ImportError:
         search_tool = FunctionTool(
             name="web_search",
             description="Search for information on the web",
-            func=search_web
+            func=run_web_search,
+            afunc=run_web_search_async
         )
         
         gemini_tool = FunctionTool(
             name="gemini_analysis", 
             description="Perform deep analysis using Gemini AI",
-            func=analyze_with_gemini
+            func=run_gemini_analysis,
+            afunc=run_gemini_analysis_async
         )
         
         scrape_tool = FunctionTool(
             name="webpage_scraper",
             description="Extract content from webpages",
-            func=scrape_webpage
+            func=run_webpage_scraper,
+            afunc=run_webpage_scraper_async
         )
         
         quality_tool = FunctionTool(
             name="quality_evaluator",
             description="Evaluate content quality",
-            func=evaluate_content_quality
+            func=run_quality_evaluator
         )
\ No newline at end of file
@@ -0,0 +1,221 @@
+"""
+Per-run index of the URLs returned by the search and scrape tools, and an
+offline filter for curated documents citing URLs that are not in it
+"""
+import re
+import threading
+import unicodedata
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from config.settings import URL_FILTER_MODE
+
+# Query parameters that do not change the page a URL points to
+TRACKING_PARAMS = re.compile(r'^(utm_\w+|gclid|fbclid|mc_cid|mc_eid|ref|ref_src)$', re.IGNORECASE)
+
+# "**URL:** https://..." (optionally as a markdown link or between <>);
+# balanced parentheses are part of the URL, e.g. .../Python_(programming_language)
+URL_LINE = re.compile(r'(\*\*URL:\*\*\s*(?:\[[^\]]*\]\()?<?)(https?://(?:[^\s()<>\]]|\([^\s()<>\]]*\))+)')
+TITLE_LINE = re.compile(r'\*\*T[ií]tulo(?: Original)?:\*\*\s*(.+)', re.IGNORECASE)
+ENTRY_HEADING = re.compile(r'^(#{3,}\s*)(\d+)\.')
+
+
+def strip_unbalanced(url: str) -> str:
+    """Drop trailing punctuation, and closing parentheses/brackets that have no opening one"""
+    while url:
+        last = url[-1]
+        if last in '.,;:*>':
+            url = url[:-1]
+        elif last == ')' and url.count(')') > url.count('('):
+            url = url[:-1]
+        elif last == ']' and url.count(']') > url.count('['):
+            url = url[:-1]
+        else:
+            break
+    return url
+
+
+def canonical_url(url: str) -> str:
+    """
+    Canonical form of a URL for matching: no scheme, "www.", default port,
+    fragment, trailing slash or tracking parameters; sorted query
+
+    Args:
+        url: URL as written by a tool or the model
+
+    Returns:
+        Canonical key ('' if the URL cannot be parsed)
+    """
+    url = strip_unbalanced(url.strip())
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+        port = parts.port
+    except ValueError:
+        return ''
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAMS.match(key)
+    ))
+    path = parts.path.rstrip('/')
+    return host + path + (f"?{query}" if query else '')
+
+
+def normalize_title(title: str) -> str:
+    title = unicodedata.normalize('NFKC', title).casefold()
+    return re.sub(r'\s+', ' ', title.strip(' *_"\'[]')).strip()
+
+
+class URLIndex:
+    """Set index of the URLs (and canonical URLs) a run's tools returned"""
+
+    def __init__(self):
+        self.urls = set()
+        # canonical URL -> first URL seen with it
+        self.canonical: Dict[str, str] = {}
+        # normalized search result title -> its URL
+        self.titles: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def add(self, url: str, title: Optional[str] = None):
+        if not url:
+            return
+        key = canonical_url(url)
+        with self._lock:
+            self.urls.add(url)
+            if key:
+                self.canonical.setdefault(key, url)
+            if title:
+                self.titles.setdefault(normalize_title(title), url)
+
+    def lookup(self, url: str) -> Optional[str]:
+        """Return the indexed URL matching url exactly or canonically, if any"""
+        with self._lock:
+            if url in self.urls:
+                return url
+            return self.canonical.get(canonical_url(url))
+
+    def by_title(self, title: str) -> Optional[str]:
+        with self._lock:
+            return self.titles.get(normalize_title(title))
+
+
+_current_index: ContextVar[Optional[URLIndex]] = ContextVar('current_url_index', default=None)
+
+
+def start_url_index() -> URLIndex:
+    """Begin indexing tool URLs for the current run"""
+    index = URLIndex()
+    _current_index.set(index)
+    return index
+
+
+def current_url_index() -> Optional[URLIndex]:
+    return _current_index.get()
+
+
+def record_url(url: str, title: Optional[str] = None):
+    """Add a URL returned by a tool to the current run's index, if any"""
+    index = current_url_index()
+    if index is not None:
+        index.add(url, title)
+
+
+def _entries(lines: List[str]) -> List[Tuple[int, int]]:
+    """(start, end) line ranges of the numbered resource entries ("### N.")"""
+    starts = [i for i, line in enumerate(lines) if ENTRY_HEADING.match(line)]
+    entries = []
+    for start in starts:
+        end = start + 1
+        while end < len(lines) and not lines[end].lstrip().startswith('#'):
+            end += 1
+        entries.append((start, end))
+    return entries
+
+
+def filter_curated_urls(content: str, index: URLIndex,
+                        mode: str = URL_FILTER_MODE) -> Tuple[str, Dict]:
+    """
+    Check the "**URL:**" entries of a curated document against the run's URL index
+
+    No network calls are made. An unknown URL is replaced by the indexed URL
+    with the same canonical form or the search result with the same title;
+    otherwise its whole numbered entry is removed and the rest renumbered.
+
+    Args:
+        content: Curated markdown
+        index: URLs returned by the run's tools
+        mode: 'replace' (fix when possible, else remove), 'reject' (only
+            fix canonical matches, remove the rest) or 'off'
+
+    Returns:
+        (filtered content, stats with kept/replaced/rejected counts and the
+        rejected URLs)
+
+    Example (run with python -m doctest src/url_index.py):
+        >>> index = URLIndex()
+        >>> index.add('https://en.wikipedia.org/wiki/Python_(programming_language)')
+        >>> doc = '**URL:** https://en.wikipedia.org/wiki/Python_(programming_language)'
+        >>> content, stats = filter_curated_urls(doc, index, 'replace')
+        >>> content == doc, stats['kept'], stats['replaced']
+        (True, 1, 0)
+        >>> link = '**URL:** [Python](https://en.wikipedia.org/wiki/Python_(programming_language))'
+        >>> filter_curated_urls(link, index, 'replace')[0] == link
+        True
+    """
+    stats = {'kept': 0, 'replaced': 0, 'rejected': 0, 'rejected_urls': []}
+    # Without indexed URLs (tools failed or were not used) there is nothing to check against
+    if mode == 'off' or not len(index):
+        return content, stats
+
+    lines = content.split('\n')
+    entries = _entries(lines)
+    entry_of = {i: (start, end) for start, end in entries for i in range(start, end)}
+    removed = set()
+
+    for i, line in enumerate(lines):
+        match = URL_LINE.search(line)
+        if not match or i in removed:
+            continue
+        url = strip_unbalanced(match.group(2))
+        known = index.lookup(url)
+        if known is None and mode == 'replace':
+            start, end = entry_of.get(i, (i, i + 1))
+            titles = [TITLE_LINE.search(lines[j]) for j in range(start, end)]
+            known = next((index.by_title(t.group(1)) for t in titles if t and index.by_title(t.group(1))), None)
+        if known == url or (known and known.startswith(url)):
+            # The line already cites the indexed URL (a longer one only
+            # means the pattern stopped early): nothing to rewrite
+            stats['kept'] += 1
+        elif known:
+            lines[i] = line.replace(url, known, 1)
+            stats['replaced'] += 1
+        else:
+            start, end = entry_of.get(i, (i, i + 1))
+            removed.update(range(start, end))
+            stats['rejected'] += 1
+            stats['rejected_urls'].append(url)
+
+    if not removed:
+        return '\n'.join(lines), stats
+
+    kept, number = [], 0
+    for i, line in enumerate(lines):
+        if i in removed:
+            continue
+        heading = ENTRY_HEADING.match(line)
+        if heading:
+            number += 1
+            line = f"{heading.group(1)}{number}." + line[heading.end():]
+        kept.append(line)
+    note = (f"> ⚠️ {stats['rejected']} recurso(s) descartado(s): su URL no fue devuelta "
+            f"por la búsqueda ni el scraping de esta ejecución\n")
+    return note + '\n' + '\n'.join(kept), stats
@@ -0,0 +1,319 @@
+"""
+Token, latency and cost accounting per agent, per tool and per run
+"""
+import inspect
+import json
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from config.settings import RUN_MAX_COST_USD, RUN_MAX_TOKENS
+from .deadline import current_deadline
+from .limiter import is_overload_error
+from .metrics import LLM_TOKENS, PROVIDER_REQUESTS, TOOL_CALLS, TOOL_SECONDS
+from .singleflight import ERROR_PREFIXES
+
+try:
+    from langchain_core.callbacks import BaseCallbackHandler
+except ImportError:
+    BaseCallbackHandler = object
+
+
+# USD per million (prompt, completion) tokens
+MODEL_PRICES = {
+    'gpt-3.5-turbo': (0.50, 1.50),
+    'gpt-4o-mini': (0.15, 0.60),
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4-turbo': (10.00, 30.00),
+    'gemini-1.5-flash': (0.075, 0.30),
+    'gemini-1.5-pro': (1.25, 5.00),
+}
+
+
+class BudgetExceeded(Exception):
+    """Raised before an LLM call once the run budget is spent"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)"""
+    return max(1, len(text) // 4) if text else 0
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """
+    Estimate the cost of an LLM call
+
+    Args:
+        model: Model name (matched by prefix against MODEL_PRICES)
+        prompt_tokens: Input tokens
+        completion_tokens: Output tokens
+
+    Returns:
+        Cost in USD (0 for unknown models)
+    """
+    for name in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model and model.startswith(name):
+            prompt_price, completion_price = MODEL_PRICES[name]
+            return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+    return 0.0
+
+
+# Tools whose calls reach an external API without going through an LLM
+# (gemini_analysis is already counted as an LLM call)
+NETWORK_TOOLS = ('web_search', 'webpage_scraper')
+
+
+def _empty_counter() -> Dict:
+    return {'calls': 0, 'prompt_tokens': 0, 'cached_tokens': 0, 'completion_tokens': 0, 'latency': 0.0, 'cost': 0.0}
+
+
+class RunUsage:
+    """Usage counters for a single curation run"""
+
+    def __init__(self, run_id: str, max_cost: float = RUN_MAX_COST_USD,
+                 max_tokens: int = RUN_MAX_TOKENS):
+        """
+        Args:
+            run_id: Run identifier
+            max_cost: Budget in USD (0 means unlimited)
+            max_tokens: Budget in total tokens (0 means unlimited)
+        """
+        self.run_id = run_id
+        self.max_cost = max_cost
+        self.max_tokens = max_tokens
+        self.current_agent = 'unknown'
+        self.started = time.time()
+        self.budget_exceeded = False
+        self.timings: Dict[str, float] = {}
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.totals = _empty_counter()
+        self.agents: Dict[str, Dict] = defaultdict(_empty_counter)
+        self.tools: Dict[str, Dict] = defaultdict(_empty_counter)
+        self._lock = threading.Lock()
+
+    def over_budget(self) -> bool:
+        total_tokens = self.totals['prompt_tokens'] + self.totals['completion_tokens']
+        return bool(
+            (self.max_cost and self.totals['cost'] >= self.max_cost)
+            or (self.max_tokens and total_tokens >= self.max_tokens)
+        )
+
+    def check_budget(self):
+        """Raise BudgetExceeded if the run has spent its budget"""
+        if self.over_budget():
+            self.budget_exceeded = True
+            raise BudgetExceeded(
+                f"Run budget exceeded: ${self.totals['cost']:.4f} / "
+                f"{self.totals['prompt_tokens'] + self.totals['completion_tokens']} tokens"
+            )
+
+    def record_llm(self, model: str, prompt_tokens: int, completion_tokens: int,
+                   latency: float, agent: Optional[str] = None, tool: Optional[str] = None,
+                   cached_tokens: int = 0):
+        """
+        Record one LLM call against the run, its agent and optionally a tool
+
+        cached_tokens is the part of prompt_tokens the provider served from
+        its prompt cache (reported by OpenAI as prompt_tokens_details)
+        """
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            for counter in (self.totals, self.agents[agent or self.current_agent]):
+                counter['calls'] += 1
+                counter['latency'] += latency
+            counters = [self.totals, self.agents[agent or self.current_agent]]
+            # Tool calls and latency are counted by track_tool
+            if tool:
+                counters.append(self.tools[tool])
+            for counter in counters:
+                counter['prompt_tokens'] += prompt_tokens
+                counter['cached_tokens'] += cached_tokens
+                counter['completion_tokens'] += completion_tokens
+                counter['cost'] += cost
+
+    def record_tool(self, tool: str, latency: float):
+        """Record a tool call and its latency"""
+        with self._lock:
+            self.tools[tool]['calls'] += 1
+            self.tools[tool]['latency'] += latency
+
+    def api_calls(self) -> int:
+        """LLM calls plus tool calls that go to an external API"""
+        with self._lock:
+            return self.totals['calls'] + sum(self.tools[tool]['calls'] for tool in NETWORK_TOOLS if tool in self.tools)
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'run_id': self.run_id,
+                'elapsed': round(time.time() - self.started, 3),
+                'budget': {'max_cost': self.max_cost, 'max_tokens': self.max_tokens},
+                'budget_exceeded': self.budget_exceeded,
+                'timings': dict(self.timings),
+                'counters': dict(self.counters),
+                'totals': dict(self.totals),
+                'agents': {name: dict(counter) for name, counter in self.agents.items()},
+                'tools': {name: dict(counter) for name, counter in self.tools.items()}
+            }
+
+    def summary(self) -> str:
+        totals = self.totals
+        cached = f" ({totals['cached_tokens']} cached)" if totals['cached_tokens'] else ""
+        return (
+            f"{totals['calls']} LLM calls, {totals['prompt_tokens']} prompt{cached} + "
+            f"{totals['completion_tokens']} completion tokens, ~${totals['cost']:.4f}"
+        )
+
+    def save(self, path: Path) -> str:
+        """Write the usage report as JSON"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return str(path)
+
+
+_current_run: ContextVar[Optional[RunUsage]] = ContextVar('current_run', default=None)
+
+
+def start_run(run_id: str, max_cost: float = RUN_MAX_COST_USD,
+              max_tokens: int = RUN_MAX_TOKENS) -> RunUsage:
+    """Begin accounting for a run in the current context"""
+    usage = RunUsage(run_id, max_cost, max_tokens)
+    _current_run.set(usage)
+    return usage
+
+
+def current_run() -> Optional[RunUsage]:
+    """Return the run being accounted in this context, if any"""
+    return _current_run.get()
+
+
+def usage_path_for(output_path: str) -> Path:
+    """Path of the usage report saved next to an output file"""
+    return Path(output_path).with_suffix('.usage.json')
+
+
+def tool_result(value) -> str:
+    """Metrics result label of a tool's return value"""
+    return 'error' if isinstance(value, str) and value.startswith(ERROR_PREFIXES) else 'ok'
+
+
+def observe_tool(name: str, seconds: float, result: str = 'ok'):
+    """Record a tool call in the process metrics and, if any, the current run"""
+    TOOL_CALLS.inc(tool=name, result=result)
+    TOOL_SECONDS.observe(seconds, tool=name)
+    usage = current_run()
+    if usage:
+        usage.record_tool(name, seconds)
+
+
+def track_tool(name: str) -> Callable:
+    """Decorator recording call latency of a tool function in the current run and the process metrics"""
+    def finish(started: float, result: str):
+        observe_tool(name, time.perf_counter() - started, result)
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                result = 'error'
+                try:
+                    value = await func(*args, **kwargs)
+                    result = tool_result(value)
+                    return value
+                finally:
+                    finish(started, result)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            result = 'error'
+            try:
+                value = func(*args, **kwargs)
+                result = tool_result(value)
+                return value
+            finally:
+                finish(started, result)
+        return wrapper
+    return decorator
+
+
+def llm_provider(model: str) -> str:
+    """Provider label of an LLM model name"""
+    model = (model or '').lower()
+    if 'gemini' in model:
+        return 'gemini'
+    return 'openai' if model.startswith(('gpt', 'o1', 'o3', 'o4')) else 'llm'
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain callback that accounts every LLM call to the current run and
+    stops new calls once the run budget is spent or the run deadline passes
+    """
+
+    raise_error = True
+
+    def __init__(self):
+        super().__init__()
+        self._pending: Dict = {}
+
+    def _start(self, run_id, prompt_text: str, kwargs: Dict):
+        usage = current_run()
+        if usage:
+            usage.check_budget()
+        deadline = current_deadline()
+        if deadline:
+            deadline.root.check()
+        params = kwargs.get('invocation_params') or {}
+        model = params.get('model_name') or params.get('model') or ''
+        self._pending[run_id] = (time.perf_counter(), estimate_tokens(prompt_text), model, usage)
+
+    def on_llm_start(self, serialized: Dict, prompts: List[str], *, run_id=None, **kwargs):
+        self._start(run_id, "\n".join(prompts), kwargs)
+
+    def on_chat_model_start(self, serialized: Dict, messages: List[List], *, run_id=None, **kwargs):
+        text = "\n".join(str(getattr(m, 'content', m)) for batch in messages for m in batch)
+        self._start(run_id, text, kwargs)
+
+    def on_llm_end(self, response, *, run_id=None, **kwargs):
+        pending = self._pending.pop(run_id, None)
+        if pending is None:
+            return
+        started, estimated_prompt, model, usage = pending
+        llm_output = response.llm_output or {}
+        token_usage = llm_output.get('token_usage') or {}
+        prompt_tokens = token_usage.get('prompt_tokens') or estimated_prompt
+        completion_tokens = token_usage.get('completion_tokens')
+        cached_tokens = (token_usage.get('prompt_tokens_details') or {}).get('cached_tokens') or 0
+        if completion_tokens is None:
+            text = "".join(g.text for batch in response.generations for g in batch)
+            completion_tokens = estimate_tokens(text)
+        model = llm_output.get('model_name') or model
+        PROVIDER_REQUESTS.inc(provider=llm_provider(model), result='ok')
+        LLM_TOKENS.inc(prompt_tokens, kind='prompt')
+        LLM_TOKENS.inc(cached_tokens, kind='cached')
+        LLM_TOKENS.inc(completion_tokens, kind='completion')
+        if usage is None:
+            return
+        usage.record_llm(
+            model, prompt_tokens, completion_tokens,
+            time.perf_counter() - started, cached_tokens=cached_tokens
+        )
+
+    def on_llm_error(self, error, *, run_id=None, **kwargs):
+        pending = self._pending.pop(run_id, None)
+        if pending is not None:
+            result = 'overload' if is_overload_error(error) else 'error'
+            PROVIDER_REQUESTS.inc(provider=llm_provider(pending[2]), result=result)
+
+
+# Shared handler attached to every LLM client
+usage_callback = UsageCallbackHandler()
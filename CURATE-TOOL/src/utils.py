@@ -2,17 +2,22 @@
 Utility functions for the project
 """
 import os
+import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional
 
 from config.settings import OUTPUT_DIR, OUTPUT_FORMAT, GEMINI_MODEL
+from .profiling import profiled
 
 
 def generate_run_id(topic: str) -> str:
     """
     Generate a unique run ID for the content curation
     
+    The random suffix keeps IDs collision-free when several runs of the
+    same topic start within the same second.
+    
     Args:
         topic: Topic name
         
@@ -21,9 +26,32 @@ def generate_run_id(topic: str) -> str:
     """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     safe_topic = topic.replace(" ", "_").replace("/", "_")[:30]  # Limit length
-    return f"course_{safe_topic}_{timestamp}"
+    return f"course_{safe_topic}_{timestamp}_{uuid.uuid4().hex[:8]}"
 
 
+def output_path(topic: str, run_id: str, output_format: str = None,
+                base_dir: Optional[Path] = None) -> Path:
+    """
+    Path where save_content writes a run's content
+    
+    Args:
+        topic: Topic name
+        run_id: Unique identifier for the run
+        output_format: Output format (default from settings)
+        base_dir: Optional project structure directory
+        
+    Returns:
+        Output file path
+    """
+    output_format = output_format or OUTPUT_FORMAT
+    if base_dir:
+        # Save inside the provided project structure
+        return base_dir / f"full_content.{output_format}"
+    # Save as a standalone file in the main output directory
+    return OUTPUT_DIR / f"{run_id}.{output_format}"
+
+
+@profiled('save')
 def save_content(content: str, topic: str, run_id: str = None, 
                 output_format: str = None, base_dir: Optional[Path] = None) -> str:
     """
@@ -41,15 +69,7 @@ def save_content(content: str, topic: str, run_id: str = None,
     """
     output_format = output_format or OUTPUT_FORMAT
     run_id = run_id or generate_run_id(topic)
-    
-    if base_dir:
-        # Save inside the provided project structure
-        filename = f"full_content.{output_format}"
-        filepath = base_dir / filename
-    else:
-        # Save as a standalone file in the main output directory
-        filename = f"{run_id}.{output_format}"
-        filepath = OUTPUT_DIR / filename
+    filepath = output_path(topic, run_id, output_format, base_dir)
     
     # Ensure output directory exists
     filepath.parent.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,19 @@
+"""
+Tests for topic normalization of the topic cache
+"""
+from src.cache import normalize_topic
+
+
+def test_case_and_whitespace_share_one_key():
+    assert normalize_topic("AI Marketing") == "ai marketing"
+    assert normalize_topic("ai marketing") == "ai marketing"
+    assert normalize_topic("  AI \t marketing\n") == "ai marketing"
+
+
+def test_accents_are_dropped():
+    assert normalize_topic("Programación en Python") == "programacion en python"
+    assert normalize_topic("ÉXITO") == "exito"
+
+
+def test_different_topics_keep_different_keys():
+    assert normalize_topic("Python testing") != normalize_topic("Python typing")
@@ -0,0 +1,49 @@
+"""
+Tests for parsing curated documents into dataset resources
+"""
+from src.dataset import parse_curated_markdown
+
+DOCUMENT = """# RECURSOS CURADOS - Python testing
+
+## Recursos
+
+### 1. Getting started with pytest
+**Título Original:** Get Started — pytest documentation
+**URL:** https://docs.pytest.org/en/stable/getting-started.html
+**Idioma:** Inglés
+**Autor/Fuente:** pytest-dev
+**Nivel:** Principiante
+**Relevancia:** Introducción oficial a pytest
+
+### 2. Recurso sin enlace
+**Título Original:** Apuntes
+**Nivel:** Intermedio
+
+### 3. unittest
+**URL:** https://docs.python.org/3/library/unittest.html
+"""
+
+
+def test_fields_are_parsed_per_resource():
+    resources = parse_curated_markdown(DOCUMENT)
+
+    assert resources[0] == {
+        'rank': 1,
+        'title': 'Get Started — pytest documentation',
+        'url': 'https://docs.pytest.org/en/stable/getting-started.html',
+        'language': 'Inglés',
+        'source': 'pytest-dev',
+        'level': 'Principiante',
+        'description': 'Introducción oficial a pytest',
+    }
+
+
+def test_resources_without_url_are_skipped():
+    resources = parse_curated_markdown(DOCUMENT)
+
+    assert [resource['rank'] for resource in resources] == [1, 3]
+    assert resources[1] == {'rank': 3, 'url': 'https://docs.python.org/3/library/unittest.html'}
+
+
+def test_fields_before_first_heading_are_ignored():
+    assert parse_curated_markdown("**URL:** https://example.com\n") == []
@@ -0,0 +1,56 @@
+"""
+Tests for the SQLite job queue leases
+"""
+from src.jobqueue import JobQueue
+
+
+def test_live_lease_is_not_claimed_again(tmp_path):
+    queue = JobQueue(tmp_path / 'jobs.sqlite3')
+    run_id = queue.enqueue('Python testing', run_id='run-1')
+
+    job = queue.claim('worker-a', lease_seconds=300)
+
+    assert job['run_id'] == run_id
+    assert job['attempts'] == 1
+    assert queue.claim('worker-b') is None
+
+
+def test_expired_lease_is_claimed_by_another_worker(tmp_path):
+    queue = JobQueue(tmp_path / 'jobs.sqlite3')
+    queue.enqueue('Python testing', run_id='run-1', max_attempts=3)
+    queue.claim('worker-a', lease_seconds=-1)
+
+    job = queue.claim('worker-b')
+
+    assert job['run_id'] == 'run-1'
+    assert job['lease_owner'] == 'worker-b'
+    assert job['attempts'] == 2
+    # The crashed worker lost the job
+    assert not queue.heartbeat('run-1', 'worker-a')
+    assert not queue.complete('run-1', 'worker-a', 'output/a.md')
+    assert queue.complete('run-1', 'worker-b', 'output/b.md')
+    assert queue.get('run-1')['status'] == 'completed'
+
+
+def test_expired_lease_without_attempts_left_fails(tmp_path):
+    queue = JobQueue(tmp_path / 'jobs.sqlite3')
+    queue.enqueue('Python testing', run_id='run-1', max_attempts=1)
+    queue.claim('worker-a', lease_seconds=-1)
+
+    assert queue.claim('worker-b') is None
+    job = queue.get('run-1')
+    assert job['status'] == 'failed'
+    assert job['error'] == 'Lease expired'
+
+
+def test_failed_attempt_is_requeued_while_attempts_remain(tmp_path):
+    queue = JobQueue(tmp_path / 'jobs.sqlite3')
+    queue.enqueue('Python testing', run_id='run-1', max_attempts=2)
+
+    queue.claim('worker-a')
+    assert queue.fail('run-1', 'worker-a', 'boom')
+    assert queue.get('run-1')['status'] == 'queued'
+
+    queue.claim('worker-a')
+    assert queue.fail('run-1', 'worker-a', 'boom')
+    assert queue.get('run-1')['status'] == 'failed'
@@ -0,0 +1,79 @@
+"""
+Tests for the AIMD steps of the adaptive concurrency limiter
+"""
+import asyncio
+import time
+
+import pytest
+
+from src.limiter import MIN_SAMPLES, AdaptiveLimiter
+
+
+def test_success_grows_limit_additively_up_to_maximum():
+    limiter = AdaptiveLimiter('test', initial=4, maximum=5)
+
+    limiter.on_success(time.monotonic(), 0.1)
+    assert limiter.limit == 4.25
+
+    for _ in range(20):
+        limiter.on_success(time.monotonic(), 0.1)
+    assert limiter.limit == 5
+
+
+def test_overload_shrinks_limit_multiplicatively_down_to_minimum():
+    limiter = AdaptiveLimiter('test', initial=8, maximum=16, backoff=0.5)
+
+    limiter.on_overload(time.monotonic())
+    assert limiter.limit == 4
+
+    for _ in range(5):
+        limiter.on_overload(time.monotonic())
+    assert limiter.limit == 1
+
+
+def test_overload_backs_off_once_per_round():
+    limiter = AdaptiveLimiter('test', initial=8, maximum=16, backoff=0.5)
+    started = time.monotonic()
+
+    # Calls that were in flight together fail together: one decrease
+    limiter.on_overload(started)
+    limiter.on_overload(started)
+
+    assert limiter.limit == 4
+    assert limiter.stats == {'calls': 0, 'failures': 2, 'decreases': 1}
+
+
+def test_p95_above_baseline_counts_as_overload():
+    limiter = AdaptiveLimiter('test', initial=8, maximum=16, backoff=0.5, latency_factor=2.0)
+    for _ in range(MIN_SAMPLES):
+        limiter.on_success(time.monotonic(), 0.1)
+    grown = limiter.limit
+    assert limiter.baseline == pytest.approx(0.1)
+
+    limiter.on_success(time.monotonic(), 5.0)
+
+    assert limiter.limit == grown * 0.5
+    assert limiter.stats['decreases'] == 1
+
+
+def test_slot_caps_in_flight_calls_and_backs_off_on_429():
+    limiter = AdaptiveLimiter('test', initial=2, maximum=2, backoff=0.5)
+    peak = 0
+
+    async def call(status):
+        nonlocal peak
+        async with limiter.slot() as outcome:
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+            outcome.observe(status)
+
+    async def run():
+        await asyncio.gather(*(call(200) for _ in range(6)))
+        assert limiter.limit == 2
+        await call(429)
+
+    asyncio.run(run())
+
+    assert peak == 2
+    assert limiter.limit == 1
+    assert limiter.in_flight == 0
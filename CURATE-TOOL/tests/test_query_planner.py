@@ -0,0 +1,49 @@
+"""
+Tests for query plans and yield-based template selection
+"""
+from src.query_planner import QueryPlan, select_templates
+
+TEMPLATES = ["{topic} tutorial", "{topic} guide", "learn {topic}"]
+
+
+def test_planned_templates_run_first_and_rest_is_reserve():
+    plan = QueryPlan('pytest', ["learn {topic}"], TEMPLATES, target=3, run_id='run-1')
+
+    assert plan.templates == ["learn {topic}", "{topic} tutorial", "{topic} guide"]
+    assert plan.planned_queries == ["learn pytest"]
+    assert plan.template_of("pytest guide") == "{topic} guide"
+    assert plan.template_of("unknown") is None
+
+
+def test_observe_counts_new_canonical_urls():
+    plan = QueryPlan('pytest', TEMPLATES, TEMPLATES, target=3, run_id='run-1')
+
+    plan.observe("{topic} tutorial", ['https://a.com/x', 'https://b.com/y'])
+    plan.observe("{topic} guide", ['http://www.a.com/x/', 'https://c.com/z', ''])
+
+    assert plan.new_urls == {"{topic} tutorial": 2, "{topic} guide": 1}
+    assert plan.enough()
+    assert plan.saved == 1
+    assert plan.summary() == "2 de 3 consultas (1 ahorradas), 3 URLs únicas"
+
+
+def test_failed_query_counts_as_executed_without_yield():
+    plan = QueryPlan('pytest', TEMPLATES, TEMPLATES, target=3, run_id='run-1')
+
+    plan.observe("{topic} tutorial", None)
+
+    assert plan.executed == ["{topic} tutorial"]
+    assert plan.results == {}
+    assert not plan.enough()
+
+
+def test_select_templates_picks_highest_marginal_yield_until_target():
+    history = [
+        {"{topic} tutorial": {'a', 'b', 'c'}, "{topic} guide": {'a', 'b'}, "learn {topic}": {'d'}},
+        {"{topic} tutorial": {'a', 'b', 'c'}, "{topic} guide": {'a', 'c'}, "learn {topic}": {'e'}},
+    ]
+
+    # guide adds nothing once tutorial ran; learn adds one new URL per run
+    assert select_templates(history, 4, TEMPLATES) == ["{topic} tutorial", "learn {topic}"]
+    assert select_templates(history, 3, TEMPLATES) == ["{topic} tutorial"]
+    assert select_templates([], 3, TEMPLATES) == []
@@ -0,0 +1,58 @@
+"""
+Tests for final-answer gating of the token streamer
+"""
+from src.streaming import TokenStreamer
+
+
+def stream(streamer, tokens):
+    for token in tokens:
+        streamer.write(token)
+    streamer.close()
+
+
+def test_scaffolding_before_final_answer_is_not_written(tmp_path):
+    path = tmp_path / 'out.md'
+    streamer = TokenStreamer(path, echo=False)
+
+    streamer.start_call()
+    stream(streamer, ['Thought: ', 'I need to search\n', 'Action: web_search'])
+    assert not path.exists()
+    assert streamer.time_to_first_token is None
+
+    streamer.start_call()
+    stream(streamer, ['Thought: done\n', 'Final Answer:', ' # Recursos', '\n### 1.'])
+    assert path.read_text(encoding='utf-8') == '# Recursos\n### 1.'
+    assert streamer.time_to_first_token is not None
+
+
+def test_marker_split_across_tokens(tmp_path):
+    path = tmp_path / 'out.md'
+    streamer = TokenStreamer(path, echo=False)
+
+    streamer.start_call()
+    stream(streamer, ['Final ', 'Ans', 'wer: Hola', ' mundo'])
+
+    assert path.read_text(encoding='utf-8') == 'Hola mundo'
+
+
+def test_new_call_discards_pending_text(tmp_path):
+    path = tmp_path / 'out.md'
+    streamer = TokenStreamer(path, echo=False)
+
+    streamer.start_call()
+    streamer.write('Final ')
+    streamer.start_call()
+    stream(streamer, ['Answer: not an answer'])
+
+    assert not path.exists()
+
+
+def test_discard_removes_partial_output(tmp_path):
+    path = tmp_path / 'out.md'
+    streamer = TokenStreamer(path, echo=False)
+
+    streamer.start_call()
+    streamer.write('Final Answer: partial')
+    streamer.discard()
+
+    assert not path.exists()
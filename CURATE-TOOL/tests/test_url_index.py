@@ -0,0 +1,79 @@
+"""
+Tests for canonical URLs and the offline filter of curated URLs
+"""
+from src.url_index import URLIndex, canonical_url, filter_curated_urls
+
+
+def test_canonical_url_ignores_presentation_differences():
+    key = canonical_url('https://example.com/guide?a=1&b=2')
+
+    assert canonical_url('http://www.example.com/guide/?b=2&a=1') == key
+    assert canonical_url('https://example.com:443/guide?a=1&b=2#intro') == key
+    assert canonical_url('https://EXAMPLE.com/guide?a=1&utm_source=x&b=2&gclid=y') == key
+    assert canonical_url('https://example.com/guide?a=1&b=2).') == key
+
+
+def test_canonical_url_keeps_meaningful_differences():
+    assert canonical_url('https://example.com:8080/guide') == 'example.com:8080/guide'
+    assert canonical_url('https://example.com/guide?page=2') != canonical_url('https://example.com/guide')
+    assert canonical_url('https://en.wikipedia.org/wiki/Python_(programming_language)') == \
+        'en.wikipedia.org/wiki/Python_(programming_language)'
+    assert canonical_url('http://[::1') == ''
+
+
+def entry(number, title, url):
+    return f"### {number}. {title}\n**Título Original:** {title}\n**URL:** {url}\n"
+
+
+def make_index():
+    index = URLIndex()
+    index.add('https://docs.pytest.org/en/stable/', 'pytest documentation')
+    index.add('https://realpython.com/pytest-python-testing/', 'Effective Python Testing With Pytest')
+    return index
+
+
+def test_known_and_canonical_urls_are_kept_or_fixed():
+    doc = (entry(1, 'pytest documentation', 'https://docs.pytest.org/en/stable/')
+           + entry(2, 'Real Python', 'http://www.realpython.com/pytest-python-testing?utm_source=x'))
+
+    content, stats = filter_curated_urls(doc, make_index(), 'replace')
+
+    assert stats == {'kept': 1, 'replaced': 1, 'rejected': 0, 'rejected_urls': []}
+    assert '**URL:** https://realpython.com/pytest-python-testing/' in content
+
+
+def test_unknown_url_is_replaced_by_title_match():
+    doc = entry(1, 'Effective Python Testing With Pytest', 'https://realpython.com/made-up-page')
+
+    content, stats = filter_curated_urls(doc, make_index(), 'replace')
+
+    assert stats['replaced'] == 1
+    assert '**URL:** https://realpython.com/pytest-python-testing/' in content
+
+
+def test_unknown_url_removes_entry_and_renumbers():
+    doc = (entry(1, 'Invented', 'https://example.com/invented')
+           + entry(2, 'pytest documentation', 'https://docs.pytest.org/en/stable/'))
+
+    content, stats = filter_curated_urls(doc, make_index(), 'reject')
+
+    assert stats['rejected_urls'] == ['https://example.com/invented']
+    assert 'Invented' not in content
+    assert '### 1. pytest documentation' in content
+    assert content.startswith('> ⚠️ 1 recurso(s) descartado(s)')
+
+
+def test_reject_mode_does_not_use_title_matches():
+    doc = entry(1, 'Effective Python Testing With Pytest', 'https://realpython.com/made-up-page')
+
+    content, stats = filter_curated_urls(doc, make_index(), 'reject')
+
+    assert stats['rejected'] == 1
+    assert 'made-up-page' not in content
+
+
+def test_nothing_is_filtered_when_off_or_without_indexed_urls():
+    doc = entry(1, 'Invented', 'https://example.com/invented')
+
+    assert filter_curated_urls(doc, make_index(), 'off')[0] == doc
+    assert filter_curated_urls(doc, URLIndex(), 'replace')[0] == doc
@@ -2,11 +2,39 @@
 """
 Script para verificar URLs en archivos de curación de contenido
 """
+import csv
+import json
+import os
 import re
-import requests
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
 from urllib.parse import urlparse
 import time
 
+import click
+
+from config.settings import OUTPUT_DIR, VALIDATION_WORKERS, METRICS_PORT, METRICS_DUMP_PATH
+from src.aio import check_url_works_async, run_sync
+from src.metrics import URL_CHECKS, enable_metrics
+from src.profiling import profiled, start_profiling, stop_profiling
+
+# Patterns used to find URLs in curated files
+URL_PATTERNS = [
+    r'\*\*URL:\*\*\s+(https?://[^\s\n]+)',  # **URL:** format
+    r'https?://[^\s\n\)>\]]+(?:[^\s\n\)>\].,;:]|[.,;:]\S)',  # Any http URL
+]
+
+# Substrings that reveal an invented URL
+FAKE_URL_INDICATORS = [
+    'example.com', 'example-url', 'http://example',
+    'placeholder', 'fake-url', 'sample-url'
+]
+
+# File extensions produced by save_content and main_fixed
+OUTPUT_EXTENSIONS = ('.markdown', '.md', '.html')
+
 def is_valid_url(url):
     """Check if URL has valid format"""
     try:
@@ -15,17 +43,36 @@ def is_valid_url(url):
     except:
         return False
 
+@profiled('check')
 def check_url_works(url, timeout=10):
-    """Check if URL is accessible"""
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.head(url, headers=headers, timeout=timeout, allow_redirects=True)
-        return response.status_code < 400
-    except:
-        return False
+    """Check if URL is accessible (blocking wrapper of check_url_works_async)"""
+    return run_sync(check_url_works_async(url, timeout=timeout))
+
+def is_fake_url(url):
+    """Check if URL looks invented (placeholder domains and paths)"""
+    return any(indicator in url.lower() for indicator in FAKE_URL_INDICATORS)
 
+def classify_url(url, timeout=10):
+    """
+    Classify a URL as 'fake', 'invalid', 'ok' or 'unreachable'
+    
+    Args:
+        url: URL to classify
+        timeout: Timeout for the network check
+        
+    Returns:
+        Status string
+    """
+    if is_fake_url(url):
+        status = 'fake'
+    elif not is_valid_url(url):
+        status = 'invalid'
+    else:
+        status = 'ok' if check_url_works(url, timeout=timeout) else 'unreachable'
+    URL_CHECKS.inc(status=status)
+    return status
+
+@profiled('parse')
 def extract_urls_from_file(filename):
     """Extract URLs from markdown file"""
     urls = []
@@ -34,12 +81,7 @@ def extract_urls_from_file(filename):
             content = f.read()
             
         # Find URLs in multiple formats
-        patterns = [
-            r'\*\*URL:\*\*\s+(https?://[^\s\n]+)',  # **URL:** format
-            r'https?://[^\s\n\)>\]]+(?:[^\s\n\)>\].,;:]|[.,;:]\S)',  # Any http URL
-        ]
-        
-        for pattern in patterns:
+        for pattern in URL_PATTERNS:
             matches = re.findall(pattern, content)
             for match in matches:
                 if match not in urls:
@@ -72,19 +114,16 @@ def validate_urls_in_file(filename):
         print(f"🔗 {i}. Verificando: {url}")
         
         # Check if it's obviously fake
-        fake_indicators = [
-            'example.com', 'example-url', 'http://example',
-            'placeholder', 'fake-url', 'sample-url'
-        ]
-        
-        if any(indicator in url.lower() for indicator in fake_indicators):
+        if is_fake_url(url):
             print(f"   ❌ URL INVENTADA/FALSA")
+            URL_CHECKS.inc(status='fake')
             fake_urls.append(url)
             continue
             
         # Check format
         if not is_valid_url(url):
             print(f"   ❌ FORMATO INVÁLIDO")
+            URL_CHECKS.inc(status='invalid')
             invalid_urls.append(url)
             continue
             
@@ -92,9 +131,11 @@ def validate_urls_in_file(filename):
         print(f"   🌐 Verificando accesibilidad...")
         if check_url_works(url):
             print(f"   ✅ URL FUNCIONA")
+            URL_CHECKS.inc(status='ok')
             valid_urls.append(url)
         else:
             print(f"   ❌ URL NO ACCESIBLE")
+            URL_CHECKS.inc(status='unreachable')
             invalid_urls.append(url)
             
         # Small delay to be respectful
@@ -124,23 +165,189 @@ def validate_urls_in_file(filename):
         for url in valid_urls:
             print(f"   - {url}")
 
-def main():
-    import sys
-    import glob
+def find_output_files(root):
+    """
+    Find every curated output file under root, including the run folders
+    created by create_project_structure
+    
+    Args:
+        root: Directory to scan
+        
+    Returns:
+        Sorted list of file paths
+    """
+    root = Path(root)
+    return sorted(
+        path for path in root.rglob('*')
+        if path.is_file() and path.suffix in OUTPUT_EXTENSIONS
+    )
+
+@profiled('parse')
+def extract_url_locations(filename):
+    """
+    Extract URLs from a file together with the line they appear on
+    
+    Args:
+        filename: File to read
+        
+    Returns:
+        List of (url, line_number) tuples, unique per line
+    """
+    locations = []
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                seen = set()
+                for pattern in URL_PATTERNS:
+                    for match in re.findall(pattern, line):
+                        url = match.strip()
+                        if url not in seen:
+                            seen.add(url)
+                            locations.append((url, line_number))
+    except Exception as e:
+        print(f"Error reading file {filename}: {e}")
+    return locations
+
+@profiled('save')
+def write_bulk_report(report, report_dir):
+    """
+    Write the bulk validation report as JSON and CSV
+    
+    Args:
+        report: Report dictionary built by validate_output_tree
+        report_dir: Directory to write into
+        
+    Returns:
+        Tuple with the JSON and CSV paths
+    """
+    report_dir = Path(report_dir)
+    report_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    json_path = report_dir / f"url_report_{stamp}.json"
+    csv_path = report_dir / f"url_report_{stamp}.csv"
+    
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    
+    with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['url', 'status', 'file', 'line'])
+        for entry in report['urls']:
+            for location in entry['locations']:
+                writer.writerow([entry['url'], entry['status'], location['file'], location['line']])
+    
+    return str(json_path), str(csv_path)
+
+def validate_output_tree(root=OUTPUT_DIR, workers=VALIDATION_WORKERS, report_dir=None):
+    """
+    Validate every URL found under the output tree, checking each unique
+    URL only once and mapping results back to every file and line
+    
+    Args:
+        root: Directory to scan
+        workers: Number of concurrent URL checks
+        report_dir: Where to write the report (defaults to root/reports)
+        
+    Returns:
+        Report dictionary
+    """
+    root = Path(root)
+    report_dir = Path(report_dir) if report_dir else root / "reports"
+    print(f"\n🔍 Analizando directorio: {root}")
+    print("=" * 50)
     
-    if len(sys.argv) > 1:
-        filename = sys.argv[1]
+    files = find_output_files(root)
+    locations = defaultdict(list)
+    for path in files:
+        for url, line_number in extract_url_locations(path):
+            locations[url].append({'file': str(path), 'line': line_number})
+    
+    total_refs = sum(len(refs) for refs in locations.values())
+    print(f"📁 Archivos analizados: {len(files)}")
+    print(f"📋 Referencias a URLs: {total_refs} ({len(locations)} únicas)")
+    
+    started = time.perf_counter()
+    statuses = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(classify_url, url): url for url in locations}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                statuses[url] = future.result()
+            except Exception:
+                statuses[url] = 'unreachable'
+    elapsed = time.perf_counter() - started
+    
+    counts = defaultdict(int)
+    for status in statuses.values():
+        counts[status] += 1
+    
+    report = {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'root': str(root),
+        'files_scanned': len(files),
+        'url_references': total_refs,
+        'unique_urls': len(locations),
+        'elapsed_seconds': round(elapsed, 2),
+        'summary': dict(counts),
+        'urls': [
+            {'url': url, 'status': statuses[url], 'locations': refs}
+            for url, refs in sorted(locations.items())
+        ]
+    }
+    
+    json_path, csv_path = write_bulk_report(report, report_dir)
+    
+    print("\n" + "="*50)
+    print("📊 RESUMEN DE VALIDACIÓN MASIVA")
+    print("="*50)
+    print(f"✅ URLs válidas y funcionando: {counts['ok']}")
+    print(f"❌ URLs no accesibles: {counts['unreachable'] + counts['invalid']}")
+    print(f"🚫 URLs inventadas/falsas: {counts['fake']}")
+    print(f"⏱️ Tiempo de verificación: {elapsed:.1f}s")
+    print(f"\n📄 Reporte JSON: {json_path}")
+    print(f"📄 Reporte CSV: {csv_path}")
+    
+    return report
+
+@click.command()
+@click.argument('filename', required=False)
+@click.option('--all', 'bulk', is_flag=True, help='Validate every file under the output directory')
+@click.option('--root', default=str(OUTPUT_DIR), help='Directory to scan in bulk mode')
+@click.option('--workers', '-w', default=VALIDATION_WORKERS, help='Concurrent URL checks in bulk mode')
+@click.option('--report-dir', default=None, help='Where to write the JSON/CSV report')
+@click.option('--metrics-port', default=METRICS_PORT, help='Serve Prometheus metrics on this local port (0 = off)')
+@click.option('--metrics-file', default=METRICS_DUMP_PATH, help='Write Prometheus metrics to this file at exit')
+@click.option('--profile', is_flag=True, help='Write CPU and memory profiles per stage next to the report or file')
+def main(filename, bulk, root, workers, report_dir, metrics_port, metrics_file, profile):
+    """
+    Validate URLs in a curated file, or in the whole output tree with --all
+    """
+    enable_metrics(metrics_port, metrics_file)
+    if profile:
+        start_profiling()
+    if bulk:
+        validate_output_tree(root, workers, report_dir)
+        target = Path(report_dir) if report_dir else Path(root) / "reports"
+        profile_dir = target / "validation.profile"
+    elif filename:
         validate_urls_in_file(filename)
+        profile_dir = Path(filename).with_suffix('.validation.profile')
     else:
         # Find the most recent output file
-        output_files = glob.glob("output/course_*.markdown")
+        output_files = [str(path) for path in Path(OUTPUT_DIR).glob("course_*.markdown")]
         if output_files:
-            latest_file = max(output_files, key=lambda f: f.split('_')[-1])
+            latest_file = max(output_files, key=os.path.getmtime)
             print(f"📁 Usando archivo más reciente: {latest_file}")
             validate_urls_in_file(latest_file)
+            profile_dir = Path(latest_file).with_suffix('.validation.profile')
         else:
             print("❌ No se encontraron archivos de salida en output/")
             print("Uso: python validate_urls.py [archivo.markdown]")
+            print("  o: python validate_urls.py --all")
+            profile_dir = None
+    if profile and profile_dir:
+        print(f"🔬 Perfil: {stop_profiling(profile_dir)}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+CrewAI Content Curator - Durable job queue workers
+
+    python worker.py enqueue "AI Marketing" "Data Science" --mode fast
+    python worker.py work --processes 8
+    python worker.py status
+"""
+import os
+import socket
+import threading
+import time
+from multiprocessing import Process
+from pathlib import Path
+
+import click
+
+from config.settings import JOB_LEASE_SECONDS, WORKER_PROCESSES, METRICS_PORT, METRICS_DUMP_PATH
+from src.jobqueue import JobQueue
+
+
+def heartbeat_loop(queue: JobQueue, run_id: str, worker_id: str, stop: threading.Event):
+    """Keep extending a job's lease while it runs"""
+    while not stop.wait(JOB_LEASE_SECONDS / 3):
+        if not queue.heartbeat(run_id, worker_id):
+            return
+
+
+def work_loop(db_path: str, wait: bool, poll_interval: float = 2.0,
+              metrics_port: int = 0, metrics_file: str = ''):
+    """
+    Claim and run jobs until the queue is empty (or forever with wait)
+
+    Args:
+        db_path: Path to the job database
+        wait: Keep polling for new jobs instead of exiting when idle
+        poll_interval: Seconds between polls when the queue is empty
+        metrics_port: Local port serving this process's metrics (0 = off)
+        metrics_file: File this process's metrics are written to at exit
+    """
+    # Heavy imports happen once per worker process
+    from src.service import run_curation
+    from src.metrics import enable_metrics
+    enable_metrics(metrics_port, metrics_file)
+
+    queue = JobQueue(db_path)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    crew = None
+
+    while True:
+        job = queue.claim(worker_id)
+        if job is None:
+            if not wait:
+                return
+            time.sleep(poll_interval)
+            continue
+
+        print(f"🔧 [{worker_id}] {job['run_id']} (intento {job['attempts']}/{job['max_attempts']})")
+        stop = threading.Event()
+        threading.Thread(
+            target=heartbeat_loop, args=(queue, job['run_id'], worker_id, stop), daemon=True
+        ).start()
+
+        try:
+            if job['mode'] == 'crew' and crew is None:
+                from src.crew import ContentCurationCrew
+                crew = ContentCurationCrew()
+            filepath = run_curation(job['topic'], job['mode'], run_id=job['run_id'], crew=crew)
+            queue.complete(job['run_id'], worker_id, filepath)
+            print(f"✅ [{worker_id}] {job['run_id']} -> {filepath}")
+        except Exception as e:
+            queue.fail(job['run_id'], worker_id, str(e))
+            print(f"❌ [{worker_id}] {job['run_id']}: {e}")
+        finally:
+            stop.set()
+
+
+@click.group()
+@click.option('--db', default=None, help='Job database path')
+@click.pass_context
+def cli(ctx, db):
+    """Durable job queue for content curation"""
+    ctx.obj = JobQueue(db) if db else JobQueue()
+
+
+@cli.command()
+@click.argument('topics', nargs=-1, required=True)
+@click.option('--mode', '-m', type=click.Choice(['fast', 'crew']), default='fast', help='Execution mode')
+@click.option('--run-id', default=None, help='Explicit run ID (only with a single topic)')
+@click.pass_obj
+def enqueue(queue: JobQueue, topics, mode: str, run_id: str):
+    """Add one job per TOPIC to the queue"""
+    if run_id and len(topics) > 1:
+        raise click.UsageError("--run-id can only be used with a single topic")
+    for topic in topics:
+        print(f"📥 {queue.enqueue(topic, mode, run_id=run_id)}")
+
+
+@cli.command()
+@click.option('--processes', '-p', default=WORKER_PROCESSES, help='Number of worker processes')
+@click.option('--wait', is_flag=True, help='Keep waiting for new jobs')
+@click.option('--metrics-port', default=METRICS_PORT,
+              help='First local port for Prometheus metrics; worker N uses port + N (0 = off)')
+@click.option('--metrics-file', default=METRICS_DUMP_PATH,
+              help='Write each worker\'s metrics at exit (worker N adds .N before the extension)')
+@click.pass_obj
+def work(queue: JobQueue, processes: int, wait: bool, metrics_port: int, metrics_file: str):
+    """Run worker processes that pull jobs from the queue"""
+    print(f"🚀 Starting {processes} workers on {queue.path}")
+    workers = []
+    for index in range(max(1, processes)):
+        # Each process has its own metrics, so each gets its own port and file
+        port = metrics_port + index if metrics_port else 0
+        path = Path(metrics_file) if metrics_file else None
+        dump = str(path.with_name(f"{path.stem}.{index}{path.suffix}")) if path else ''
+        workers.append(Process(target=work_loop, args=(str(queue.path), wait, 2.0, port, dump)))
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+    print(f"📊 {queue.counts()}")
+
+
+@cli.command()
+@click.option('--status', 'status_filter', default=None, help='Only show jobs with this status')
+@click.option('--limit', default=20, help='Number of jobs to show')
+@click.pass_obj
+def status(queue: JobQueue, status_filter: str, limit: int):
+    """Show queue counts and recent jobs"""
+    print(f"📊 {queue.counts()}")
+    for job in queue.list(status_filter, limit):
+        detail = job['output_path'] or job['error'] or ''
+        print(f"{job['status']:>9}  {job['run_id']}  [{job['attempts']}/{job['max_attempts']}]  {detail}")
+
+
+if __name__ == '__main__':
+    cli()